@@ -4,3 +4,5 @@ import filters
 import contexts
 
 from anomaly_detector import AnomalyDetector, create_anomaly_detector
+from sweep import evaluate_sweep
+from configuration import get_canonical_config, get_config_hash
@@ -1,6 +1,10 @@
 '''
 Module contains methods for aggregating interval anomaly scores
 to anomaly vectors.
+
+Aggregators have a mergeable state: get_state returns the (picklable) state
+of an aggregator, and merge_state adds such a state to another aggregator for
+the same sequence, as if its scores had been added to it directly.
 '''
 import max_aggregator
 import mean_aggregator
@@ -1,21 +1,36 @@
 import numpy
 
+from window_records import WindowRecords, get_extreme_scores
+
 
 class MaxAggregator(object):
     """
     Constructs an anomaly vector with the maximum anomaly score
     for each item.
+
+    Scores are recorded per window, and the anomaly vector is computed
+    in a single vectorized pass when it is requested.
     """
     def __init__(self, series_length=0):
-        self._values = numpy.zeros(series_length)
+        self.init(series_length)
 
     def init(self, series_length):
-        self._values = numpy.zeros(series_length)
+        self._series_length = series_length
+        self._records = WindowRecords()
 
     def add_score(self, score, start, end):
-        for i in range(start, end + 1):
-            if self._values[i] < score:
-                self._values[i] = score
+        self._records.add(score, start, end)
+
+    def add_scores(self, scores, starts, ends):
+        self._records.add_block(scores, starts, ends)
+
+    def get_state(self):
+        return self._records.get_arrays()
+
+    def merge_state(self, state):
+        self._records.add_block(*state)
 
     def get_aggregated_scores(self):
-        return self._values
+        scores, starts, ends = self._records.get_arrays()
+        values = get_extreme_scores(scores, starts, ends, self._series_length, maximum=True)
+        return numpy.maximum(values, 0)
@@ -1,26 +1,57 @@
 from __future__ import division
 import numpy
 
+from window_records import WindowRecords
+
 
 class MeanAggregator(object):
     """
     Constructs an anomaly vector with the mean anomaly score
     for each item.
+
+    Scores are recorded per window, and the anomaly vector is computed
+    through difference arrays when it is requested.
     """
     def __init__(self, series_length=0):
-        self._mean = numpy.zeros(series_length)
-        self._counts = numpy.zeros(series_length)
+        self.init(series_length)
 
     def init(self, series_length):
-        self._mean = numpy.zeros(series_length)
-        self._counts = numpy.zeros(series_length)
+        self._series_length = series_length
+        self._records = WindowRecords()
 
     def add_score(self, score, start, end):
-        for i in range(start, end + 1):
-            n = self._counts[i]
-            self._mean[i] = (self._mean[i] * n + score) / (n + 1)
+        self._records.add(score, start, end)
+
+    def add_scores(self, scores, starts, ends):
+        self._records.add_block(scores, starts, ends)
 
-            self._counts[i] += 1
+    def get_state(self):
+        return self._records.get_arrays()
+
+    def merge_state(self, state):
+        self._records.add_block(*state)
 
     def get_aggregated_scores(self):
-        return self._mean
+        scores, starts, ends = self._records.get_arrays()
+        length = self._series_length
+
+        # the sums and counts of each item are the prefix sums of arrays that
+        # are increased at the start and decreased after the end of each window
+        finite = numpy.isfinite(scores)
+        sums = _get_covering_sums(scores[finite], starts[finite], ends[finite], length)
+        counts = _get_covering_sums(numpy.ones(len(scores)), starts, ends, length)
+
+        # infinite and NaN scores would spoil the prefix sums, so they are added separately
+        for score, start, end in zip(scores[~finite], starts[~finite], ends[~finite]):
+            sums[start:end + 1] += score
+
+        mean = numpy.zeros(length)
+        covered = counts > 0
+        mean[covered] = sums[covered] / counts[covered]
+        return mean
+
+
+def _get_covering_sums(scores, starts, ends, length):
+    differences = (numpy.bincount(starts, weights=scores, minlength=length + 1) -
+                   numpy.bincount(ends + 1, weights=scores, minlength=length + 1))
+    return numpy.cumsum(differences[:length], dtype=float)
@@ -1,22 +1,122 @@
 import numpy
 
+from window_records import WindowRecords
+
+# maximum number of (item, window) pairs processed at a time
+_BLOCK_ENTRIES = 1 << 21
+
 
 class MedianAggregator(object):
     """
     Constructs an anomaly vector with the median anomaly score
     for each item.
+
+    Scores are recorded per window, and the medians are computed when the
+    anomaly vector is requested, for blocks of items at a time, so that only
+    O(n) memory is used in addition to the current block.
+    As with numpy.median, items covered by a NaN score, or not covered at all,
+    get a NaN score.
     """
     def __init__(self, series_length=0):
-        self._values = []
+        self.init(series_length)
 
     def init(self, series_length):
-        self._values = []
-        for _ in range(series_length):
-            self._values.append([])
+        self._series_length = series_length
+        self._records = WindowRecords()
 
     def add_score(self, score, start, end):
-        for i in range(start, end + 1):
-            self._values[i].append(score)
+        self._records.add(score, start, end)
+
+    def add_scores(self, scores, starts, ends):
+        self._records.add_block(scores, starts, ends)
+
+    def get_state(self):
+        return self._records.get_arrays()
+
+    def merge_state(self, state):
+        self._records.add_block(*state)
 
     def get_aggregated_scores(self):
-        return [numpy.median(x) for x in self._values]
+        scores, starts, ends = self._records.get_arrays()
+        length = self._series_length
+        medians = numpy.empty(length)
+        medians.fill(numpy.nan)
+
+        if len(scores) == 0 or length == 0:
+            return medians
+
+        # replacing the scores by their ranks allows each (item, window) pair to be
+        # encoded as a single integer, such that sorting the integers groups them
+        # by item and sorts each group by score
+        order = numpy.argsort(scores, kind='mergesort')
+        sorted_scores = scores[order]
+        ranks = numpy.empty(len(scores), dtype=numpy.int64)
+        ranks[order] = numpy.arange(len(scores))
+
+        # windows are sorted by start, to quickly find the windows overlapping a block
+        order = numpy.argsort(starts, kind='mergesort')
+        starts, ends, ranks = starts[order], ends[order], ranks[order]
+
+        coverage = _get_coverage(starts, ends, length)
+        max_width = int((ends - starts).max()) + 1
+        block_length = max(1, _BLOCK_ENTRIES // max(1, int(coverage.max())))
+
+        for block_start in range(0, length, block_length):
+            block_end = min(length, block_start + block_length)
+            first = numpy.searchsorted(starts, block_start - max_width + 1)
+            last = numpy.searchsorted(starts, block_end)
+            medians[block_start:block_end] = _get_block_medians(
+                starts[first:last], ends[first:last], ranks[first:last],
+                sorted_scores, block_start, block_end)
+
+        # NaN scores are sorted last, so only items without NaN scores are correct
+        nan_coverage = _get_coverage(starts, ends, length, numpy.isnan(sorted_scores[ranks]))
+        medians[nan_coverage > 0] = numpy.nan
+        return medians
+
+
+def _get_coverage(starts, ends, length, weights=None):
+    """
+    Returns the number of windows (with non-zero weight) covering each item.
+    """
+    if weights is None:
+        weights = numpy.ones(len(starts))
+    weights = numpy.asarray(weights, dtype=float)
+    differences = (numpy.bincount(starts, weights=weights, minlength=length + 1) -
+                   numpy.bincount(ends + 1, weights=weights, minlength=length + 1))
+    return numpy.cumsum(differences[:length], dtype=float)
+
+
+def _get_block_medians(starts, ends, ranks, sorted_scores, block_start, block_end):
+    """
+    Returns the medians of the scores of the windows covering each item in
+    [block_start, block_end), or NaN for items not covered by any window.
+    """
+    block_length = block_end - block_start
+    medians = numpy.empty(block_length)
+    medians.fill(numpy.nan)
+
+    lo = numpy.maximum(starts, block_start) - block_start
+    hi = numpy.minimum(ends, block_end - 1) - block_start
+    overlapping = hi >= lo
+    lo, hi, ranks = lo[overlapping], hi[overlapping], ranks[overlapping]
+    if len(lo) == 0:
+        return medians
+
+    # expand each window into its items in the block
+    lengths = hi - lo + 1
+    offsets = numpy.cumsum(lengths) - lengths
+    items = numpy.arange(lengths.sum()) - numpy.repeat(offsets - lo, lengths)
+
+    keys = items * len(sorted_scores) + numpy.repeat(ranks, lengths)
+    keys.sort()
+
+    counts = numpy.bincount(items, minlength=block_length)
+    item_offsets = numpy.cumsum(counts) - counts
+    covered = counts > 0
+    counts, item_offsets = counts[covered], item_offsets[covered]
+
+    lower = sorted_scores[keys[item_offsets + (counts - 1) // 2] % len(sorted_scores)]
+    upper = sorted_scores[keys[item_offsets + counts // 2] % len(sorted_scores)]
+    medians[covered] = (lower + upper) / 2.0
+    return medians
@@ -0,0 +1,80 @@
+import numpy
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+
+class WindowRecords(object):
+    """
+    Records the anomaly scores of windows in O(1) time per window, for
+    aggregators that materialize their anomaly vectors all at once.
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._scores = []
+        self._starts = []
+        self._ends = []
+        self._blocks = []
+
+    def add(self, score, start, end):
+        self._scores.append(score)
+        self._starts.append(start)
+        self._ends.append(end)
+
+    def add_block(self, scores, starts, ends):
+        self._flush()
+        self._blocks.append((numpy.asarray(scores, dtype=float),
+                             numpy.asarray(starts, dtype=int),
+                             numpy.asarray(ends, dtype=int)))
+
+    def get_arrays(self):
+        """
+        Returns the recorded scores, start indices and end indices as arrays.
+        """
+        self._flush()
+        if not self._blocks:
+            return numpy.empty(0), numpy.empty(0, dtype=int), numpy.empty(0, dtype=int)
+        if len(self._blocks) > 1:
+            self._blocks = [tuple(numpy.concatenate(arrays) for arrays in zip(*self._blocks))]
+        return self._blocks[0]
+
+    def _flush(self):
+        if self._scores:
+            scores, starts, ends = self._scores, self._starts, self._ends
+            self._scores, self._starts, self._ends = [], [], []
+            self.add_block(scores, starts, ends)
+
+
+def get_extreme_scores(scores, starts, ends, series_length, maximum=True):
+    """
+    Returns the maximum (or minimum) score of the windows covering each item,
+    or -inf (inf) for items not covered by any window. NaN scores are ignored.
+
+    Windows are grouped by width, and each group is handled through a single
+    sliding window maximum (minimum) over the scores indexed by window start,
+    so this takes O(n) time per distinct window width.
+    """
+    if maximum:
+        fill, extreme, extreme_filter = -numpy.inf, numpy.maximum, maximum_filter1d
+    else:
+        fill, extreme, extreme_filter = numpy.inf, numpy.minimum, minimum_filter1d
+
+    values = numpy.empty(series_length)
+    values.fill(fill)
+
+    valid = ~numpy.isnan(scores)
+    scores, starts, ends = scores[valid], starts[valid], ends[valid]
+    widths = ends - starts + 1
+
+    for width in numpy.unique(widths):
+        in_group = widths == width
+        start_scores = numpy.empty(series_length)
+        start_scores.fill(fill)
+        extreme.at(start_scores, starts[in_group], scores[in_group])
+
+        # item i is covered by the windows starting in [i - width + 1, i]
+        covering = extreme_filter(start_scores, int(width), mode='constant', cval=fill,
+                                  origin=(int(width) - 1) // 2)
+        extreme(values, covering, out=values)
+
+    return values
@@ -1,12 +1,18 @@
 from __future__ import division
 
+import itertools
 import logging
+import multiprocessing
+
+import numpy
 
 import filters
 import contexts
 import evaluators
 import aggregators
 import representations
+import profiles
+from configuration import copy_config
 
 logger = logging.getLogger()
 
@@ -18,16 +24,37 @@ _INIT_MESSAGE = ('Anomaly detector created.'
                  'aggregator: {aggregator!s}.')
 _EVALUATE_MESSAGE = 'Evaluating sequence {!s}.'
 _ANOMALY_SCORES_MESSAGE = 'Obtained anomaly scores {!s}.'
+_WINDOW_SHAPE_ERROR = 'Evaluation filter must have a known width and step'
+_STREAM_CONTEXT_ERROR = 'Streaming evaluation requires a local or static context'
+_PACKED_OUTPUT_ERROR = ('Packed SAX words can not be evaluated by anomaly detectors, '
+                        'use output="integer" instead')
+
+_SHARDS_PER_PROCESS = 4
+
+# the detector and sequence evaluated by the worker processes of _evaluate_shards
+_shard_detector = None
+_shard_sequence = None
 
 
 def create_anomaly_detector(evaluation_filter_config, context_config, reference_filter_config,
                             evaluator_config, aggregator_config, representation_config=None,
-                            discretization_config=None):
+                            discretization_config=None, table_config=None):
     """
     Creates an anomaly detector from a set of configuration dicts.
     See the individual modules for how to setup each of the configuration dicts.
     Representation and discretization configurations are optional.
     However, a discretization configuration is required if a discrete distance function is used.
+
+    If a profile function (see the profiles module) matches the configuration, the
+    returned anomaly detector uses it to compute all anomaly scores at once.
+    Otherwise, local contexts with sliding window reference filters are built
+    incrementally (see contexts.IncrementalLocalContext).
+
+    If windows are converted to another representation, and the evaluation and
+    reference filters are sliding windows with step 1 (or table_config is
+    given), the converted windows of each sequence are kept in a table shared
+    by both filters (see representations.RepresentationTable, which takes the
+    options in table_config). The table does not affect the anomaly scores.
     """
     evaluation_filter = filters.get_evaluation_filter(**evaluation_filter_config)
     context = contexts.get_context(**context_config)
@@ -36,10 +63,73 @@ def create_anomaly_detector(evaluation_filter_config, context_config, reference_
     aggregator = aggregators.get_aggregator(**aggregator_config)
 
     converter = _get_filter_wrapper(evaluator_config, representation_config, discretization_config)
-    evaluation_filter = representations.wrap_evaluation_filter(evaluation_filter, converter)
-    reference_filter = representations.wrap_reference_filter(reference_filter, converter)
+    table = _get_representation_table(evaluation_filter, reference_filter, converter, table_config)
+    if converter is not None:
+        evaluation_filter = representations.wrap_evaluation_filter(evaluation_filter, converter,
+                                                                   table)
+        reference_filter = representations.wrap_reference_filter(reference_filter, converter,
+                                                                 table)
+
+    profile_function = profiles.get_profile_function(
+        evaluation_filter_config, context_config, reference_filter_config,
+        evaluator_config, representation_config, discretization_config)
+
+    incremental_context = None
+    if profile_function is None:
+        incremental_context = _get_incremental_context(context_config, reference_filter_config,
+                                                       converter, table)
+
+    # the configuration is copied, since callers often reuse (and modify) the same dicts
+    config = copy_config({
+        'evaluation_filter_config': evaluation_filter_config,
+        'context_config': context_config,
+        'reference_filter_config': reference_filter_config,
+        'evaluator_config': evaluator_config,
+        'aggregator_config': aggregator_config,
+        'representation_config': representation_config,
+        'discretization_config': discretization_config
+    })
+
+    return AnomalyDetector(evaluation_filter, context, reference_filter, evaluator, aggregator,
+                           profile_function, incremental_context, config, table)
+
+
+def _get_representation_table(evaluation_filter, reference_filter, converter, table_config=None):
+    """
+    Returns the representation table shared by the given (unwrapped) filters,
+    or None if windows are not converted, or if the table is not configured
+    and the filters do not both have step 1.
+    """
+    if converter is None:
+        return None
+    if table_config is None and (getattr(evaluation_filter, 'step', None) != 1 or
+                                 getattr(reference_filter, 'step', None) != 1):
+        return None
+
+    return representations.RepresentationTable(converter, **(table_config or {}))
+
+
+def _get_incremental_context(context_config, reference_filter_config, converter=None,
+                             table=None):
+    """
+    Returns an incremental context equivalent to the given local context and
+    sliding window reference filter, or None if the configuration is not of
+    that form.
+    """
+    if reference_filter_config.get('method', 'sliding_window') != 'sliding_window':
+        return None
+    if context_config.get('method', 'local_symmetric') not in ('local_symmetric', 'local_asymmetric'):
+        return None
 
-    return AnomalyDetector(evaluation_filter, context, reference_filter, evaluator, aggregator)
+    left_width, right_width = contexts.get_context_widths(**context_config)
+
+    return contexts.IncrementalLocalContext(
+        left_width, right_width,
+        width=reference_filter_config['width'],
+        step=reference_filter_config.get('step', 1),
+        converter=converter,
+        table=table
+    )
 
 
 def _get_filter_wrapper(evaluator_config, representation_config=None, discretization_config=None):
@@ -49,8 +139,16 @@ def _get_filter_wrapper(evaluator_config, representation_config=None, discretiza
     discretization_config.
     Note that if the evaluator requires symbolic input, a discretization wrapper is
     automatically applied.
+    Returns None if no conversion is required.
+
+    Packed SAX words (see representations.sax.pack_sax_words) are only keys,
+    which the distances do not accept, so they are rejected with a ValueError.
     """
-    wrapper = lambda x: x
+    for config in (representation_config, discretization_config):
+        if config is not None and config.get('output') == 'packed':
+            raise ValueError(_PACKED_OUTPUT_ERROR)
+
+    wrapper = None
 
     if representation_config is not None:
         r = representations.get_representation_converter(**representation_config)
@@ -58,8 +156,9 @@ def _get_filter_wrapper(evaluator_config, representation_config=None, discretiza
 
     if evaluators.requires_symbolic_input(evaluator_config):
         r = representations.get_representation_converter(**discretization_config)
-        new_wrapper = lambda x: r(wrapper(x))
-        return new_wrapper
+        if wrapper is None:
+            return r
+        return representations.chain_converters(wrapper, r)
 
     return wrapper
 
@@ -67,12 +166,18 @@ def _get_filter_wrapper(evaluator_config, representation_config=None, discretiza
 class AnomalyDetector(object):
 
     def __init__(self, evaluation_filter, context_function, reference_filter,
-                 evaluator, aggregator):
+                 evaluator, aggregator, profile_function=None, incremental_context=None,
+                 config=None, representation_table=None):
         self.reference_filter = reference_filter
         self.context_function = context_function
         self.evaluation_filter = evaluation_filter
         self.evaluator = evaluator
         self.aggregator = aggregator
+        self.profile_function = profile_function
+        self.incremental_context = incremental_context
+        self.representation_table = representation_table
+        # the create_anomaly_detector keyword arguments, if known (see the configuration module)
+        self.config = config
 
         logger.info(_INIT_MESSAGE % {
             'reference_filter': reference_filter,
@@ -82,20 +187,41 @@ class AnomalyDetector(object):
             'aggregator': evaluation_filter,
         })
 
-    def evaluate(self, evaluation_sequence, progress_callback=None):
+    def evaluate(self, evaluation_sequence, progress_callback=None, batch_size=None,
+                 processes=None):
+        """
+        Evaluates the given sequence and returns its anomaly vector.
+
+        If batch_size is given, the sequence is evaluated in blocks of (at most)
+        batch_size windows, which lets components that support it (see
+        _evaluate_batches) process whole blocks at once. This produces the same
+        anomaly vector as the regular evaluation.
+
+        If processes is larger than 1, the sequence is split into shards which
+        are evaluated in a pool of that many processes (see _evaluate_shards).
+
+        If the detector has a profile function, it is used to compute all
+        scores at once instead.
+        """
         logger.debug(_EVALUATE_MESSAGE % evaluation_sequence)
 
         # since the aggregator keeps an internal buffer, it must be reset here
         self.aggregator.init(len(evaluation_sequence))
+        self._init_representation_table()
 
-        for sequence, start, end in self.evaluation_filter(evaluation_sequence):
-            context = self.context_function(evaluation_sequence, start, end)
-            reference_set = self.reference_filter(context)
-            score = self.evaluator.evaluate(sequence, reference_set)
-            self.aggregator.add_score(score, start, end)
+        if self.incremental_context is not None:
+            self.incremental_context.init(evaluation_sequence)
 
-            if progress_callback is not None:
-                progress_callback(end / len(evaluation_sequence - (end - start)))
+        if self.profile_function is not None:
+            scores, starts, ends = self.profile_function(evaluation_sequence)
+            _add_scores(self.aggregator, scores, starts.tolist(), ends.tolist())
+        elif processes is not None and int(processes) > 1:
+            self._evaluate_shards(evaluation_sequence, int(processes), batch_size,
+                                  progress_callback)
+        elif batch_size is not None and hasattr(self.evaluation_filter, 'batch'):
+            self._evaluate_batches(evaluation_sequence, int(batch_size), progress_callback)
+        else:
+            self._evaluate_windows(evaluation_sequence, progress_callback)
 
         anomaly_scores = self.aggregator.get_aggregated_scores()
 
@@ -105,3 +231,327 @@ class AnomalyDetector(object):
         logger.debug(_ANOMALY_SCORES_MESSAGE % anomaly_scores)
 
         return anomaly_scores
+
+    def evaluate_stream(self, chunks, batch_size=None):
+        """
+        Evaluates a sequence given as an iterable of chunks (sequences of items),
+        and generates arrays containing the anomaly scores of consecutive items as
+        soon as no future window can cover them. Concatenating the generated arrays
+        gives the same anomaly vector as evaluate.
+
+        Only the items required by the remaining windows and their contexts are
+        kept in memory, so unbounded input can be evaluated. This requires an
+        evaluation filter with known width and step, and a local or static context.
+        batch_size is used as in evaluate.
+        """
+        width, step = self._get_window_shape()
+        left_width, right_width = self._get_context_widths()
+        if left_width is None or right_width is None:
+            raise NotImplementedError(_STREAM_CONTEXT_ERROR)
+
+        buffer = numpy.empty(0)
+        buffer_start = 0
+        next_start = 0
+        finalized = 0
+        pending = (numpy.empty(0), numpy.empty(0, dtype=int), numpy.empty(0, dtype=int))
+        reference_set = None
+        self._init_representation_table()
+
+        # None marks the end of the stream
+        for chunk in itertools.chain(chunks, [None]):
+            if chunk is not None:
+                buffer = numpy.concatenate((buffer, numpy.asarray(chunk, dtype=float)))
+            available = buffer_start + len(buffer)
+
+            # windows can be evaluated once their right context is complete
+            last_start = available - width
+            if chunk is not None:
+                last_start -= right_width
+
+            if last_start >= next_start:
+                count = (last_start - next_start) // step + 1
+                segment = buffer[next_start - buffer_start:
+                                 next_start + (count - 1) * step + width - buffer_start]
+
+                if reference_set is None and getattr(self.context_function, 'IS_STATIC', False):
+                    reference_set = self._get_reference_set(buffer, 0, width - 1, True)
+
+                scores, starts, ends = self._evaluate_segment(
+                    buffer, segment, next_start - buffer_start, batch_size, reference_set)
+                starts += buffer_start
+                ends += buffer_start
+                pending = tuple(numpy.concatenate(arrays)
+                                for arrays in zip(pending, (scores, starts, ends)))
+                next_start += count * step
+
+            # items before the next window start can not be covered by future windows
+            final_end = min(next_start, available) if chunk is not None else available
+            if final_end > finalized:
+                yield self._aggregate_stream_scores(pending, finalized, final_end)
+                finalized = final_end
+                keep = pending[2] >= finalized
+                pending = tuple(array[keep] for array in pending)
+
+            drop = min(len(buffer), max(0, next_start - left_width) - buffer_start)
+            if drop > 0:
+                buffer = buffer[drop:]
+                buffer_start += drop
+
+    def _evaluate_shards(self, evaluation_sequence, processes, batch_size=None,
+                         progress_callback=None):
+        """
+        Splits the windows of the sequence into contiguous shards and evaluates
+        them in a pool of processes. Each process only receives the part of the
+        sequence covered by the windows of its shard and their contexts, and
+        returns the state of its aggregator, which is merged into the aggregator
+        of this detector.
+
+        Worker processes are forked, and inherit this detector and the sequence
+        through module globals, so that neither has to be pickled.
+        """
+        global _shard_detector, _shard_sequence
+
+        width, step = self._get_window_shape()
+        sequence_length = len(evaluation_sequence)
+        window_count = max(0, (sequence_length - width) // step + 1)
+        shard_count = min(window_count, processes * _SHARDS_PER_PROCESS)
+        if shard_count == 0:
+            return
+
+        # each shard is given by the indices of its first and last window
+        bounds = numpy.linspace(0, window_count, shard_count + 1).astype(int)
+        shards = [(first, last, batch_size) for first, last in zip(bounds[:-1], bounds[1:])]
+
+        _shard_detector = self
+        _shard_sequence = numpy.asarray(evaluation_sequence, dtype=float)
+        pool = multiprocessing.Pool(processes)
+        try:
+            for i, state in enumerate(pool.imap_unordered(_evaluate_shard, shards)):
+                self.aggregator.merge_state(state)
+                if progress_callback is not None:
+                    progress_callback((i + 1) / len(shards))
+        finally:
+            pool.terminate()
+            pool.join()
+            _shard_detector = None
+            _shard_sequence = None
+
+    def _get_shard_state(self, evaluation_sequence, first_window, last_window, batch_size=None):
+        """
+        Evaluates the windows with indices in [first_window, last_window) and returns
+        the resulting aggregator state. Only the items of the sequence covered by the
+        windows and their contexts (the halo) are used.
+        """
+        width, step = self._get_window_shape()
+        left_width, right_width = self._get_context_widths()
+
+        first_start = first_window * step
+        last_end = (last_window - 1) * step + width - 1
+
+        # contexts that are unbounded on either side require the whole sequence on that side
+        halo_start = 0 if left_width is None else max(0, first_start - left_width)
+        halo_end = len(evaluation_sequence)
+        if right_width is not None:
+            halo_end = min(halo_end, last_end + right_width + 1)
+
+        shard = evaluation_sequence[halo_start:halo_end]
+        segment = shard[first_start - halo_start:last_end + 1 - halo_start]
+
+        reference_set = None
+        self._init_representation_table()
+        if getattr(self.context_function, 'IS_STATIC', False):
+            reference_set = self._get_reference_set(shard, 0, width - 1, True)
+
+        scores, starts, ends = self._evaluate_segment(shard, segment, first_start - halo_start,
+                                                      batch_size, reference_set)
+
+        self.aggregator.init(len(evaluation_sequence))
+        _add_scores(self.aggregator, scores, (starts + halo_start).tolist(),
+                    (ends + halo_start).tolist())
+        return self.aggregator.get_state()
+
+    def _evaluate_segment(self, buffer, segment, offset, batch_size, reference_set):
+        """
+        Evaluates the windows of a segment of the buffer (e.g. of a stream or a
+        shard), starting at index offset of the buffer, and returns their scores,
+        starts and ends (in the buffer).
+        """
+        if self.incremental_context is not None:
+            self.incremental_context.init(buffer)
+
+        if batch_size is not None and hasattr(self.evaluation_filter, 'batch'):
+            blocks = self.evaluation_filter.batch(segment, int(batch_size))
+        else:
+            blocks = (([window], [start], [end])
+                      for window, start, end in self.evaluation_filter(segment))
+
+        all_scores, all_starts, all_ends = [], [], []
+        for windows, starts, ends in blocks:
+            starts = [start + offset for start in starts]
+            ends = [end + offset for end in ends]
+            all_scores.append(self._evaluate_block(buffer, windows, starts, ends, reference_set))
+            all_starts.extend(starts)
+            all_ends.extend(ends)
+
+        if not all_scores:
+            return numpy.empty(0), numpy.empty(0, dtype=int), numpy.empty(0, dtype=int)
+        return (numpy.concatenate(all_scores), numpy.array(all_starts, dtype=int),
+                numpy.array(all_ends, dtype=int))
+
+    def _aggregate_stream_scores(self, pending, start, end):
+        """
+        Returns the aggregated scores of the items in [start, end), given the
+        scores, starts and ends of (at least) all windows covering them.
+        """
+        scores, starts, ends = pending
+        covering = (starts < end) & (ends >= start)
+        scores, starts, ends = scores[covering], starts[covering], ends[covering]
+
+        # the windows are aggregated over their whole extent, so that windows of
+        # the same width keep the same width, and the items are sliced afterwards
+        first = min(start, starts.min()) if len(starts) else start
+        last = max(end, ends.max() + 1) if len(ends) else end
+        self.aggregator.init(last - first)
+        _add_scores(self.aggregator, scores, (starts - first).tolist(), (ends - first).tolist())
+        aggregated = self.aggregator.get_aggregated_scores()
+        return numpy.asarray(aggregated[start - first:end - first], dtype=float)
+
+    def _init_representation_table(self):
+        """
+        Empties the representation table (if any), since the windows of sequences
+        it contains may have changed since they were converted.
+        """
+        if self.representation_table is not None:
+            self.representation_table.init()
+
+    def _get_window_shape(self):
+        width = getattr(self.evaluation_filter, 'width', None)
+        step = getattr(self.evaluation_filter, 'step', None)
+        if width is None or step is None:
+            raise NotImplementedError(_WINDOW_SHAPE_ERROR)
+        return width, step
+
+    def _get_context_widths(self):
+        """
+        Returns the number of items the context of a window may extend to the left
+        and right of it, where None means that the context is unbounded.
+        """
+        if getattr(self.context_function, 'IS_STATIC', False):
+            return 0, 0
+
+        return (getattr(self.context_function, 'left_width', None),
+                getattr(self.context_function, 'right_width', None))
+
+    def _evaluate_windows(self, evaluation_sequence, progress_callback=None):
+        """
+        Evaluates the sequence one window at a time.
+        If the context function is static, the reference set is only computed once.
+        """
+        is_static = getattr(self.context_function, 'IS_STATIC', False)
+        reference_set = None
+
+        for sequence, start, end in self.evaluation_filter(evaluation_sequence):
+            if reference_set is None or not is_static:
+                reference_set = self._get_reference_set(evaluation_sequence, start, end,
+                                                        is_static)
+            score = self.evaluator.evaluate(sequence, reference_set)
+            self.aggregator.add_score(score, start, end)
+
+            if progress_callback is not None:
+                progress_callback(end / len(evaluation_sequence - (end - start)))
+
+    def _evaluate_batches(self, evaluation_sequence, batch_size, progress_callback=None):
+        """
+        Evaluates the sequence in blocks of windows, as produced by the batch
+        method of the evaluation filter.
+
+        Each stage works on whole blocks when possible, and falls back to
+        processing one window at a time otherwise:
+          * if the context function is static (IS_STATIC), the reference set
+            is only computed once, and evaluators with an evaluate_batch method
+            score the entire block in one call.
+          * aggregators with an add_scores method receive the scores of the
+            entire block in one call.
+        """
+        reference_set = None
+
+        for windows, starts, ends in self.evaluation_filter.batch(evaluation_sequence, batch_size):
+            starts = starts.tolist()
+            ends = ends.tolist()
+
+            if reference_set is None and getattr(self.context_function, 'IS_STATIC', False):
+                reference_set = self._get_reference_set(evaluation_sequence, starts[0], ends[0],
+                                                        True)
+
+            scores = self._evaluate_block(evaluation_sequence, windows, starts, ends, reference_set)
+            _add_scores(self.aggregator, scores, starts, ends)
+
+            if progress_callback is not None:
+                progress_callback(ends[-1] / len(evaluation_sequence))
+
+    def _evaluate_block(self, evaluation_sequence, windows, starts, ends, reference_set=None):
+        """
+        Returns the anomaly scores of a block of windows.
+        If reference_set is given, it is used for all windows in the block.
+        """
+        evaluate_batch = getattr(self.evaluator, 'evaluate_batch', None)
+        if reference_set is not None and evaluate_batch is not None:
+            return evaluate_batch(windows, reference_set)
+
+        # scores are collected in a list, since evaluators may return arrays
+        # (see the sweep module)
+        scores = []
+        for window, start, end in zip(windows, starts, ends):
+            if reference_set is None:
+                references = self._get_reference_set(evaluation_sequence, start, end)
+                scores.append(self.evaluator.evaluate(window, references))
+            else:
+                scores.append(self.evaluator.evaluate(window, reference_set))
+
+        return numpy.array(scores, dtype=float)
+
+    def _get_reference_set(self, evaluation_sequence, start, end, reusable=False):
+        """
+        Returns the reference set of the given subsequence.
+        If reusable is set, the reference set can be iterated over repeatedly.
+
+        If the context function and reference filter support it, the context is
+        passed as index ranges (see the contexts module), so that the reference
+        set consists of views into the sequence rather than of copies.
+        """
+        if self.incremental_context is not None:
+            return self.incremental_context.get_reference_set(start, end)
+
+        if (hasattr(self.context_function, 'ranges') and
+                hasattr(self.reference_filter, 'from_ranges')):
+            context_ranges = self.context_function.ranges(evaluation_sequence, start, end)
+            return self.reference_filter.from_ranges(context_ranges)
+
+        context = self.context_function(evaluation_sequence, start, end)
+        reference_set = self.reference_filter(context)
+
+        if reusable:
+            return list(reference_set)
+        return reference_set
+
+
+def _evaluate_shard(shard):
+    """
+    Evaluates a shard in a worker process (see AnomalyDetector._evaluate_shards).
+    """
+    first_window, last_window, batch_size = shard
+    return _shard_detector._get_shard_state(_shard_sequence, first_window, last_window,
+                                            batch_size)
+
+
+def _add_scores(aggregator, scores, starts, ends):
+    """
+    Adds a block of scores to the aggregator, in a single call if the
+    aggregator supports it.
+    """
+    add_scores = getattr(aggregator, 'add_scores', None)
+    if add_scores is not None:
+        add_scores(scores, starts, ends)
+    else:
+        for score, start, end in zip(scores, starts, ends):
+            aggregator.add_score(score, start, end)
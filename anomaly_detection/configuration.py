@@ -0,0 +1,49 @@
+"""
+Utilities for anomaly detector configurations, i.e. the configuration dicts
+passed to create_anomaly_detector.
+"""
+import hashlib
+
+import numpy
+
+
+def copy_config(config):
+    """
+    Returns a copy of the given configuration, in which dicts, lists and tuples
+    are copied and all other values (in particular arrays, such as reference
+    sequences, which may be large) are shared with the original.
+    """
+    if isinstance(config, dict):
+        return dict((key, copy_config(value)) for key, value in config.items())
+    if isinstance(config, (list, tuple)):
+        return type(config)(copy_config(value) for value in config)
+    return config
+
+
+def get_canonical_config(config):
+    """
+    Returns a canonical, hashable representation of the given configuration,
+    in which dicts are replaced by sorted tuples of items, lists by tuples and
+    arrays (e.g. reference sequences) by their type, shape and SHA-1 digest.
+    Items with None values are left out of dicts, since None stands for an
+    omitted (optional) configuration.
+    """
+    if isinstance(config, dict):
+        return tuple(sorted((key, get_canonical_config(value))
+                            for key, value in config.items() if value is not None))
+    if isinstance(config, (list, tuple)):
+        return tuple(get_canonical_config(value) for value in config)
+    if isinstance(config, numpy.ndarray):
+        array = numpy.ascontiguousarray(config)
+        return ('ndarray', array.dtype.str, array.shape, hashlib.sha1(array).hexdigest())
+    if isinstance(config, numpy.generic):
+        return config.item()
+    return config
+
+
+def get_config_hash(config):
+    """
+    Returns the SHA-1 hex digest of the canonical representation of the
+    given configuration.
+    """
+    return hashlib.sha1(repr(get_canonical_config(config))).hexdigest()
@@ -2,6 +2,7 @@ from local_context import get_local_symmetric_context_function, get_local_asymme
 from novelty_context import novelty_context_function
 from trivial_context import trivial_context_function
 from semisupervised_context import get_semisupervised_context_function
+from incremental_local_context import IncrementalLocalContext
 
 
 def get_context(
@@ -23,3 +24,20 @@ def get_context(
         'trivial': trivial_context_function,
         'semi-supervised': get_semisupervised_context_function(reference_sequence)
     }[method]
+
+
+def get_context_widths(method='local_symmetric', width='100', left_width=100, right_width=100,
+                       **kwargs):
+    """
+    Returns the (left, right) widths of the given context as a tuple, where None
+    denotes that the context is unbounded in that direction.
+    Returns None if the context is not a trivial or local context.
+    """
+    if method == 'local_symmetric':
+        return int(width), int(width)
+    elif method == 'local_asymmetric':
+        return int(left_width), int(right_width)
+    elif method == 'trivial':
+        return None, None
+
+    return None
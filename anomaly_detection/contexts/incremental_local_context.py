@@ -0,0 +1,201 @@
+import heapq
+
+import numpy
+
+from verify import verify_subsequence
+from ..filters.window_set import WindowSet, is_numeric_window
+
+
+class IncrementalLocalContext(object):
+    """
+    Builds the reference sets of local contexts incrementally.
+
+    The reference set of a subsequence is the same as that obtained by applying
+    a sliding window reference filter (with the given width and step) to the
+    local context of the subsequence (with the given widths), followed by the
+    given converter.
+
+    The subsequences are assumed to be visited in order of increasing start
+    index (as generated by an evaluation filter). In this case, consecutive
+    reference sets share most of their windows, and only the windows that
+    enter or leave the context need to be processed. Each window is converted
+    once, and reused for as long as it might appear in a later context. If a
+    representation table is given (see representations.RepresentationTable),
+    converted windows are looked up in it instead of being converted with the
+    converter.
+    """
+
+    def __init__(self, left_width, right_width, width, step=1, converter=None, table=None):
+        self._left_width = int(left_width)
+        self._right_width = int(right_width)
+        self._width = int(width)
+        self._step = int(step)
+        self._converter = converter
+        self._table = table
+        self.init([])
+
+    def init(self, sequence):
+        """
+        Resets the context to the given sequence.
+        """
+        self._sequence = sequence
+        self._windows = {}
+        self._window_starts = []
+        self._left = _WindowBuffer(self._step)
+        self._right = _WindowBuffer(self._step)
+
+    def get_reference_set(self, subsequence_start, subsequence_end):
+        """
+        Returns the reference set of the given subsequence, as a WindowSet.
+        """
+        verify_subsequence(self._sequence, subsequence_start, subsequence_end)
+
+        # these are the same context bounds as in _get_local_context_ranges
+        left_context_start = max(0, subsequence_start - self._left_width)
+        left_context_end = max(0, subsequence_start - 1)
+
+        sequence_end = len(self._sequence) - 1
+        right_context_start = min(sequence_end, subsequence_end + 1)
+        right_context_end = min(sequence_end, subsequence_end + self._right_width)
+
+        self._update(self._left, left_context_start, left_context_end)
+        self._update(self._right, right_context_start, right_context_end)
+        self._evict(left_context_start)
+
+        return WindowSet([self._left.get_windows(), self._right.get_windows()])
+
+    def _update(self, buffer, context_start, context_end):
+        """
+        Updates the buffer to contain the windows in [context_start, context_end).
+        """
+        first = context_start
+        last = first + ((context_end - first - self._width) // self._step) * self._step
+
+        # the buffer can only be reused if the windows are aligned,
+        # and the context has not moved backwards
+        if buffer.first is not None and ((first - buffer.first) % self._step != 0 or
+                                         buffer.last > last):
+            buffer.clear()
+
+        buffer.remove_before(first)
+
+        start = first if buffer.last is None else max(first, buffer.last + self._step)
+        for window_start in range(start, last + 1, self._step):
+            buffer.append(window_start, self._get_window(window_start))
+
+    def _get_window(self, start):
+        """
+        Returns the converted window starting at the given index,
+        converting it if necessary.
+        """
+        if start not in self._windows:
+            if self._table is not None:
+                window = self._table.get_window(self._sequence, self._width, start)
+            else:
+                window = self._sequence[start:start + self._width]
+                if self._converter is not None:
+                    window = self._converter(window)
+
+            self._windows[start] = window
+            heapq.heappush(self._window_starts, start)
+
+        return self._windows[start]
+
+    def _evict(self, start):
+        """
+        Evicts all converted windows starting before the given index.
+        """
+        while self._window_starts and self._window_starts[0] < start:
+            del self._windows[heapq.heappop(self._window_starts)]
+
+
+class _WindowBuffer(object):
+    """
+    Buffer containing a sequence of windows whose start indices are spaced
+    by the given step, where windows are appended at the end and removed from
+    the front.
+
+    Numeric windows are stored as rows of a 2D array, where the buffered
+    windows always form a contiguous block. This block is moved to the
+    front of the array when the array is full, which takes amortized
+    constant time per window.
+    """
+
+    def __init__(self, step=1):
+        self._step = step
+        self.clear()
+
+    def clear(self):
+        self.first = None
+        self.last = None
+        self._windows = None
+        self._head = 0
+        self._tail = 0
+
+    def append(self, start, window):
+        if self._windows is None:
+            self._allocate(window)
+
+        if self._tail == len(self._windows):
+            self._make_room()
+
+        self._windows[self._tail] = window
+        self._tail += 1
+
+        if self.first is None:
+            self.first = start
+        self.last = start
+
+    def remove_before(self, start):
+        """
+        Removes all windows starting before the given index.
+        """
+        if self.first is None or start <= self.first:
+            return
+
+        if self.last < start:
+            self.clear()
+            return
+
+        count = (start - self.first + self._step - 1) // self._step
+        self._head += count
+        self.first += count * self._step
+
+    def get_windows(self):
+        if self._windows is None:
+            return []
+        return self._windows[self._head:self._tail]
+
+    def _allocate(self, window, capacity=16):
+        if is_numeric_window(window):
+            self._windows = numpy.empty((capacity, len(window)), dtype=window.dtype)
+        else:
+            self._windows = [None] * capacity
+
+    def _make_room(self):
+        """
+        Moves the buffered windows to the front of the storage,
+        and doubles the size of the storage if it is more than half full.
+        """
+        count = self._tail - self._head
+        capacity = len(self._windows)
+        if 2 * count > capacity:
+            capacity *= 2
+
+        self._windows = _move_to_front(self._windows, self._head, self._tail, capacity)
+
+        self._head = 0
+        self._tail = count
+
+
+def _move_to_front(storage, head, tail, capacity):
+    """
+    Returns a storage of the given capacity, whose first elements are
+    storage[head:tail].
+    """
+    if isinstance(storage, list):
+        return storage[head:tail] + [None] * (capacity - tail + head)
+
+    moved = numpy.empty((capacity,) + storage.shape[1:], dtype=storage.dtype)
+    moved[:tail - head] = storage[head:tail]
+    return moved
@@ -1,4 +1,5 @@
 from verify import verify_subsequence
+from ranges import slice_ranges
 
 
 def get_local_symmetric_context_function(width):
@@ -15,12 +16,25 @@ def get_local_asymmetric_context_function(left_width, right_width):
     Returns a function that takes a sequence S and the indices I of a subseqeunce and returns the
     local assymetric context of that subsequence with the specified widths, i.e. the n items in S
     preceding I and the k items succeding I, where n=left_width and k=right_width.
+
+    The returned function has a 'ranges' attribute, which returns the context as a
+    list of (sequence, start, stop) tuples rather than as slices, and 'left_width'
+    and 'right_width' attributes.
     """
     left_width = int(left_width)
     right_width = int(right_width)
 
     def get_local_context(sequence, subsequence_start, subsequence_end):
-        return _get_local_context(
+        return slice_ranges(_get_local_context_ranges(
+            sequence,
+            subsequence_start,
+            subsequence_end,
+            left_width,
+            right_width
+        ))
+
+    def get_local_context_ranges(sequence, subsequence_start, subsequence_end):
+        return _get_local_context_ranges(
             sequence,
             subsequence_start,
             subsequence_end,
@@ -28,10 +42,15 @@ def get_local_asymmetric_context_function(left_width, right_width):
             right_width
         )
 
+    get_local_context.ranges = get_local_context_ranges
+    get_local_context.left_width = left_width
+    get_local_context.right_width = right_width
+
     return get_local_context
 
 
-def _get_local_context(sequence, subsequence_start, subsequence_end, left_width, right_width):
+def _get_local_context_ranges(sequence, subsequence_start, subsequence_end, left_width,
+                              right_width):
     
     verify_subsequence(sequence, subsequence_start, subsequence_end)
     
@@ -42,4 +61,5 @@ def _get_local_context(sequence, subsequence_start, subsequence_end, left_width,
     right_context_start = min(sequence_end, subsequence_end + 1)
     right_context_end = min(sequence_end, subsequence_end + right_width)
 
-    return [sequence[left_context_start:left_context_end], sequence[right_context_start:right_context_end]]
+    return [(sequence, left_context_start, left_context_end),
+            (sequence, right_context_start, right_context_end)]
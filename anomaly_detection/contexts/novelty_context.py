@@ -1,14 +1,26 @@
 from verify import verify_subsequence
+from ranges import slice_ranges
 
 
-def novelty_context_function(sequence, subseqence_start, subsequence_end):
+def novelty_context_function(sequence, subsequence_start, subsequence_end):
     """
     Takes a sequence S and the indices I of a subseqeunce and returns the
     novelty context of that subsequence, i.e. all elements preceding I in S.
     """
+    return slice_ranges(novelty_context_ranges(sequence, subsequence_start, subsequence_end))
+
+
+def novelty_context_ranges(sequence, subsequence_start, subsequence_end):
+    """
+    Returns the novelty context of the subsequence as a list of
+    (sequence, start, stop) tuples, rather than as slices.
+    """
     verify_subsequence(sequence, subsequence_start, subsequence_end)
     
-    context_start = max(0, subsequence_start - left_width)
+    context_start = 0
     context_end = max(0, subsequence_start - 1)
 
-    return [sequence[context_start, context_end]]
+    return [(sequence, context_start, context_end)]
+
+
+novelty_context_function.ranges = novelty_context_ranges
@@ -0,0 +1,6 @@
+def slice_ranges(ranges):
+    """
+    Takes a list of (sequence, start, stop) tuples and returns a list
+    containing the corresponding slices sequence[start:stop].
+    """
+    return [sequence[start:stop] for sequence, start, stop in ranges]
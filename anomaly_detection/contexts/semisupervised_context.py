@@ -1,5 +1,14 @@
 def get_semisupervised_context_function(reference_sequence):
     """
     Returns the semi-supervised context, which is always trivially the reference sequence.
+
+    Since the context does not depend on the subsequence, the returned function
+    is marked as static (IS_STATIC), which allows reference sets to be reused
+    between subsequences.
     """
-    return lambda seq, subseq_start, subseq_end: reference_sequence
+    context_function = lambda seq, subseq_start, subseq_end: [reference_sequence]
+    context_function.ranges = lambda seq, subseq_start, subseq_end: [
+        (reference_sequence, 0, len(reference_sequence))
+    ]
+    context_function.IS_STATIC = True
+    return context_function
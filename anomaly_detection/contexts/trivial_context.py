@@ -1,4 +1,5 @@
 from verify import verify_subsequence
+from ranges import slice_ranges
 
 
 def trivial_context_function(sequence, subsequence_start, subsequence_end):
@@ -6,6 +7,14 @@ def trivial_context_function(sequence, subsequence_start, subsequence_end):
     Takes a sequence S and the indices I of a subseqeunce and returns the
     trivial context of that subsequence, i.e. all other elements in S.
     """
+    return slice_ranges(trivial_context_ranges(sequence, subsequence_start, subsequence_end))
+
+
+def trivial_context_ranges(sequence, subsequence_start, subsequence_end):
+    """
+    Returns the trivial context of the subsequence as a list of
+    (sequence, start, stop) tuples, rather than as slices.
+    """
     verify_subsequence(sequence, subsequence_start, subsequence_end)
     
     left_context_start = 0
@@ -15,4 +24,8 @@ def trivial_context_function(sequence, subsequence_start, subsequence_end):
     right_context_start = min(sequence_end, subsequence_end + 1)
     right_context_end = sequence_end
 
-    return [sequence[left_context_start:left_context_end], sequence[right_context_start:right_context_end]]
+    return [(sequence, left_context_start, left_context_end),
+            (sequence, right_context_start, right_context_end)]
+
+
+trivial_context_function.ranges = trivial_context_ranges
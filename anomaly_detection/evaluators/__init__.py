@@ -4,15 +4,26 @@ import distances
 
 
 def get_evaluator(method='knn', k=3, distance_measure='euclidean',
-                  kernel="rbf", nu=0.1, gamma=0.1, **kwargs):
+                  kernel="rbf", nu=0.1, gamma=0.1, index=None, search=None,
+                  warping_window=None, alphabet_size=None, compression_ratio=1,
+                  numerosity_reduction=None, compressor=None, **kwargs):
     """
     Returns an evaluator object with the given parameters.
     See the individual evluators for configuration.
+    The kNN evaluator optionally takes an index (e.g. 'vp_tree', for metric
+    distances only), a search mode (e.g. 'early_abandoning') and a numerosity
+    reduction mode ('runs' or 'duplicates'), the DTW distance optionally takes
+    the width of its warping band (warping_window), the MINDIST distance takes
+    the SAX alphabet size (alphabet_size) and optionally the compression
+    ratio, and the CDM distance optionally takes a single compressor (see
+    distances.get_distance).
     """
-    distance = distances.get_distance(distance_measure, **kwargs)
+    distance = distances.get_distance(distance_measure, warping_window, alphabet_size,
+                                      compression_ratio, compressor, **kwargs)
 
     if method == 'knn':
-        evaluator = knn.KNNEvaluator(distance=distance, k=int(k), **kwargs)
+        evaluator = knn.KNNEvaluator(distance=distance, k=int(k), index=index, search=search,
+                                     numerosity_reduction=numerosity_reduction, **kwargs)
     elif method == 'svm':
         evaluator = svm.SVMEvaluator(**kwargs)
     else:
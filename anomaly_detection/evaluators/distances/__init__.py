@@ -1,17 +1,27 @@
 import scipy
 
-from continuous_distances import dynamic_time_warp, euclidean
-from discrete_distances import cdm
+from continuous_distances import dynamic_time_warp, get_dynamic_time_warp, euclidean
+from discrete_distances import cdm, get_cdm, get_mindist
 
 
-def get_distance(distance_measure='euclidean', **kwargs):
-
+def get_distance(distance_measure='euclidean', warping_window=None, alphabet_size=None,
+                 compression_ratio=1, compressor=None, **kwargs):
+    """
+    Returns the given distance measure.
+    For DTW, warping_window optionally gives the width of the warping band.
+    For MINDIST, alphabet_size gives the alphabet size of the SAX words, and
+    compression_ratio optionally gives the window width divided by the word length.
+    For CDM, compressor optionally selects a single compressor ('zlib' or 'bz2')
+    for estimating complexities (see get_cdm).
+    """
     if distance_measure == 'euclidean':
         distance = euclidean
     elif distance_measure == 'dtw':
-        distance = dynamic_time_warp
+        distance = get_dynamic_time_warp(warping_window)
     elif distance_measure == 'cdm':
-        distance = cdm
+        distance = get_cdm(compressor)
+    elif distance_measure == 'mindist':
+        distance = get_mindist(int(alphabet_size), compression_ratio)
     else:
         raise NotImplementedError('Unknown distance')
 
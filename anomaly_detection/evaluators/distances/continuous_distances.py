@@ -1,9 +1,31 @@
 """
 Distances for continuous time series go here.
+
+Distances may have a 'pairwise' attribute, which takes two 2D arrays
+(one sequence per row) and returns the matrix of distances between
+their rows.
+
+Distances may also have a 'rowwise' attribute, which computes the distances
+between corresponding sequences in two arrays (along their last axis),
+with broadcasting.
+
+The IS_METRIC attribute indicates whether a distance satisfies the triangle
+inequality, which metric indexes (see the knn module) rely on.
+
+Distances may also support early abandoning through a 'bounded' attribute,
+which takes a sequence, a 2D array of sequences and a threshold, and returns
+the distances to the rows of the array, where distances above the threshold
+may be replaced by infinity. Such distances may additionally have a
+'lower_bound' attribute, which takes a sequence, a 2D array of sequences and
+the output of the 'prepare_lower_bound' attribute for that array, and returns
+lower bounds of the distances to its rows.
 """
 
 import numpy
-import mlpy
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+# number of columns summed between early abandoning checks
+_ABANDON_STEP = 16
 
 
 def euclidean(a, b):
@@ -11,11 +33,233 @@ def euclidean(a, b):
     return numpy.linalg.norm(a - b)
 
 
-def dynamic_time_warp(a, b):
-    dtw = mlpy.Dtw()
-    distance = dtw.compute(a, b)
+def pairwise_euclidean(a, b):
+    """
+    Returns the matrix of Euclidean distances between the rows of a and the
+    rows of b, computed through a single matrix product.
+
+    The rows are centered around the mean row of b first, which does not
+    change the distances. The result is then accurate up to rounding errors on
+    the order of the squared norms of the centered rows, rather than of the
+    original rows (which are large for sequences with an offset).
+    """
+    a = numpy.asarray(a, dtype=float)
+    b = numpy.asarray(b, dtype=float)
+    assert a.shape[1] == b.shape[1]
+
+    mean = b.mean(axis=0) if len(b) else 0
+    a = a - mean
+    b = b - mean
+
+    squared_distances = numpy.dot(a, b.T)
+    squared_distances *= -2
+    squared_distances += numpy.einsum('ij,ij->i', a, a)[:, None]
+    squared_distances += numpy.einsum('ij,ij->i', b, b)[None, :]
+    numpy.maximum(squared_distances, 0, out=squared_distances)
+
+    return numpy.sqrt(squared_distances, out=squared_distances)
+
+
+def rowwise_euclidean(a, b):
+    """
+    Returns the Euclidean distances between the sequences along the last
+    axis of a and b.
+    """
+    differences = numpy.asarray(a, dtype=float) - b
+    return numpy.sqrt(numpy.einsum('...i,...i->...', differences, differences))
+
+
+def bounded_euclidean(a, b, threshold):
+    """
+    Returns the Euclidean distances between a and each row of b, where the
+    squared differences are summed a few columns at a time, and rows are
+    abandoned (with distance infinity) as soon as the partial sum exceeds
+    the square of the threshold.
+    """
+    a = numpy.asarray(a, dtype=float)
+    b = numpy.asarray(b, dtype=float)
+    assert b.ndim == 2 and b.shape[1] == len(a)
+
+    distances = numpy.repeat(float('inf'), len(b))
+    remaining = numpy.arange(len(b))
+
+    if threshold < float('inf'):
+        squared_threshold = threshold * threshold
+        partial_sums = numpy.zeros(len(b))
+
+        for lo in range(0, len(a), _ABANDON_STEP):
+            differences = b[remaining, lo:lo + _ABANDON_STEP] - a[lo:lo + _ABANDON_STEP]
+            partial_sums += numpy.einsum('ij,ij->i', differences, differences)
+
+            alive = partial_sums <= squared_threshold
+            if not alive.all():
+                remaining, partial_sums = remaining[alive], partial_sums[alive]
+                if len(remaining) == 0:
+                    return distances
+
+    # the remaining distances are recomputed as in rowwise_euclidean, so that
+    # they do not depend on the threshold
+    distances[remaining] = rowwise_euclidean(a, b[remaining])
+    return distances
+
+
+def get_row_norms(b):
+    """
+    Returns the norms of the rows of b.
+    """
+    b = numpy.asarray(b, dtype=float)
+    return numpy.sqrt(numpy.einsum('ij,ij->i', b, b))
+
+
+def lower_bound_euclidean(a, b, b_norms=None):
+    """
+    Returns lower bounds of the Euclidean distances between a and the rows of b,
+    given by the difference of their norms (through the triangle inequality).
+    """
+    if b_norms is None:
+        b_norms = get_row_norms(b)
+    a = numpy.asarray(a, dtype=float)
+    return numpy.abs(b_norms - numpy.sqrt(numpy.dot(a, a)))
+
+
+def get_dynamic_time_warp(warping_window=None):
+    """
+    Returns a dynamic time warping distance, restricted to a Sakoe-Chiba band
+    of the given width if warping_window is given.
+    The local cost of matching two elements is their absolute difference.
+
+    The returned distance supports early abandoning, and lower bounds through
+    LB_Kim and (for sequences of equal length) LB_Keogh.
+    """
+    if warping_window is None:
+        return dynamic_time_warp
+
+    warping_window = int(warping_window)
+
+    def distance(a, b):
+        return dynamic_time_warp(a, b, warping_window)
+
+    distance.bounded = lambda a, b, threshold: bounded_dynamic_time_warp(
+        a, b, threshold, warping_window)
+    distance.prepare_lower_bound = lambda b: get_envelopes(b, warping_window)
+    distance.lower_bound = lower_bound_dynamic_time_warp
+    distance.IS_DISCRETE = False
+    distance.IS_METRIC = False
     return distance
 
 
+def dynamic_time_warp(a, b, warping_window=None):
+    """
+    Returns the dynamic time warping distance between a and b, i.e. the
+    minimum total absolute difference over all warping paths, optionally
+    restricted to a Sakoe-Chiba band of width warping_window.
+    """
+    return bounded_dynamic_time_warp(a, [b], float('inf'), warping_window)[0]
+
+
+def bounded_dynamic_time_warp(a, b, threshold, warping_window=None):
+    """
+    Returns the dynamic time warping distances between a and each row of b,
+    computed for all rows at once.
+
+    The cumulative cost matrices are computed one row at a time, and rows of b
+    are abandoned as soon as all entries of the current row exceed the
+    threshold, in which case their distance is given as infinity.
+    """
+    a = numpy.asarray(a, dtype=float)
+    b = numpy.asarray(b, dtype=float)
+    assert b.ndim == 2
+
+    n, m = len(a), b.shape[1]
+    distances = numpy.repeat(float('inf'), len(b))
+    if n == 0 or m == 0:
+        return distances
+
+    if warping_window is None:
+        warping_window = max(n, m)
+    warping_window = max(int(warping_window), abs(n - m))
+
+    # the column with index j + 1 contains the cumulative costs for element j of
+    # the rows, and the first column is only used to start the path at (0, 0)
+    previous = numpy.empty((len(b), m + 1))
+    previous.fill(float('inf'))
+    previous[:, 0] = 0
+    remaining = numpy.arange(len(b))
+
+    for i in range(n):
+        lo = max(0, i - warping_window)
+        hi = min(m, i + warping_window + 1)
+
+        costs = numpy.abs(b[:, lo:hi] - a[i])
+        # best cost of entering each cell from the previous row
+        vertical = costs + numpy.minimum(previous[:, lo + 1:hi + 1], previous[:, lo:hi])
+        # cells can also be entered from the left, in which case the best cost is
+        # given by cumulative_costs[j] + min(vertical[l] - cumulative_costs[l]) for l <= j
+        cumulative_costs = numpy.cumsum(costs, axis=1)
+        vertical -= cumulative_costs
+        current = numpy.empty_like(previous)
+        current.fill(float('inf'))
+        current[:, lo + 1:hi + 1] = cumulative_costs + numpy.minimum.accumulate(vertical, axis=1)
+
+        # every path crosses row i, so rows whose minimum exceeds the threshold are abandoned
+        if threshold < float('inf'):
+            alive = current[:, lo + 1:hi + 1].min(axis=1) <= threshold
+            if not alive.all():
+                current, b, remaining = current[alive], b[alive], remaining[alive]
+                if len(remaining) == 0:
+                    return distances
+
+        previous = current
+
+    distances[remaining] = previous[:, m]
+    return distances
+
+
+def get_envelopes(b, warping_window=None):
+    """
+    Returns the upper and lower envelopes of the rows of b, as used by
+    LB_Keogh for the given warping window.
+    """
+    b = numpy.asarray(b, dtype=float)
+    if warping_window is None:
+        warping_window = b.shape[1]
+    size = 2 * int(warping_window) + 1
+
+    return (maximum_filter1d(b, size, axis=1, mode='nearest'),
+            minimum_filter1d(b, size, axis=1, mode='nearest'))
+
+
+def lower_bound_dynamic_time_warp(a, b, envelopes=None):
+    """
+    Returns lower bounds of the dynamic time warping distances between a and the
+    rows of b, as the maximum of LB_Kim (the cost of matching the first and last
+    elements) and, if the envelopes of b are given and the lengths are equal,
+    LB_Keogh (the distance of a to the envelopes).
+    """
+    a = numpy.asarray(a, dtype=float)
+    b = numpy.asarray(b, dtype=float)
+
+    lower_bounds = numpy.abs(b[:, 0] - a[0])
+    if len(a) > 1 or b.shape[1] > 1:
+        lower_bounds += numpy.abs(b[:, -1] - a[-1])
+
+    if envelopes is not None and len(a) == b.shape[1]:
+        upper, lower = envelopes
+        keogh = (numpy.maximum(a - upper, 0) + numpy.maximum(lower - a, 0)).sum(axis=1)
+        numpy.maximum(lower_bounds, keogh, out=lower_bounds)
+
+    return lower_bounds
+
+
 euclidean.IS_DISCRETE = False
+euclidean.IS_METRIC = True
+euclidean.pairwise = pairwise_euclidean
+euclidean.rowwise = rowwise_euclidean
+euclidean.bounded = bounded_euclidean
+euclidean.prepare_lower_bound = get_row_norms
+euclidean.lower_bound = lower_bound_euclidean
 dynamic_time_warp.IS_DISCRETE = False
+dynamic_time_warp.IS_METRIC = False
+dynamic_time_warp.bounded = bounded_dynamic_time_warp
+dynamic_time_warp.prepare_lower_bound = get_envelopes
+dynamic_time_warp.lower_bound = lower_bound_dynamic_time_warp
@@ -1,13 +1,28 @@
 """
 Distances for discrete time series go here.
 
+Distances may have a 'batch' attribute, which takes a sequence and a list of
+sequences, and returns the array of distances from the sequence to each of them.
+
 TODO: add more
 """
 
+import collections
 import zlib
 import bz2
 
+import numpy
+
+from ...representations.sax import get_normal_cdf_equipartition
+
 _CDM_INPUT_ERROR = 'Distance input type must be str. Got %s and %s'
+_LENGTH_ERROR = 'SAX words must have equal lengths. Got %d and %d'
+
+# squared MINDIST lookup tables by alphabet size, see get_mindist_table
+_mindist_tables = {}
+
+# number of complexities kept by the distances returned by get_cdm
+_COMPLEXITY_CACHE_SIZE = 1 << 16
 
 
 def cdm(a, b, a_complexity=None, b_complexity=None):
@@ -24,7 +39,7 @@ def cdm(a, b, a_complexity=None, b_complexity=None):
     if b_complexity is None:
         b_complexity = _estimate_kolmogorov_complexity(b)
 
-    ab_complexity = _estimate_kolmogorov_complexity(a.join(b))
+    ab_complexity = _estimate_kolmogorov_complexity(a + b)
 
     estimated_cdm = ab_complexity / float(a_complexity + b_complexity)
 
@@ -39,3 +54,161 @@ def _estimate_kolmogorov_complexity(s):
     return min(len(zlib.compress(str(s), 9)), len(bz2.compress(str(s))))
 
 cdm.IS_DISCRETE = True
+cdm.IS_METRIC = False
+
+# complexity estimators by compressor, see get_cdm
+_COMPLEXITY_ESTIMATORS = {
+    None: _estimate_kolmogorov_complexity,
+    'zlib': lambda s: len(zlib.compress(str(s), 9)),
+    'bz2': lambda s: len(bz2.compress(str(s))),
+}
+
+
+def get_cdm(compressor=None, cache_size=_COMPLEXITY_CACHE_SIZE):
+    """
+    Returns the CDM distance (see cdm), with complexities estimated through
+    the given compressor ('zlib' or 'bz2'), or through both by default.
+
+    The complexities of the last cache_size compared strings are cached, so
+    that strings compared repeatedly (e.g. the reference sets of consecutive
+    windows) are only compressed once. The concatenations of the compared
+    strings rarely repeat, so their complexities are not cached. The distance
+    has a 'batch' attribute.
+    """
+    if compressor not in _COMPLEXITY_ESTIMATORS:
+        raise NotImplementedError('Compressor %s not recognized' % compressor)
+
+    estimate = _COMPLEXITY_ESTIMATORS[compressor]
+    complexity = _ComplexityCache(estimate, cache_size)
+
+    def cached_cdm(a, b):
+        _check_cdm_inputs(a, b)
+        return estimate(a + b) / float(complexity(a) + complexity(b))
+
+    def batch_cdm(a, references):
+        """
+        Returns the array of CDM distances from a to each of the references.
+        """
+        a_complexity = complexity(a)
+        distances = []
+        for b in references:
+            _check_cdm_inputs(a, b)
+            distances.append(estimate(a + b) / float(a_complexity + complexity(b)))
+
+        return numpy.array(distances, dtype=float)
+
+    cached_cdm.IS_DISCRETE = True
+    cached_cdm.IS_METRIC = False
+    cached_cdm.batch = batch_cdm
+    return cached_cdm
+
+
+def _check_cdm_inputs(a, b):
+    ta = type(a)
+    tb = type(b)
+    assert ta == tb == str, _CDM_INPUT_ERROR % (ta, tb)
+
+
+class _ComplexityCache(object):
+    """
+    LRU cache of the estimated complexities of (at most size) strings,
+    keyed by their contents.
+    """
+
+    def __init__(self, estimate, size):
+        self._estimate = estimate
+        self._size = max(1, int(size))
+        self._complexities = collections.OrderedDict()
+
+    def __call__(self, s):
+        complexity = self._complexities.pop(s, None)
+        if complexity is None:
+            complexity = self._estimate(s)
+            if len(self._complexities) >= self._size:
+                self._complexities.popitem(last=False)
+
+        # (re)inserted strings are the most recently used
+        self._complexities[s] = complexity
+        return complexity
+
+
+def get_mindist(alphabet_size, compression_ratio=1):
+    """
+    Returns the MINDIST distance between SAX words (see representations.sax)
+    with the given alphabet size, given either as strings or as arrays of
+    symbol indices.
+
+    The distance is computed through a lookup table of the distances between
+    the breakpoints of the symbols (see get_mindist_table), scaled by the
+    square root of compression_ratio (the window width divided by the SAX word
+    length). It lower-bounds the Euclidean distance between the z-normalized
+    PAA representations of the windows, scaled in the same way, and thus (if
+    the words are as long as the windows) between the z-normalized windows.
+
+    The distance has pairwise and rowwise attributes (see the continuous
+    distances) for words given as arrays of symbol indices.
+    """
+    table = get_mindist_table(alphabet_size)
+    scale = float(compression_ratio)
+
+    def mindist(a, b):
+        a, b = _get_symbols(a), _get_symbols(b)
+        assert len(a) == len(b), _LENGTH_ERROR % (len(a), len(b))
+        return numpy.sqrt(scale * table[a, b].sum())
+
+    def pairwise_mindist(a, b):
+        """
+        Returns the matrix of MINDIST distances between the rows of a and the rows of b.
+        """
+        a, b = _get_symbols(a), _get_symbols(b)
+        squared_distances = numpy.zeros((len(a), len(b)))
+        for i in range(a.shape[1]):
+            squared_distances += table[a[:, i][:, None], b[:, i][None, :]]
+        return numpy.sqrt(scale * squared_distances)
+
+    def rowwise_mindist(a, b):
+        """
+        Returns the MINDIST distances between the words along the last axis of a and b.
+        """
+        return numpy.sqrt(scale * table[_get_symbols(a), _get_symbols(b)].sum(axis=-1))
+
+    mindist.IS_DISCRETE = True
+    mindist.IS_METRIC = False
+    mindist.pairwise = pairwise_mindist
+    mindist.rowwise = rowwise_mindist
+    return mindist
+
+
+def get_mindist_table(alphabet_size):
+    """
+    Returns the matrix of squared MINDIST distances between the symbols of SAX
+    words with the given alphabet size. Symbols i and j > i + 1 are at the
+    distance between the upper breakpoint of i and the lower breakpoint of j,
+    and adjacent symbols are at distance 0.
+
+    The tables are computed once per alphabet size.
+    """
+    if alphabet_size not in _mindist_tables:
+        breakpoints = get_normal_cdf_equipartition(alphabet_size)
+        symbols = numpy.arange(len(breakpoints) - 1)
+        lower, upper = numpy.minimum.outer(symbols, symbols), numpy.maximum.outer(symbols, symbols)
+
+        distances = numpy.zeros((len(symbols), len(symbols)))
+        apart = upper - lower > 1
+        distances[apart] = breakpoints[upper[apart]] - breakpoints[lower[apart] + 1]
+        _mindist_tables[alphabet_size] = distances ** 2
+
+    return _mindist_tables[alphabet_size]
+
+
+def _get_symbols(words):
+    """
+    Returns SAX words (a string, a list of strings, or arrays of symbol
+    indices) as an array of symbol indices.
+    """
+    if isinstance(words, str):
+        return numpy.frombuffer(words, dtype=numpy.uint8) - ord('a')
+    if isinstance(words, list) and words and isinstance(words[0], str):
+        symbols = numpy.frombuffer(''.join(words), dtype=numpy.uint8) - ord('a')
+        return symbols.reshape(len(words), -1)
+    return numpy.asarray(words).astype(int)
@@ -1 +1,2 @@
 from knn import KNNEvaluator
+from vp_tree import VPTree
@@ -1,5 +1,16 @@
 import heapq
 
+import numpy
+
+from vp_tree import VPTree
+from ...filters.window_set import is_numeric_window, reduce_numerosity
+
+_INDEXES = {
+    'vp_tree': VPTree,
+}
+
+_MAX_CHUNK_SIZE = 256
+
 
 class KNNEvaluator(object):
     '''
@@ -7,22 +18,357 @@ class KNNEvaluator(object):
 
     Currently uses brute force to find the kNN distnce - this is the best
     we can do without extra information about the distance function.
+
+    If the distance function has a 'pairwise' attribute (see the distances
+    module) and the sequences are numeric, the distances to all reference
+    sequences are computed in a single call, and blocks of evaluation sequences
+    can be scored at once through evaluate_batch. Reference sets given as
+    WindowSets are then processed one block at a time.
+
+    If the distance function instead supports early abandoning (through a
+    'bounded' attribute), the reference sequences are processed in order of
+    increasing lower bounds (if the distance has a 'lower_bound' attribute),
+    and sequences whose lower bound exceeds the current kNN distance are
+    skipped, as are distance computations exceeding it. This search is also
+    used for distances that have a 'pairwise' attribute if search is set to
+    'early_abandoning'. The number of distances computed and pruned in this
+    search are counted in distance_count and pruned_count.
+
+    Other distances are computed one reference sequence at a time, or from an
+    evaluation sequence to all reference sequences in a single call if the
+    distance function has a 'batch' attribute (see the discrete distances).
+
+    Alternatively, an index (currently only 'vp_tree', see VPTree) can be
+    built over the reference set, which avoids computing most distances.
+    Since the index relies on the triangle inequality, it is only accepted
+    for metric distances (see the IS_METRIC attribute of the distances), and a
+    ValueError is raised for other distances (e.g. DTW, CDM or MINDIST).
+    The index is rebuilt whenever the reference set changes, so this only pays
+    off for static contexts (e.g. semi-supervised) and expensive distances.
+
+    If numerosity_reduction is set ('runs' or 'duplicates', see
+    filters.reduce_numerosity), repeated sequences in the reference set (e.g.
+    the SAX words of overlapping windows) are collapsed, so that only one
+    distance is computed per distinct sequence, and each distance counts
+    towards k as often as its sequence occurs. This gives the same kNN
+    distances as the full reference set.
     '''
 
-    def __init__(self, distance, k=3):
+    def __init__(self, distance, k=3, index=None, search=None, numerosity_reduction=None):
+        if index is not None and index not in _INDEXES:
+            raise NotImplementedError('Index %s not recognized' % index)
+        if index is not None and not getattr(distance, 'IS_METRIC', False):
+            raise ValueError('Index %s requires a metric distance' % index)
+        if search not in (None, 'brute_force', 'early_abandoning'):
+            raise NotImplementedError('Search %s not recognized' % search)
+        if search == 'early_abandoning' and not hasattr(distance, 'bounded'):
+            raise NotImplementedError('Distance does not support early abandoning')
+        if numerosity_reduction not in (None, 'runs', 'duplicates'):
+            raise NotImplementedError('Numerosity reduction %s not recognized' %
+                                      numerosity_reduction)
+
         self._distance = distance
         self._k = k
+        self._index = index
+        self._early_abandoning = search == 'early_abandoning'
+        self._numerosity_reduction = numerosity_reduction
+        self.distance_count = 0
+        self.pruned_count = 0
+        self._reference_set = None
+        self._reference_cache = {}
 
     def evaluate(self, evaluation_series, reference_set, *args):
 
-        distances = [self._distance(evaluation_series, s) for s in reference_set]
+        if self._index is not None:
+            reference_index = self._get_cached(reference_set, 'index', self._build_index)
+
+            # return NaN if there are not enough elements in the reference set
+            if len(reference_index) < self._k:
+                return float('NaN')
+
+            return reference_index.query(evaluation_series, self._k)[self._k - 1]
+
+        if self._use_pairwise([evaluation_series]):
+            return self.evaluate_batch([evaluation_series], reference_set)[0]
+
+        if hasattr(self._distance, 'bounded'):
+            return self._evaluate_bounded(evaluation_series, reference_set)
+
+        references, counts = self._get_reduced(reference_set)
+        distances = self._get_distances(evaluation_series, references)
+        nearest = _get_smallest(distances, counts, self._k)
+
+        # return NaN if there are not enough elements in the reference set
+        if len(nearest) < self._k:
+            return float('NaN')
+
+        return nearest[self._k - 1]
+
+    def evaluate_batch(self, evaluation_windows, reference_set, *args):
+        '''
+        Returns an array containing the kNN distance of each of the given
+        evaluation sequences to the reference set.
+        '''
+        if not self._use_pairwise(evaluation_windows):
+            return numpy.array([self.evaluate(w, reference_set) for w in evaluation_windows],
+                               dtype=float)
+
+        return self.evaluate_nearest(evaluation_windows, reference_set, self._k)[:, self._k - 1]
+
+    def evaluate_nearest(self, evaluation_windows, reference_set, count):
+        '''
+        Returns a 2D array containing, for each of the given evaluation sequences,
+        the sorted distances to its count nearest neighbors in the reference set,
+        padded with NaN if the reference set contains fewer than count sequences.
+        Column k - 1 contains the kNN distances (as returned by evaluate_batch).
+        '''
+        if not self._use_pairwise(evaluation_windows):
+            nearest = numpy.empty((len(evaluation_windows), count))
+            nearest.fill(numpy.nan)
+            for i, window in enumerate(evaluation_windows):
+                distances = self._get_nearest_distances(window, reference_set, count)
+                nearest[i, :len(distances)] = distances
+            return nearest
+
+        pairwise = self._distance.pairwise
+        evaluation_windows = numpy.asarray(evaluation_windows, dtype=float)
+        blocks = self._get_reference_blocks(reference_set)
+        counts = self._get_reduced(reference_set)[1]
+
+        nearest = numpy.empty((len(evaluation_windows), count))
+        nearest.fill(numpy.nan)
+        entry_count = sum(len(block) for block in blocks)
+        found = min(count, entry_count if counts is None else counts.sum())
+        if found == 0:
+            return nearest
+
+        # every sequence occurs at least once, so the found nearest neighbors
+        # are among the found nearest distinct sequences
+        found_entries = min(found, entry_count)
+
+        distances = numpy.hstack([pairwise(evaluation_windows, block) for block in blocks])
+        indices = numpy.argpartition(distances, found_entries - 1, axis=1)[:, :found_entries]
+
+        rowwise = getattr(self._distance, 'rowwise', None)
+        if rowwise is None:
+            found_distances = distances[numpy.arange(len(distances))[:, None], indices]
+        else:
+            found_distances = rowwise(evaluation_windows[:, None, :], _get_rows(blocks, indices))
+
+        if counts is None:
+            found_distances.sort(axis=1)
+        else:
+            found_distances = _expand_rows(found_distances, counts[indices], found)
+        nearest[:, :found] = found_distances
+        return nearest
+
+    def _use_pairwise(self, evaluation_windows):
+        '''
+        Indicates whether the given evaluation sequences are scored through the
+        pairwise attribute of the distance.
+        '''
+        return (hasattr(self._distance, 'pairwise') and self._index is None and
+                not self._early_abandoning and len(evaluation_windows) > 0 and
+                is_numeric_window(numpy.asarray(evaluation_windows[0])))
+
+    def _get_distances(self, evaluation_series, references):
+        '''
+        Returns the distances from the evaluation sequence to each of the reference
+        sequences, in a single call if the distance has a 'batch' attribute.
+        '''
+        batch = getattr(self._distance, 'batch', None)
+        if batch is not None:
+            return batch(evaluation_series, references)
+        return [self._distance(evaluation_series, s) for s in references]
+
+    def _get_nearest_distances(self, evaluation_series, reference_set, count):
+        '''
+        Returns the sorted distances from the evaluation sequence to its (at most)
+        count nearest neighbors in the reference set, without the pairwise attribute.
+        '''
+        if self._index is not None:
+            reference_index = self._get_cached(reference_set, 'index', self._build_index)
+            return reference_index.query(evaluation_series, count)
+
+        counts = self._get_reduced(reference_set)[1]
+        if hasattr(self._distance, 'bounded'):
+            references, _ = self._get_cached(reference_set, 'bounded', self._prepare_bounded)
+            if len(references) == 0:
+                return []
+            distances = self._distance.bounded(evaluation_series, references, float('inf'))
+        else:
+            references = self._get_reduced(reference_set)[0]
+            distances = self._get_distances(evaluation_series, references)
+
+        return _get_smallest(distances, counts, count)
+
+    def _evaluate_bounded(self, evaluation_series, reference_set):
+        '''
+        Returns the kNN distance of the evaluation sequence, computed through
+        early abandoning (see the class docstring).
+        '''
+        references, lower_bound_data = self._get_cached(reference_set, 'bounded',
+                                                        self._prepare_bounded)
+        counts = self._get_reduced(reference_set)[1]
+        if counts is None:
+            counts = numpy.ones(len(references), dtype=int)
 
         # return NaN if there are not enough elements in the reference set
-        if len(distances) < self._k:
+        if counts.sum() < self._k:
             return float('NaN')
 
-        d = heapq.nsmallest(self._k, distances)[self._k - 1]
-        return d
+        lower_bound = getattr(self._distance, 'lower_bound', None)
+        if lower_bound is not None:
+            lower_bounds = lower_bound(evaluation_series, references, lower_bound_data)
+            order = numpy.argsort(lower_bounds, kind='mergesort')
+        else:
+            lower_bounds = numpy.zeros(len(references))
+            order = numpy.arange(len(references))
+
+        # max-heap (through negated distances) of the k best distances so far
+        nearest = []
+        threshold = float('inf')
+        position = 0
+        chunk_size = self._k
+
+        # the first chunk only contains k sequences to obtain a threshold quickly,
+        # after which the chunks grow to reduce the overhead per call
+        while position < len(order):
+            chunk = order[position:position + chunk_size]
+            position += chunk_size
+            chunk_size = min(2 * chunk_size, _MAX_CHUNK_SIZE)
+
+            chunk_length = len(chunk)
+            chunk = chunk[lower_bounds[chunk] <= threshold]
+            self.pruned_count += chunk_length - len(chunk)
+            if len(chunk) == 0:
+                # since the sequences are sorted by their lower bounds, the remaining
+                # sequences can not be closer either
+                break
+
+            distances = self._distance.bounded(evaluation_series, references[chunk], threshold)
+            self.distance_count += len(chunk)
+            self.pruned_count += int((distances > threshold).sum())
+
+            for d, count in zip(distances, counts[chunk]):
+                # each sequence counts as often as it occurs in the reference set
+                for _ in xrange(min(count, self._k)):
+                    if len(nearest) < self._k:
+                        heapq.heappush(nearest, -d)
+                    elif d < -nearest[0]:
+                        heapq.heapreplace(nearest, -d)
+                    else:
+                        break
+
+            if len(nearest) == self._k:
+                threshold = -nearest[0]
+
+        self.pruned_count += max(0, len(references) - position)
+        return -nearest[0]
+
+    def _get_cached(self, reference_set, key, compute):
+        '''
+        Returns compute(reference_set), which is cached (under the given key)
+        until a different reference set is given, so that repeated evaluations
+        against the same reference set (e.g. in semi-supervised contexts)
+        only prepare it once.
+        '''
+        if reference_set is not self._reference_set:
+            self._reference_set = reference_set
+            self._reference_cache = {}
+
+        if key not in self._reference_cache:
+            self._reference_cache[key] = compute(reference_set)
+
+        return self._reference_cache[key]
+
+    def _get_reference_blocks(self, reference_set):
+        '''
+        Returns the non-empty blocks of the reference set as 2D arrays.
+        '''
+        return self._get_cached(reference_set, 'blocks',
+                                lambda r: _prepare_blocks(self._get_reduced(r)[0]))
+
+    def _get_reduced(self, reference_set):
+        '''
+        Returns the reference set after numerosity reduction, along with the
+        multiplicities of its sequences, or the reference set itself and None
+        if numerosity reduction is disabled.
+        '''
+        if self._numerosity_reduction is None:
+            return reference_set, None
+        return self._get_cached(reference_set, 'reduced',
+                                lambda r: reduce_numerosity(r, self._numerosity_reduction))
+
+    def _build_index(self, reference_set):
+        references, counts = self._get_reduced(reference_set)
+        return _INDEXES[self._index](references, self._distance, counts=counts)
+
+    def _prepare_bounded(self, reference_set):
+        '''
+        Returns the reference set as a single 2D array, along with the data
+        required to compute lower bounds of the distances to it.
+        '''
+        blocks = self._get_reference_blocks(reference_set)
+        if not blocks:
+            return numpy.empty((0, 0)), None
+
+        references = numpy.vstack(blocks)
+        prepare_lower_bound = getattr(self._distance, 'prepare_lower_bound', None)
+        if prepare_lower_bound is None:
+            return references, None
+        return references, prepare_lower_bound(references)
 
     def requires_symbolic_input(self):
         return self._distance.IS_DISCRETE
+
+
+def _prepare_blocks(reference_set):
+    blocks = getattr(reference_set, 'blocks', None)
+    if blocks is None:
+        blocks = [list(reference_set)]
+
+    return [numpy.asarray(block, dtype=float) for block in blocks if len(block) > 0]
+
+
+def _get_rows(blocks, indices):
+    '''
+    Returns the rows with the given indices in the concatenation of the blocks.
+    '''
+    rows = numpy.empty(indices.shape + blocks[0].shape[1:])
+    offset = 0
+
+    for block in blocks:
+        in_block = (indices >= offset) & (indices < offset + len(block))
+        rows[in_block] = block[indices[in_block] - offset]
+        offset += len(block)
+
+    return rows
+
+
+def _get_smallest(distances, counts, count):
+    '''
+    Returns the (at most) count smallest distances in increasing order, where
+    each distance occurs as often as given by counts (if not None).
+    '''
+    if counts is None:
+        return heapq.nsmallest(count, distances)
+
+    distances = numpy.asarray(distances, dtype=float)
+    order = numpy.argsort(distances, kind='mergesort')[:count]
+    return numpy.repeat(distances[order], counts[order])[:count].tolist()
+
+
+def _expand_rows(distances, counts, count):
+    '''
+    Returns the count smallest distances of each row in increasing order, where
+    each distance occurs as often as given by the corresponding count.
+    Assumes that the counts of each row add up to at least count.
+    '''
+    rows = numpy.arange(len(distances))[:, None]
+    order = numpy.argsort(distances, axis=1, kind='mergesort')
+    cumulative_counts = numpy.cumsum(counts[rows, order], axis=1)
+
+    # the position (in the sorted row) of the sequence covering each of the count nearest
+    positions = (cumulative_counts[:, :, None] <= numpy.arange(count)).sum(axis=1)
+    return distances[rows, order[rows, positions]]
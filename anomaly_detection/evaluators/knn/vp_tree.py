@@ -0,0 +1,139 @@
+import heapq
+
+import numpy
+
+from ...filters.window_set import is_numeric_window
+
+
+class VPTree(object):
+    '''
+    Vantage-point tree over a set of sequences, supporting kNN queries.
+
+    Each node picks a vantage point and splits the remaining sequences at the
+    median distance mu to it, so that queries can skip subtrees using the
+    triangle inequality. Queries are exact if the distance is a metric
+    (see the IS_METRIC attribute of the distances), and approximate otherwise,
+    which is why KNNEvaluator only builds the tree for metric distances.
+
+    If the distance has a 'rowwise' attribute (see the distances module) and
+    the sequences are numeric, distances to multiple sequences are computed
+    in a single call.
+
+    The multiplicity of each sequence can optionally be given by counts, in
+    which case each sequence counts as often towards k.
+    '''
+
+    def __init__(self, sequences, distance, leaf_size=16, seed=0, counts=None):
+        sequences = list(sequences)
+
+        self._distance = distance
+        self._leaf_size = max(1, int(leaf_size))
+        self._random = numpy.random.RandomState(seed)
+        self._size = len(sequences)
+        self._counts = (numpy.ones(self._size, dtype=int) if counts is None else
+                        numpy.asarray(counts, dtype=int))
+
+        if sequences and hasattr(distance, 'rowwise') and all(is_numeric_window(s)
+                                                              for s in sequences):
+            self._sequences = numpy.asarray(sequences, dtype=float)
+            self._rowwise = distance.rowwise
+        else:
+            self._sequences = sequences
+            self._rowwise = None
+
+        self.distance_count = 0
+        self._root = self._build(numpy.arange(self._size))
+
+    def __len__(self):
+        return int(self._counts.sum())
+
+    def query(self, sequence, k):
+        '''
+        Returns the sorted distances of the k nearest neighbors of the sequence
+        (or of all sequences, if there are fewer than k).
+        '''
+        # max-heap (through negated distances) of the k best distances so far
+        nearest = []
+        if self._root is not None:
+            self._search(self._root, sequence, int(k), nearest)
+        return sorted(-d for d in nearest)
+
+    def _build(self, indices):
+        if len(indices) == 0:
+            return None
+        if len(indices) <= self._leaf_size:
+            return _Leaf(indices)
+
+        vantage_point = self._random.randint(len(indices))
+        indices[0], indices[vantage_point] = indices[vantage_point], indices[0]
+        vantage_point, rest = indices[0], indices[1:]
+
+        distances = self._get_distances(self._sequences[vantage_point], rest)
+        order = numpy.argsort(distances, kind='mergesort')
+        split = len(rest) // 2
+
+        # every sequence inside is at most mu from the vantage point, and
+        # every sequence outside is at least mu from it
+        return _Node(
+            vantage_point,
+            distances[order[split]],
+            self._build(rest[order[:split]]),
+            self._build(rest[order[split:]])
+        )
+
+    def _search(self, node, sequence, k, nearest):
+        if isinstance(node, _Leaf):
+            for i, d in zip(node.indices, self._get_distances(sequence, node.indices)):
+                _push(nearest, d, k, self._counts[i])
+            return
+
+        d = self._get_distances(sequence, [node.vantage_point])[0]
+        _push(nearest, d, k, self._counts[node.vantage_point])
+
+        if d < node.mu:
+            children = [(node.inside, True), (node.outside, False)]
+        else:
+            children = [(node.outside, False), (node.inside, True)]
+
+        for child, is_inside in children:
+            if child is None:
+                continue
+            threshold = -nearest[0] if len(nearest) == k else float('inf')
+            if is_inside and d - threshold <= node.mu:
+                self._search(child, sequence, k, nearest)
+            elif not is_inside and d + threshold >= node.mu:
+                self._search(child, sequence, k, nearest)
+
+    def _get_distances(self, sequence, indices):
+        self.distance_count += len(indices)
+        if self._rowwise is not None:
+            return self._rowwise(numpy.asarray(sequence, dtype=float), self._sequences[indices])
+        if hasattr(self._distance, 'batch'):
+            return self._distance.batch(sequence, [self._sequences[i] for i in indices])
+        return numpy.array([self._distance(sequence, self._sequences[i]) for i in indices],
+                           dtype=float)
+
+
+class _Node(object):
+
+    def __init__(self, vantage_point, mu, inside, outside):
+        self.vantage_point = vantage_point
+        self.mu = mu
+        self.inside = inside
+        self.outside = outside
+
+
+class _Leaf(object):
+
+    def __init__(self, indices):
+        self.indices = indices
+
+
+def _push(nearest, distance, k, count=1):
+    for _ in xrange(min(count, k)):
+        if len(nearest) < k:
+            heapq.heappush(nearest, -distance)
+        elif distance < -nearest[0]:
+            heapq.heapreplace(nearest, -distance)
+        else:
+            break
@@ -1,15 +1,50 @@
-from sliding_window import sliding_window_filter, sliding_window_reference_filter
+from sliding_window import (sliding_window_filter, sliding_window_reference_filter,
+                            sliding_window_range_filter, sliding_window_batch_filter,
+                            sliding_window_matrix)
+from window_set import WindowSet, reduce_numerosity
  
 
 def get_evaluation_filter(method='sliding_window', **kwargs):
+    """
+    Returns an evaluation filter, i.e. a function that takes a sequence and
+    generates (subsequence, start, end) tuples.
+
+    The returned function has a 'batch' attribute, which takes a sequence and
+    a batch size and generates (windows, starts, ends) tuples, where windows
+    is a 2D array containing a block of subsequences.
+
+    The 'width' and 'step' attributes of the returned function give the width
+    of the subsequences and the distance between their starts.
+    """
     if method == 'sliding_window':
-        return lambda time_series: sliding_window_filter(time_series, **kwargs)
+        evaluation_filter = lambda time_series: sliding_window_filter(time_series, **kwargs)
+        evaluation_filter.batch = lambda time_series, batch_size: sliding_window_batch_filter(
+            time_series, batch_size=batch_size, **kwargs)
+        evaluation_filter.width = int(kwargs['width'])
+        evaluation_filter.step = int(kwargs.get('step', 1))
+        return evaluation_filter
     else:
         raise NotImplementedError('Evaluation filter "%s" not implemented' % method)
 
 
 def get_reference_filter(method='sliding_window', **kwargs):
+    """
+    Returns a reference filter, i.e. a function that takes a context and
+    returns a reference set.
+
+    The returned function has a 'from_ranges' attribute, which takes a context
+    given as (sequence, start, stop) tuples and returns the reference set as a
+    WindowSet of read-only views into the sequences, without copying them.
+
+    The 'width' and 'step' attributes of the returned function give the width
+    of the reference sequences and the distance between their starts.
+    """
     if method == 'sliding_window':
-        return lambda time_series: sliding_window_reference_filter(time_series, **kwargs)
+        reference_filter = lambda time_series: sliding_window_reference_filter(time_series, **kwargs)
+        reference_filter.from_ranges = lambda context_ranges: sliding_window_range_filter(
+            context_ranges, **kwargs)
+        reference_filter.width = int(kwargs['width'])
+        reference_filter.step = int(kwargs.get('step', 1))
+        return reference_filter
     else:
-        raise NotImplementedError('Reference filter "%s" not implemented' % extractor)
+        raise NotImplementedError('Reference filter "%s" not implemented' % method)
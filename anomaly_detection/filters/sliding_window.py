@@ -1,3 +1,8 @@
+import numpy
+from numpy.lib.stride_tricks import as_strided
+
+from window_set import WindowSet
+
 _TYPE_ERROR = 'width and step must be int but are %s and %s'
 _WIDTH_ERROR = 'width must not be larger than sequence length.'
 
@@ -17,6 +22,18 @@ def sliding_window_reference_filter(context, width, step=1):
     return reference_set
 
 
+def sliding_window_range_filter(context_ranges, width, step=1):
+    """
+    Counterpart of sliding_window_reference_filter for contexts given as lists of
+    (sequence, start, stop) tuples (see the contexts module).
+    Returns a WindowSet with one block per range, where each block is a
+    read-only strided view of the windows in that range (see sliding_window_matrix).
+    """
+    blocks = [sliding_window_matrix(sequence[start:stop], width, step)[0]
+              for sequence, start, stop in context_ranges]
+    return WindowSet(blocks)
+
+
 def sliding_window_filter(sequence, width, step=1):
     """
     Sliding window generator for sequences.
@@ -30,3 +47,38 @@ def sliding_window_filter(sequence, width, step=1):
         start = i
         end = i + width
         yield sequence[start: end], start, end - 1
+
+
+def sliding_window_batch_filter(sequence, width, step=1, batch_size=1024):
+    """
+    Sliding window generator that yields blocks of at most batch_size windows
+    at a time, as (windows, starts, ends) tuples where windows is a 2D array
+    with one window per row.
+    The windows are read-only views into the sequence.
+    """
+    batch_size = int(batch_size)
+    windows, starts, ends = sliding_window_matrix(sequence, width, step)
+
+    for i in range(0, len(starts), batch_size):
+        yield windows[i:i + batch_size], starts[i:i + batch_size], ends[i:i + batch_size]
+
+
+def sliding_window_matrix(sequence, width, step=1):
+    """
+    Returns a read-only strided view of all windows generated by
+    sliding_window_filter, with one window per row, along with arrays
+    containing the start and end indices of the windows.
+    No data is copied.
+    """
+    step = int(step)
+    width = int(width)
+
+    sequence = numpy.asarray(sequence)
+    count = max(0, (len(sequence) - width) // step + 1)
+    stride = sequence.strides[0]
+
+    windows = as_strided(sequence, shape=(count, width), strides=(step * stride, stride),
+                         writeable=False)
+    starts = numpy.arange(count) * step
+
+    return windows, starts, starts + width - 1
@@ -0,0 +1,87 @@
+import numpy
+
+
+class WindowSet(object):
+    """
+    A set of windows, stored as a list of blocks, where each block is either a
+    2D array with one window per row or a list of windows.
+
+    Iterating over a window set yields the individual windows, so window sets
+    can be used wherever a list of windows is expected, while evaluators can
+    process whole blocks at once.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def __len__(self):
+        return sum(len(block) for block in self.blocks)
+
+    def __iter__(self):
+        for block in self.blocks:
+            for window in block:
+                yield window
+
+
+def is_numeric_window(window):
+    """
+    Indicates whether the given window can be stored as a row of a 2D array.
+    """
+    return (isinstance(window, numpy.ndarray) and window.ndim == 1 and
+            window.dtype.kind in 'biuf')
+
+
+def reduce_numerosity(windows, method='runs'):
+    """
+    Collapses repeated windows into single entries, and returns the remaining
+    windows along with an array containing the multiplicity of each.
+
+    With method='runs', runs of consecutive equal windows are collapsed (as in
+    the numerosity reduction of SAX), while method='duplicates' collapses all
+    equal windows, keeping them in order of first occurrence. Numeric windows
+    are returned as a 2D array, and other windows (e.g. SAX words) as a list.
+    """
+    if method not in ('runs', 'duplicates'):
+        raise NotImplementedError('Numerosity reduction %s not recognized' % method)
+
+    # window sets (and 2D arrays) whose blocks are all 2D arrays are reduced at once
+    blocks = getattr(windows, 'blocks', [windows])
+    if blocks and all(isinstance(block, numpy.ndarray) and block.ndim == 2 for block in blocks):
+        return _reduce_rows(numpy.concatenate(blocks), method)
+
+    windows = list(windows)
+    if windows and all(is_numeric_window(w) for w in windows):
+        return _reduce_rows(numpy.asarray(windows), method)
+
+    reduced, counts = [], []
+    positions = {}
+    previous_key = None
+    for window in windows:
+        key = window if isinstance(window, basestring) else tuple(window)
+        if method == 'runs':
+            position = len(reduced) - 1 if reduced and key == previous_key else None
+            previous_key = key
+        else:
+            position = positions.setdefault(key, len(reduced))
+            position = position if position < len(reduced) else None
+
+        if position is None:
+            reduced.append(window)
+            counts.append(1)
+        else:
+            counts[position] += 1
+
+    return reduced, numpy.array(counts, dtype=int)
+
+
+def _reduce_rows(rows, method):
+    """
+    Implements reduce_numerosity for the rows of a 2D array.
+    """
+    if method == 'runs':
+        starts = numpy.flatnonzero(numpy.append(True, (rows[1:] != rows[:-1]).any(axis=1)))
+        return rows[starts], numpy.diff(numpy.append(starts, len(rows)))
+
+    _, first, counts = numpy.unique(rows, axis=0, return_index=True, return_counts=True)
+    order = numpy.argsort(first, kind='mergesort')
+    return rows[first[order]], counts[order]
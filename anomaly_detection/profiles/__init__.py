@@ -0,0 +1,85 @@
+'''
+Module contains profile functions, which compute the anomaly scores of all
+windows of a sequence at once for specific anomaly detector configurations.
+A profile function takes a sequence and returns a tuple (scores, starts, ends),
+and gives the same scores as the corresponding window-by-window evaluation.
+'''
+from matrix_profile import get_matrix_profile_function, knn_matrix_profile
+from mass import get_mass_profile_function
+from ..contexts import get_context_widths
+
+
+def get_profile_function(evaluation_filter_config, context_config, reference_filter_config,
+                         evaluator_config, representation_config=None,
+                         discretization_config=None, nearest=False):
+    """
+    Returns a profile function matching the given anomaly detector configuration
+    (see create_anomaly_detector), or None if no profile function is available
+    for the configuration.
+
+    If nearest is True, the scores returned by the profile function are rows
+    containing the sorted distances to the k nearest neighbors of each window
+    (see KNNEvaluator.evaluate_nearest).
+
+    Profile functions are available for Euclidean kNN over sliding windows with
+    equal widths, using:
+      * FFT-based distance profiles (see the mass module) for semi-supervised
+        contexts, optionally with z-normalization.
+      * the matrix profile (see the matrix_profile module) for trivial and
+        local contexts, if the reference filter step is 1 and no
+        representation is used.
+    """
+    if not _is_euclidean_knn(evaluator_config):
+        return None
+
+    if not (_is_sliding_window(evaluation_filter_config) and
+            _is_sliding_window(reference_filter_config)):
+        return None
+
+    width = int(evaluation_filter_config['width'])
+    if int(reference_filter_config['width']) != width:
+        return None
+
+    if context_config.get('method') == 'semi-supervised':
+        if representation_config not in (None, {'method': 'z-normalize'}):
+            return None
+
+        return get_mass_profile_function(
+            reference_sequence=context_config.get('reference_sequence', []),
+            width=width,
+            step=evaluation_filter_config.get('step', 1),
+            reference_step=reference_filter_config.get('step', 1),
+            k=evaluator_config.get('k', 3),
+            normalize=representation_config is not None,
+            nearest=nearest
+        )
+
+    if representation_config is not None:
+        return None
+    if int(reference_filter_config.get('step', 1)) != 1:
+        return None
+
+    widths = get_context_widths(**context_config)
+    if widths is None:
+        return None
+
+    return get_matrix_profile_function(
+        width=width,
+        step=evaluation_filter_config.get('step', 1),
+        k=evaluator_config.get('k', 3),
+        left_width=widths[0],
+        right_width=widths[1],
+        nearest=nearest
+    )
+
+
+def _is_euclidean_knn(evaluator_config):
+    # explicitly configured indexes and search modes are respected
+    return (evaluator_config.get('method', 'knn') == 'knn' and
+            evaluator_config.get('distance_measure', 'euclidean') == 'euclidean' and
+            evaluator_config.get('index') is None and
+            evaluator_config.get('search') in (None, 'brute_force'))
+
+
+def _is_sliding_window(filter_config):
+    return filter_config.get('method', 'sliding_window') == 'sliding_window'
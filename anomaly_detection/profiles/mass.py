@@ -0,0 +1,182 @@
+"""
+MASS style kNN distances against a fixed reference sequence.
+
+The dot products between a query window and every window of the reference
+sequence are computed at once through FFT convolution, which takes
+O(m log m) time per query for a reference sequence of length m. The FFT of
+the reference sequence and its rolling statistics only depend on the
+reference sequence, so they are computed once and reused for all queries.
+
+For short windows, direct correlation with the reference sequence is faster
+than the convolution, and is used instead.
+
+Both the reference sequence and the queries are shifted by the mean of the
+reference sequence before the dot products and the rolling statistics are
+computed, so that rounding errors do not grow with the offset of the
+sequences.
+"""
+import numpy
+
+from ..filters import sliding_window_matrix
+from ..representations.z_normalize import convert_rows_to_z_normalized
+
+# the convolution is used if the window width is larger than this factor
+# times the base 2 logarithm of the FFT length
+_FFT_COST_FACTOR = 8
+
+
+def get_mass_profile_function(reference_sequence, width, step=1, reference_step=1, k=1,
+                              normalize=False, nearest=False):
+    """
+    Returns a function that takes a sequence and returns a tuple
+    (scores, starts, ends) containing the kNN distances of the windows
+    generated by a sliding window filter with the given width and step to
+    the windows generated by a sliding window filter with the given width and
+    reference_step on the reference sequence.
+
+    If normalize is True, all windows are z-normalized before the distances
+    are computed. If nearest is True, the scores are instead rows containing
+    the sorted distances to the k nearest neighbors, padded with NaN.
+    """
+    width = int(width)
+    step = int(step)
+    reference = _ReferenceSequence(reference_sequence, width, int(reference_step), normalize)
+    k = int(k)
+
+    def profile_function(sequence):
+        windows, starts, ends = sliding_window_matrix(numpy.asarray(sequence, dtype=float),
+                                                      width, step)
+        if nearest:
+            return reference.get_nearest_distances(windows, k), starts, ends
+        return reference.get_kth_distances(windows, k), starts, ends
+
+    return profile_function
+
+
+class _ReferenceSequence(object):
+    """
+    A reference sequence, along with the precomputed data needed to compute
+    distance profiles against it.
+    The precomputation is performed on first use.
+    """
+
+    def __init__(self, sequence, width, step=1, normalize=False):
+        self._sequence = sequence
+        self._width = width
+        self._step = step
+        self._normalize = normalize
+        self._initialized = False
+
+    def _initialize(self):
+        sequence = numpy.asarray(self._sequence, dtype=float)
+        width = self._width
+
+        self._windows, _, _ = sliding_window_matrix(sequence, width)
+        self._shift = sequence.mean() if len(sequence) else 0
+        self._sequence = sequence = sequence - self._shift
+        self._fft_length = _get_fft_length(len(sequence) + width - 1)
+        self._use_fft = width > _FFT_COST_FACTOR * numpy.log2(self._fft_length)
+        if self._use_fft:
+            self._fft = numpy.fft.rfft(sequence, self._fft_length)
+
+        window_sums, window_squared_sums = _get_rolling_sums(sequence, width)
+        if self._normalize:
+            variances = window_squared_sums / width - (window_sums / width) ** 2
+            standard_deviations = numpy.sqrt(numpy.maximum(variances, 0))
+
+            # windows with zero standard deviation are normalized to zero
+            constant = self._windows.max(axis=1) == self._windows.min(axis=1)
+            standard_deviations[constant] = numpy.inf
+
+            self._inverse_deviations = 1 / standard_deviations
+            self._squared_norms = numpy.where(constant, 0, width)
+        else:
+            self._squared_norms = window_squared_sums
+
+        self._initialized = True
+
+    def get_kth_distances(self, queries, k):
+        """
+        Returns an array containing the distance from each query to its k-th
+        nearest neighbor among the reference windows, or NaN if there are
+        fewer than k reference windows.
+        """
+        return self.get_nearest_distances(queries, k)[:, k - 1]
+
+    def get_nearest_distances(self, queries, k):
+        """
+        Returns a 2D array containing the sorted distances from each query to its
+        k nearest neighbors among the reference windows, padded with NaN if there
+        are fewer than k reference windows.
+        """
+        if not self._initialized:
+            self._initialize()
+
+        queries = numpy.asarray(queries, dtype=float)
+        if self._normalize:
+            queries = convert_rows_to_z_normalized(queries)
+
+        nearest_distances = numpy.empty((len(queries), k))
+        nearest_distances.fill(numpy.nan)
+        found = min(k, len(self._windows[::self._step]))
+        if found > 0:
+            for i, query in enumerate(queries):
+                nearest_distances[i, :found] = self._get_nearest_distances(query, found)
+
+        return nearest_distances
+
+    def _get_nearest_distances(self, query, k):
+        squared_distances = self._get_squared_distance_profile(query)[::self._step]
+
+        # recompute the distances to the k nearest windows directly, since the
+        # distance profile is subject to rounding errors
+        nearest = numpy.argpartition(squared_distances, k - 1)[:k] * self._step
+        nearest_windows = self._windows[nearest]
+        if self._normalize:
+            nearest_windows = convert_rows_to_z_normalized(nearest_windows)
+
+        differences = nearest_windows - query
+        return numpy.sort(numpy.sqrt(numpy.einsum('ij,ij->i', differences, differences)))
+
+    def _get_squared_distance_profile(self, query):
+        """
+        Returns the squared distances from the query to all reference windows.
+        """
+        # z-normalized queries sum to zero, so the dot products with the shifted
+        # windows equal those with the windows minus their means
+        if not self._normalize:
+            query = query - self._shift
+
+        if self._use_fft:
+            width = self._width
+            query_fft = numpy.fft.rfft(query[::-1], self._fft_length)
+            convolution = numpy.fft.irfft(self._fft * query_fft, self._fft_length)
+            dot_products = convolution[width - 1:width - 1 + len(self._squared_norms)]
+        else:
+            dot_products = numpy.correlate(self._sequence, query, 'valid')
+
+        if self._normalize:
+            dot_products = dot_products * self._inverse_deviations
+
+        return numpy.dot(query, query) + self._squared_norms - 2 * dot_products
+
+
+def _get_rolling_sums(sequence, width):
+    """
+    Returns the sums and the sums of squares of all windows of the given width,
+    computed from cumulative sums in O(n) memory.
+    """
+    window_count = max(len(sequence) - width + 1, 0)
+    sums = numpy.zeros(len(sequence) + 1)
+    squared_sums = numpy.zeros(len(sequence) + 1)
+    numpy.cumsum(sequence, out=sums[1:])
+    numpy.cumsum(sequence * sequence, out=squared_sums[1:])
+    return (sums[width:width + window_count] - sums[:window_count],
+            squared_sums[width:width + window_count] - squared_sums[:window_count])
+
+
+def _get_fft_length(length):
+    """
+    Returns the smallest power of two that is at least the given length.
+    """
+    return 1 << int(numpy.ceil(numpy.log2(max(length, 1))))
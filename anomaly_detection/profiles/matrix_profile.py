@@ -0,0 +1,148 @@
+"""
+Matrix profile style kNN distances for sliding windows.
+
+Computes the k-th nearest neighbor (Euclidean) distance of every sliding
+window of a sequence to the other windows of the same sequence, by
+traversing the distance matrix along its diagonals. Each diagonal is
+computed from a single cumulative sum, which gives O(n^2) time in total
+(independent of the window width) and O(n * k) memory.
+"""
+import numpy
+
+from ..filters import sliding_window_matrix
+
+# number of windows for which exact distances are recomputed at a time
+_BLOCK_SIZE = 4096
+
+
+def get_matrix_profile_function(width, step=1, k=1, left_width=None, right_width=None,
+                                nearest=False):
+    """
+    Returns a function that takes a sequence and returns a tuple
+    (scores, starts, ends) containing the kNN distances of the windows
+    generated by a sliding window filter with the given width and step.
+
+    The reference set of each window is the same as that produced by a
+    sliding window reference filter (with step 1) applied to its trivial
+    context or, if left_width and right_width are given, to its local
+    context with those widths.
+
+    If nearest is True, the scores are instead rows containing the sorted
+    distances to the k nearest neighbors (see knn_matrix_profile).
+    """
+    width = int(width)
+    step = int(step)
+    k = int(k)
+
+    def profile_function(sequence):
+        scores = knn_matrix_profile(sequence, width, k, left_width, right_width, nearest)
+        starts = numpy.arange(0, len(scores), step)
+        return scores[starts], starts, starts + width - 1
+
+    return profile_function
+
+
+def knn_matrix_profile(sequence, width, k=1, left_width=None, right_width=None,
+                       nearest=False):
+    """
+    Returns an array containing, for each window of the given width in the
+    sequence, the distance to its k-th nearest neighbor among the windows
+    in its context, or NaN if its context contains fewer than k windows.
+    If nearest is True, a 2D array is returned instead, where each row contains
+    the sorted distances to the k nearest neighbors of a window, padded with NaN.
+
+    The context of the window starting at i consists of the windows starting
+    in [i - left_width, i - width - 1] and [i + width, i + right_width - 1],
+    excluding the last window of the sequence. If left_width or right_width
+    is None, the context is unbounded in that direction.
+    This matches the contexts produced by the trivial and local context
+    functions.
+    """
+    sequence = numpy.asarray(sequence, dtype=float)
+    n = len(sequence)
+    window_count = max(0, n - width + 1)
+    last_reference = n - width - 1
+
+    if left_width is None:
+        left_width = n
+    if right_width is None:
+        right_width = n
+
+    left_width = int(left_width)
+    right_width = int(right_width)
+
+    # squared distances to and indices of the k nearest neighbors of each window
+    nearest_distances = numpy.empty((window_count, k))
+    nearest_distances.fill(numpy.inf)
+    nearest_indices = numpy.zeros((window_count, k), dtype=int)
+    counts = numpy.zeros(window_count, dtype=int)
+
+    max_offset = min(window_count - 1, max(left_width, right_width - 1))
+
+    for offset in range(width, max_offset + 1):
+        # squared distances between the windows starting at i and i + offset
+        differences = sequence[:n - offset] - sequence[offset:]
+        cumulative = numpy.concatenate(([0], numpy.cumsum(differences * differences)))
+        squared_distances = cumulative[width:] - cumulative[:-width]
+
+        # windows i + offset as right neighbors of windows i
+        if offset <= right_width - 1:
+            pair_count = max(0, last_reference - offset + 1)
+            indices = numpy.arange(pair_count)
+            _merge(nearest_distances, nearest_indices, counts,
+                   indices, squared_distances[:pair_count], indices + offset)
+
+        # windows i as left neighbors of windows i + offset
+        if width + 1 <= offset <= left_width:
+            indices = numpy.arange(len(squared_distances))
+            _merge(nearest_distances, nearest_indices, counts,
+                   indices + offset, squared_distances, indices)
+
+    nearest_distances = _get_exact_nearest_distances(sequence, width, nearest_indices, counts)
+    if nearest:
+        return nearest_distances
+
+    return nearest_distances[:, k - 1]
+
+
+def _merge(nearest_distances, nearest_indices, counts, rows, distances, neighbors):
+    """
+    Adds one candidate neighbor to each of the given rows, replacing the
+    current furthest of the k nearest neighbors if the candidate is closer.
+    """
+    counts[rows] += 1
+
+    row_distances = nearest_distances[rows]
+    furthest = row_distances.argmax(axis=1)
+    closer = distances < row_distances[numpy.arange(len(rows)), furthest]
+
+    rows = rows[closer]
+    furthest = furthest[closer]
+    nearest_distances[rows, furthest] = distances[closer]
+    nearest_indices[rows, furthest] = neighbors[closer]
+
+
+def _get_exact_nearest_distances(sequence, width, nearest_indices, counts):
+    """
+    Recomputes the distances to the k nearest neighbors directly (since the
+    cumulative sums are subject to rounding errors) and returns them sorted,
+    where neighbors that were not found are given as NaN.
+    """
+    windows, _, _ = sliding_window_matrix(sequence, width)
+    window_count, k = nearest_indices.shape
+    nearest_distances = numpy.empty((window_count, k))
+
+    for i in range(0, window_count, _BLOCK_SIZE):
+        block = slice(i, i + _BLOCK_SIZE)
+        differences = windows[nearest_indices[block]] - windows[block, None, :]
+        nearest_distances[block] = numpy.sqrt(numpy.einsum('ijk,ijk->ij', differences,
+                                                           differences))
+
+    # windows with fewer than k neighbors only have their first slots filled,
+    # since empty slots are always replaced first
+    missing = numpy.arange(k)[None, :] >= counts[:, None]
+    nearest_distances[missing] = numpy.inf
+    nearest_distances.sort(axis=1)
+    nearest_distances[missing] = numpy.nan
+
+    return nearest_distances
@@ -3,7 +3,8 @@ from dft import get_dft_converter
 from dwt import get_dwt_converter
 from z_normalize import get_z_normalization_converter
 
-from wrapper import wrap_evaluation_filter, wrap_reference_filter
+from wrapper import wrap_evaluation_filter, wrap_reference_filter, chain_converters, convert_batch
+from table import RepresentationTable
 
 
 def get_representation_converter(method, dimensions=None, alphabet_size=None,
@@ -11,6 +12,9 @@ def get_representation_converter(method, dimensions=None, alphabet_size=None,
     """
     Returns a converter (a function which transforms sequences into some alternative
     representation) matching the given specification.
+
+    Converters may have a 'batch' attribute, which converts a 2D array of
+    sequences (one per row) at once.
     """
     if method == 'sax':
         return get_sax_converter(dimensions=int(dimensions),
@@ -5,4 +5,6 @@ def get_dft_converter(**kwargs):
     """
     Returns a function that converts sequences to their DFT representations.
     """
-    return lambda sequence: fftpack.rfft(sequence)
+    converter = lambda sequence: fftpack.rfft(sequence)
+    converter.batch = lambda windows: fftpack.rfft(windows, axis=-1)
+    return converter
@@ -6,4 +6,9 @@ def get_dwt_converter(wavelet_family='db1', **kwargs):
     """
     Returns a function that converts sequences to their wavelet representations.
     """
-    return lambda sequence: numpy.concatenate(pywt.dwt(sequence, wavelet_family))
+    # pywt does not accept read-only arrays, such as windows viewed in a sequence
+    converter = lambda sequence: numpy.concatenate(pywt.dwt(numpy.array(sequence),
+                                                            wavelet_family))
+    converter.batch = lambda windows: numpy.concatenate(pywt.dwt(windows, wavelet_family, axis=-1),
+                                                        axis=-1)
+    return converter
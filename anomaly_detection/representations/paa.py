@@ -1,3 +1,5 @@
+from __future__ import division
+
 import numpy
 
 _DIMENSION_ERROR = ('Target dimension ({target_dimension}) must be smaller '
@@ -9,10 +11,25 @@ def convert_to_paa(sequence, target_dimension=10):
     Generates a PAA (Piecewise Aggregate Approximation)
     representation of the given time series.
     """
-    original_dimension = len(sequence)
+    return convert_rows_to_paa(numpy.asarray(sequence, dtype=float)[None, :], target_dimension)[0]
+
+
+def convert_rows_to_paa(windows, target_dimension=10):
+    """
+    Generates the PAA representations of each row of the given 2D array.
+
+    Each of the target_dimension frames is the mean of the series over an
+    interval of (original dimension / target_dimension) points, in which
+    points on frame boundaries count partially towards both frames. The
+    frame means are computed from the cumulative sums of the rows, after
+    subtracting their first points, so that rounding errors do not grow with
+    the offset of the rows (and constant rows give constant frames).
+    """
+    windows = numpy.asarray(windows, dtype=float)
+    original_dimension = windows.shape[1]
     if target_dimension == original_dimension:
-        return sequence.copy()
-    
+        return windows.copy()
+
     assert target_dimension < original_dimension, _DIMENSION_ERROR.format(
         target_dimension=target_dimension,
         original_dimension=original_dimension
@@ -20,20 +37,13 @@ def convert_to_paa(sequence, target_dimension=10):
 
     sample_width = original_dimension / target_dimension
 
-    new_series = numpy.zeros(target_dimension)
-
-    j = 0
-    for i in range(original_dimension):
-        pt = time_series[i]
-
-        next_step = sample_width * (j + 1)
-        d1 = next_step - i
-        d2 = (i + 1) - next_step
-
-        new_series[j] += pt * min(1, d1)
-
-        if d2 >= 0 and i < original_dimension - 1:
-            new_series[j + 1] += pt * d2
-            j += 1
+    # the integral of the (piecewise constant) series from 0 to each frame boundary
+    boundaries = sample_width * numpy.arange(target_dimension + 1)
+    points = numpy.minimum(boundaries.astype(int), original_dimension - 1)
+    first_points = windows[:, :1]
+    windows = windows - first_points
+    cumulative_sums = numpy.cumsum(windows, axis=1) - windows
+    integrals = (cumulative_sums[:, points] +
+                 (boundaries - points) * windows[:, points])
 
-    return new_series
+    return numpy.diff(integrals, axis=1) / sample_width + first_points
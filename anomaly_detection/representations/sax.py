@@ -1,68 +1,109 @@
 import numpy
 from scipy.stats import norm
 
-from paa import convert_to_paa
-from z_normalize import convert_to_z_normalized
+from paa import convert_rows_to_paa
+from z_normalize import convert_rows_to_z_normalized
 
+# equipartitions by alphabet size, see get_normal_cdf_equipartition
+_equipartitions = {}
 
-def get_sax_converter(dimensions, alphabet_size, **kwargs):
-    return lambda time_series: convert_to_sax(time_series, dimensions, alphabet_size)
+_OUTPUT_ERROR = 'Unknown SAX output: %s'
+_PACKING_ERROR = 'SAX words of length %d over %d symbols do not fit in 63 bits'
 
 
-def convert_to_sax(time_series, sample_count, alphabet_size):
+def get_sax_converter(dimensions, alphabet_size, output='string', **kwargs):
+    """
+    Returns a converter to SAX words, which are given as strings, as arrays
+    of symbol indices (output='integer'), or as single integer keys
+    (output='packed', see pack_sax_words), which anomaly detectors do not accept.
+    """
+    assert output in ('string', 'integer', 'packed'), _OUTPUT_ERROR % output
+    converter = lambda time_series: convert_to_sax(time_series, dimensions, alphabet_size, output)
+    converter.batch = lambda windows: convert_rows_to_sax(windows, dimensions, alphabet_size,
+                                                          output)
+    return converter
+
+
+def convert_to_sax(time_series, sample_count, alphabet_size, output='string'):
     """
     Returns the SAX representation (with with the specified sample count
     and alphabet size) of the given time series, with the alphabet given as
     the n first integers.
     """
-    paa_representation = convert_to_paa(time_series, sample_count)
-    normalized_series = convert_to_z_normalized(paa_representation)
-    equipartition = _get_normal_cdf_equipartition(alphabet_size)
-    sax_representation = _symbolize_series(normalized_series, equipartition)
-    string_representation = _convert_to_string(sax_representation)
-    return string_representation
+    return convert_rows_to_sax(numpy.asarray(time_series, dtype=float)[None, :],
+                               sample_count, alphabet_size, output)[0]
 
 
-def _symbolize_series(time_series, equipartition):
+def convert_rows_to_sax(windows, sample_count, alphabet_size, output='string'):
     """
-    Given a set of frames (assumed to be Z-normalized), converts them to
-    the symbolic representation given by the equipartition.
+    Returns the SAX representations (as in convert_to_sax) of each row of the
+    given 2D array, which are all converted at once: a list of strings, a 2D
+    array of symbol indices (output='integer') or an array of integer keys
+    (output='packed').
+    """
+    paa_representations = convert_rows_to_paa(windows, sample_count)
+    normalized_series = convert_rows_to_z_normalized(paa_representations)
+    equipartition = get_normal_cdf_equipartition(alphabet_size)
+    sax_representations = _symbolize_series(normalized_series, equipartition)
+
+    if output == 'integer':
+        return sax_representations.astype(numpy.uint8)
+    if output == 'packed':
+        return pack_sax_words(sax_representations, alphabet_size)
+    return _convert_to_strings(sax_representations)
+
+
+def pack_sax_words(words, alphabet_size):
     """
-    ret = numpy.zeros(len(equipartition))
-    for i in range(len(time_series)):
-        ret[i] = _convert_to_symbol(time_series[i], equipartition)
-    return ret
+    Packs each row of a 2D array of symbol indices into a single integer, with
+    one base alphabet_size digit per symbol. Words with the same symbols get
+    the same key, and the keys sort as the words do.
+    """
+    words = numpy.asarray(words, dtype=numpy.int64)
+    word_length = words.shape[1]
+    assert alphabet_size ** word_length < 2 ** 63, _PACKING_ERROR % (word_length, alphabet_size)
+
+    powers = alphabet_size ** numpy.arange(word_length - 1, -1, -1, dtype=numpy.int64)
+    return words.dot(powers)
 
 
-def _convert_to_symbol(datapoint, equipartition):
+def unpack_sax_words(keys, word_length, alphabet_size):
     """
-    Returns the index of the symbol given by the data point.
-    The data point should be drawn from a normalized N(0,1) distribution.
+    Returns the 2D array of symbol indices packed into the given keys (see pack_sax_words).
     """
-    # TODO: it's possible to optimize this
-    if datapoint < equipartition[0]:
-        return 0
-    if datapoint > equipartition[-1]:
-        return len(equipartition)
+    keys = numpy.asarray(keys, dtype=numpy.int64)
+    powers = alphabet_size ** numpy.arange(word_length - 1, -1, -1, dtype=numpy.int64)
+    return ((keys[:, None] // powers) % alphabet_size).astype(numpy.uint8)
+
 
-    for i in range(len(equipartition) - 1):
-        if equipartition[i] < datapoint and datapoint < equipartition[i + 1]:
-            return i
-    raise Exception("Data point %s not in equipartition %s" % (datapoint, equipartition))
+def _symbolize_series(time_series, equipartition):
+    """
+    Given a set of frames (assumed to be Z-normalized), converts them to
+    the symbolic representation given by the equipartition, i.e. to the
+    index i of the interval (equipartition[i], equipartition[i + 1])
+    containing each frame. Works on arrays of any shape.
+    """
+    symbols = numpy.searchsorted(equipartition, time_series) - 1
+    return numpy.clip(symbols, 0, len(equipartition) - 2)
 
 
-def _get_normal_cdf_equipartition(n):
+def get_normal_cdf_equipartition(n):
     """
-    Returns a set {x_i} of (n - 1) numbers such that:
-      * P(N(0,1) < x_0) = a
-      * P(x_{i} < N(0,1) < x_{i+1}) = a
-      * P(N(0,1) > x_{n-2}) = a
-    where a = 1 / n.
+    Returns an array {x_i} of n numbers, from x_0 = -inf to x_{n-1} = inf,
+    such that P(x_{i} < N(0,1) < x_{i+1}) = a, where a = 1 / (n - 1).
     Requires n > 1
+
+    The equipartitions are computed once per n.
     """
     assert n > 1
-    return [norm.ppf(x) for x in numpy.linspace(0, 1, n)]
+    if n not in _equipartitions:
+        _equipartitions[n] = norm.ppf(numpy.linspace(0, 1, n))
+    return _equipartitions[n]
 
 
-def _convert_to_string(arr):
-    return ''.join([chr(int(i) + ord('a')) for i in arr])
+def _convert_to_strings(symbols):
+    """
+    Converts each row of a 2D array of symbol indices to a string.
+    """
+    symbols = numpy.ascontiguousarray(symbols + ord('a'), dtype=numpy.uint8)
+    return symbols.view('S%d' % symbols.shape[1]).ravel().tolist()
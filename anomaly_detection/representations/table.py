@@ -0,0 +1,160 @@
+import collections
+
+import numpy
+
+from wrapper import convert_batch
+from ..filters import sliding_window_matrix
+
+_BUDGET_ERROR = 'The budget must be positive or None'
+
+# number of sequences whose windows are kept (e.g. the evaluation sequence
+# and the reference sequence of a semi-supervised context)
+_MAX_SEQUENCES = 4
+
+
+class RepresentationTable(object):
+    '''
+    Table of the converted windows of sequences, indexed by their start.
+
+    The windows of a given width of a sequence are converted (with the batch
+    conversion of the converter, if it has one) once, and then looked up by
+    their start index by the evaluation and reference filters (see
+    wrap_evaluation_filter and wrap_reference_filter), so that windows that
+    appear both as subsequences and in many reference sets are only converted
+    once per sequence.
+
+    By default, all windows of a sequence (with step 1) are converted on first
+    use. If lazy is set, the windows are instead converted in chunks of
+    chunk_size consecutive windows as they are needed, and if budget is given,
+    the least recently used chunks are evicted once more than budget converted
+    windows are kept.
+
+    Sequences are identified by the objects themselves, and must not be
+    modified while they are in the table (see init).
+    '''
+
+    def __init__(self, converter, lazy=False, budget=None, chunk_size=1024):
+        assert budget is None or budget > 0, _BUDGET_ERROR
+
+        self._converter = converter
+        self._lazy = lazy or budget is not None
+        self._budget = budget
+        self._chunk_size = int(chunk_size)
+        self.conversion_count = 0
+        self.init()
+
+    def init(self):
+        '''
+        Removes all sequences from the table.
+        '''
+        # (id(sequence), width) -> (sequence, window count), by recency of use
+        self._sequences = collections.OrderedDict()
+        # (id(sequence), width, chunk index) -> converted chunk, by recency of use
+        self._chunks = collections.OrderedDict()
+        self._size = 0
+
+    def get_window(self, sequence, width, start):
+        '''
+        Returns the converted window of the sequence with the given width and start.
+        '''
+        key = self._get_sequence_key(sequence, width)
+        chunk_index, offset = divmod(int(start), self._chunk_size)
+        return self._get_chunk(key, chunk_index)[offset]
+
+    def get_windows(self, sequence, width, starts):
+        '''
+        Returns the converted windows of the sequence with the given width and
+        starts, as returned by the batch conversion of the converter (e.g. as a
+        2D array), or as a list.
+        '''
+        starts = numpy.asarray(starts, dtype=int)
+        if len(starts) == 0:
+            return []
+
+        key = self._get_sequence_key(sequence, width)
+        chunk_indices = starts // self._chunk_size
+
+        parts = []
+        for chunk_index in numpy.unique(chunk_indices):
+            offsets = starts[chunk_indices == chunk_index] - chunk_index * self._chunk_size
+            parts.append(self._get_chunk(key, chunk_index)[offsets])
+
+        windows = numpy.concatenate(parts) if len(parts) > 1 else parts[0]
+        if len(parts) > 1:
+            # the parts follow the order of the chunks rather than that of the starts
+            order = numpy.argsort(chunk_indices, kind='mergesort')
+            windows = windows[numpy.argsort(order)]
+
+        return windows.tolist() if windows.dtype == object else windows
+
+    def _get_sequence_key(self, sequence, width):
+        '''
+        Returns the key of the windows of the sequence with the given width,
+        converting all of them if the table is not lazy.
+        '''
+        key = (id(sequence), int(width))
+        entry = self._sequences.pop(key, None)
+
+        # the sequence is kept in the entry, so that its id can not be reused
+        if entry is None or entry[0] is not sequence:
+            entry = (sequence, max(0, len(sequence) - int(width) + 1))
+            self._remove_chunks(key)
+            if not self._lazy:
+                self._convert_all(key, sequence, int(width))
+
+        self._sequences[key] = entry
+        if len(self._sequences) > _MAX_SEQUENCES:
+            oldest, _ = self._sequences.popitem(last=False)
+            self._remove_chunks(oldest)
+
+        return key
+
+    def _convert_all(self, key, sequence, width):
+        windows = self._convert(sequence, width, 0, max(0, len(sequence) - width + 1))
+        for chunk_index, start in enumerate(range(0, len(windows), self._chunk_size)):
+            self._add_chunk(key + (chunk_index,), windows[start:start + self._chunk_size])
+
+    def _get_chunk(self, key, chunk_index):
+        chunk_key = key + (chunk_index,)
+        chunk = self._chunks.pop(chunk_key, None)
+        if chunk is None:
+            sequence, count = self._sequences[key]
+            start = chunk_index * self._chunk_size
+            chunk = self._convert(sequence, key[1], start, min(count, start + self._chunk_size))
+
+        self._add_chunk(chunk_key, chunk)
+        return chunk
+
+    def _add_chunk(self, chunk_key, chunk):
+        '''
+        Adds the chunk as the most recently used one, evicting the least
+        recently used chunks if the budget is exceeded.
+        '''
+        self._size -= len(self._chunks.pop(chunk_key, ()))
+        self._chunks[chunk_key] = chunk
+        self._size += len(chunk)
+
+        while self._budget is not None and self._size > self._budget and len(self._chunks) > 1:
+            _, evicted = self._chunks.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _remove_chunks(self, key):
+        for chunk_key in [k for k in self._chunks if k[:2] == key]:
+            self._size -= len(self._chunks.pop(chunk_key))
+
+    def _convert(self, sequence, width, first, last):
+        '''
+        Returns the converted windows with starts in [first, last) as an
+        array, which has one object per window if the conversion returns a list.
+        '''
+        windows = sliding_window_matrix(numpy.asarray(sequence, dtype=float), width)[0]
+        converted = convert_batch(self._converter, windows[first:last])
+        self.conversion_count += last - first
+
+        if isinstance(converted, numpy.ndarray):
+            return converted
+
+        chunk = numpy.empty(len(converted), dtype=object)
+        for i, window in enumerate(converted):
+            chunk[i] = window
+        return chunk
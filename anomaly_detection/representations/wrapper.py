@@ -1,22 +1,93 @@
+import numpy
 
+from ..filters import WindowSet
 
-def wrap_evaluation_filter(evaluation_filter, converter):
+
+def wrap_evaluation_filter(evaluation_filter, converter, table=None):
     '''
     Wrapper for evaluation filters that converts their output series to a
     given representation (given by converter) before training/evaluating.
+
+    If a representation table (see RepresentationTable) is given, the converted
+    windows are looked up in it instead, which requires the evaluation filter
+    to have a width.
     '''
     def wrapper(sequence):
         for subsequence, start, end in evaluation_filter(sequence):
-            yield converter(subsequence), start, end
+            if table is None:
+                yield converter(subsequence), start, end
+            else:
+                yield table.get_window(sequence, evaluation_filter.width, start), start, end
+
+    if hasattr(evaluation_filter, 'batch'):
+        def batch_wrapper(sequence, batch_size):
+            for windows, starts, ends in evaluation_filter.batch(sequence, batch_size):
+                if table is None:
+                    yield convert_batch(converter, windows), starts, ends
+                else:
+                    yield table.get_windows(sequence, evaluation_filter.width, starts), starts, ends
+        wrapper.batch = batch_wrapper
+
+    for name in ('width', 'step'):
+        if hasattr(evaluation_filter, name):
+            setattr(wrapper, name, getattr(evaluation_filter, name))
+
     return wrapper
 
 
-def wrap_reference_filter(reference_filter, converter):
+def wrap_reference_filter(reference_filter, converter, table=None):
     '''
     Wrapper for reference filters that converts their output sequences to a
     given representation (given by converter) before training/evaluating.
+
+    If a representation table (see RepresentationTable) is given, the converted
+    windows of contexts given as ranges are looked up in it instead, which
+    requires the reference filter to have a width and a step.
     '''
     def wrapper(sequence):
         for subsequence in reference_filter(sequence):
             yield converter(subsequence)
+
+    if hasattr(reference_filter, 'from_ranges'):
+        def ranges_wrapper(context_ranges):
+            if table is not None:
+                width, step = reference_filter.width, reference_filter.step
+                return WindowSet([
+                    table.get_windows(sequence, width, numpy.arange(start, stop - width + 1, step))
+                    for sequence, start, stop in context_ranges
+                ])
+
+            reference_set = reference_filter.from_ranges(context_ranges)
+            return WindowSet([convert_batch(converter, block) for block in reference_set.blocks])
+        wrapper.from_ranges = ranges_wrapper
+
+    for name in ('width', 'step'):
+        if hasattr(reference_filter, name):
+            setattr(wrapper, name, getattr(reference_filter, name))
+
     return wrapper
+
+
+def chain_converters(first, second):
+    '''
+    Returns a converter that applies first and then second.
+    The result supports batch conversion if both converters do.
+    '''
+    converter = lambda x: second(first(x))
+    if hasattr(first, 'batch') and hasattr(second, 'batch'):
+        converter.batch = lambda windows: second.batch(first.batch(windows))
+    return converter
+
+
+def convert_batch(converter, windows):
+    '''
+    Converts a block of windows (one per row) with the given converter.
+    Uses the batch conversion of the converter if it has one, and
+    otherwise converts the windows one at a time.
+    '''
+    batch_converter = getattr(converter, 'batch', None)
+    if len(windows) == 0:
+        return []
+    if batch_converter is not None:
+        return batch_converter(windows)
+    return [converter(window) for window in windows]
@@ -2,17 +2,35 @@ import numpy
 
 
 def get_z_normalization_converter(*args):
-    return lambda time_series: convert_to_z_normalized(time_series)
+    converter = lambda time_series: convert_to_z_normalized(time_series)
+    converter.batch = lambda windows: convert_rows_to_z_normalized(windows)
+    return converter
 
 
 def convert_to_z_normalized(sequence):
     """
     Normalizes the input sequence to have zero empirical mean
     and unit empirical variance.
+    Constant sequences are normalized to zero (even if rounding errors in
+    their mean give them a tiny standard deviation).
     """
+    sequence = numpy.asarray(sequence, dtype=float)
     mean = numpy.mean(sequence)
     standard_deviation = numpy.std(sequence)
-    if standard_deviation == 0:
+    if standard_deviation == 0 or numpy.all(sequence == sequence[:1]):
         return numpy.zeros(len(sequence))
     modified_series = (sequence - mean) / standard_deviation
     return modified_series
+
+
+def convert_rows_to_z_normalized(windows):
+    """
+    Normalizes each row of the given 2D array as in convert_to_z_normalized.
+    """
+    windows = numpy.asarray(windows, dtype=float)
+    mean = numpy.mean(windows, axis=1)[:, None]
+    standard_deviation = numpy.std(windows, axis=1)[:, None]
+    constant = numpy.all(windows == windows[:, :1], axis=1)[:, None]
+    modified_windows = (windows - mean) / numpy.where(constant, 1, standard_deviation)
+    modified_windows[constant[:, 0]] = 0
+    return modified_windows
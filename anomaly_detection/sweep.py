@@ -0,0 +1,159 @@
+"""
+Evaluation of many anomaly detector configurations on the same sequence.
+
+Parameter studies typically use configurations that only differ in the k of a
+kNN evaluator or in the aggregator. For such configurations, all other stages
+(windows, representations, reference sets and distances) are computed once:
+the sorted distances to the nearest neighbors of each window serve every k,
+and the window scores of each k serve every aggregator.
+"""
+from collections import OrderedDict
+
+import numpy
+
+import aggregators
+import profiles
+from anomaly_detector import AnomalyDetector, create_anomaly_detector, _add_scores
+from configuration import copy_config, get_canonical_config
+
+
+def evaluate_sweep(configs, evaluation_sequence, batch_size=None):
+    """
+    Evaluates the given sequence with the anomaly detectors given by a list of
+    configurations (dicts of keyword arguments to create_anomaly_detector), and
+    returns a list containing their anomaly vectors.
+    """
+    anomaly_vectors = [None] * len(configs)
+
+    for indices in _group_configs(configs).values():
+        base_config = configs[indices[0]]
+
+        if _is_knn(base_config):
+            k_values = [int(configs[i]['evaluator_config'].get('k', 3)) for i in indices]
+            window_scores, starts, ends = _get_nearest_distances(base_config, max(k_values),
+                                                                 evaluation_sequence, batch_size)
+        else:
+            k_values = [None] * len(indices)
+            window_scores, starts, ends = _get_window_scores(base_config, evaluation_sequence,
+                                                             batch_size)
+
+        # configurations with the same k and aggregator give the same anomaly vector
+        aggregated = {}
+        for i, k in zip(indices, k_values):
+            key = (k, get_canonical_config(configs[i]['aggregator_config']))
+            if key not in aggregated:
+                scores = window_scores if k is None else window_scores[:, k - 1]
+                aggregator = aggregators.get_aggregator(**configs[i]['aggregator_config'])
+                aggregator.init(len(evaluation_sequence))
+                _add_scores(aggregator, scores, starts, ends)
+                aggregated[key] = aggregator.get_aggregated_scores()
+            anomaly_vectors[i] = aggregated[key]
+
+    return anomaly_vectors
+
+
+def _group_configs(configs):
+    """
+    Groups the configurations that only differ in their aggregator and, for
+    kNN evaluators, in their k. Returns an ordered dict of lists of indices.
+    """
+    groups = OrderedDict()
+
+    for i, config in enumerate(configs):
+        shared_config = dict(config)
+        shared_config.pop('aggregator_config', None)
+        if _is_knn(config):
+            shared_config['evaluator_config'] = dict(config['evaluator_config'])
+            shared_config['evaluator_config'].pop('k', None)
+
+        groups.setdefault(get_canonical_config(shared_config), []).append(i)
+
+    return groups
+
+
+def _is_knn(config):
+    return config['evaluator_config'].get('method', 'knn') == 'knn'
+
+
+def _get_nearest_distances(config, count, evaluation_sequence, batch_size=None):
+    """
+    Returns a 2D array containing the sorted distances from each window to its
+    count nearest neighbors, along with the start and end indices of the windows.
+    """
+    config = copy_config(config)
+    config['evaluator_config']['k'] = count
+    detector = create_anomaly_detector(**config)
+
+    profile_function = profiles.get_profile_function(
+        config['evaluation_filter_config'], config['context_config'],
+        config['reference_filter_config'], config['evaluator_config'],
+        config.get('representation_config'), config.get('discretization_config'),
+        nearest=True
+    )
+    if profile_function is not None:
+        return profile_function(evaluation_sequence)
+
+    recorder = _WindowScoreRecorder()
+    nearest_detector = AnomalyDetector(
+        detector.evaluation_filter, detector.context_function, detector.reference_filter,
+        _NearestDistanceEvaluator(detector.evaluator, count), recorder,
+        incremental_context=detector.incremental_context,
+        representation_table=detector.representation_table
+    )
+    nearest_detector.evaluate(evaluation_sequence, batch_size=batch_size)
+    return recorder.get_window_scores()
+
+
+def _get_window_scores(config, evaluation_sequence, batch_size=None):
+    """
+    Returns the scores of all windows, along with their start and end indices.
+    """
+    detector = create_anomaly_detector(**config)
+    recorder = _WindowScoreRecorder()
+    detector.aggregator = recorder
+    detector.evaluate(evaluation_sequence, batch_size=batch_size)
+    return recorder.get_window_scores()
+
+
+class _NearestDistanceEvaluator(object):
+    """
+    Evaluator that scores each window by the sorted distances to its count
+    nearest neighbors, through KNNEvaluator.evaluate_nearest.
+    """
+
+    def __init__(self, evaluator, count):
+        self._evaluator = evaluator
+        self._count = count
+
+    def evaluate(self, evaluation_series, reference_set, *args):
+        return self._evaluator.evaluate_nearest([evaluation_series], reference_set,
+                                                self._count)[0]
+
+    def evaluate_batch(self, evaluation_windows, reference_set, *args):
+        return self._evaluator.evaluate_nearest(evaluation_windows, reference_set, self._count)
+
+
+class _WindowScoreRecorder(object):
+    """
+    Aggregator that records the scores of all windows instead of aggregating them.
+    """
+
+    def __init__(self):
+        self.init(0)
+
+    def init(self, series_length):
+        self._scores = []
+        self._starts = []
+        self._ends = []
+
+    def add_score(self, score, start, end):
+        self._scores.append(score)
+        self._starts.append(start)
+        self._ends.append(end)
+
+    def get_aggregated_scores(self):
+        return numpy.array([])
+
+    def get_window_scores(self):
+        return (numpy.array(self._scores, dtype=float), numpy.array(self._starts, dtype=int),
+                numpy.array(self._ends, dtype=int))
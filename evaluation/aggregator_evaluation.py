@@ -1,4 +1,5 @@
-import anomaly_detection
+import copy
+
 import eval_utils as utils
 from matplotlib import pyplot
 
@@ -21,20 +22,22 @@ anomaly_vectors = []
 
 for aggregator, heat_map_plot in zip(AGGREGATORS, heat_map_plots):
 
-    # set up anomaly detectors
-    anomaly_detectors = []
+    # set up anomaly detector configurations
+    ad_configs = []
     ad_config = defaults.DEFAULT_KNN_CONFIG
     for k_value in K_VALUES:
         ad_config['evaluator_config']['k'] = k_value
         ad_config['aggregator_config']['method'] = aggregator
-        anomaly_detectors.append(anomaly_detection.create_anomaly_detector(**ad_config))
+        ad_configs.append(copy.deepcopy(ad_config))
 
     # init test
-    test = [utils.load_sequence(TEST_FILE)]
-    test_suite = utils.TestSuite(anomaly_detectors, K_VALUES, [test], ['test'])
+    test = [utils.load_shared_sequence(TEST_FILE)]
+    test_suite = utils.SweepTestSuite(ad_configs, K_VALUES, [test], ['test'],
+                                      cache=utils.ResultCache(defaults.RESULT_CACHE_DIRECTORY,
+                                                              defaults.RESULT_CACHE_SIZE))
 
     # execute test
-    test_suite.evaluate(display_progress=True)
+    test_suite.evaluate(display_progress=True, processes=defaults.PROCESSES)
 
     # get plots
     results = test_suite.results
@@ -43,7 +46,7 @@ for aggregator, heat_map_plot in zip(AGGREGATORS, heat_map_plots):
     heat_map_plot.set_title(aggregator)
     heat_map_plot.set_ylabel('k')
 
-    anomaly_vectors.append(results.get_filtered_key_values('anomaly_vector', lambda x: x['anomaly_detector'] == K_VALUES[0]))
+    anomaly_vectors.append(results.get_key_values('anomaly_vector', anomaly_detector=K_VALUES[0]))
     
     full_support_dists.append(results.get_anomaly_detector_averages(K_VALUES, 'full_support_distance'))
     equal_support_dists.append(results.get_anomaly_detector_averages(K_VALUES, 'equal_support_distance'))
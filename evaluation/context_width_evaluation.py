@@ -20,11 +20,13 @@ for context_width in CONTEXT_WIDTHS:
     anomaly_detectors.append(anomaly_detection.create_anomaly_detector(**ad_config))
 
 # init test
-test = [utils.load_sequence(TEST_FILE)]
-test_suite = utils.TestSuite(anomaly_detectors, CONTEXT_WIDTHS, [test], ['test'])
+test = [utils.load_shared_sequence(TEST_FILE)]
+test_suite = utils.TestSuite(anomaly_detectors, CONTEXT_WIDTHS, [test], ['test'],
+                             cache=utils.ResultCache(defaults.RESULT_CACHE_DIRECTORY,
+                                                     defaults.RESULT_CACHE_SIZE))
 
 # execute test
-test_suite.evaluate(display_progress=True)
+test_suite.evaluate(display_progress=True, processes=defaults.TIMING_PROCESSES)
 
 # get plots
 results = test_suite.results
@@ -1,4 +1,4 @@
-
+import multiprocessing
 
 _DEFAULT_FILTER_CONFIG = {'method': 'sliding_window', 'width': 10, 'step': 1}
 
@@ -10,3 +10,14 @@ DEFAULT_KNN_CONFIG = {
     'aggregator_config': {'method': 'mean'},
     'discretization_config': {'method': 'sax', 'dimensions': 10, 'alphabet_size': 10}
 }
+
+# number of processes used to evaluate test suites
+PROCESSES = multiprocessing.cpu_count()
+
+# number of processes used to evaluate test suites whose execution times are plotted,
+# so that the timed evaluations do not compete with each other for the processors
+TIMING_PROCESSES = 1
+
+# directory and maximum size in bytes of the cache of anomaly detector results
+RESULT_CACHE_DIRECTORY = '.result_cache'
+RESULT_CACHE_SIZE = 1 << 30
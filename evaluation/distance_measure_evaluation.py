@@ -32,11 +32,13 @@ for distance, name, heat_map_plot in zip(DISTANCE_MEASURES, DISTANCE_NAMES, heat
         anomaly_detectors.append(anomaly_detection.create_anomaly_detector(**ad_config))
 
     # init test
-    test = [utils.load_sequence(TEST_FILE)]
-    test_suite = utils.TestSuite(anomaly_detectors, K_VALUES, [test], ['test'])
+    test = [utils.load_shared_sequence(TEST_FILE)]
+    test_suite = utils.TestSuite(anomaly_detectors, K_VALUES, [test], ['test'],
+                                 cache=utils.ResultCache(defaults.RESULT_CACHE_DIRECTORY,
+                                                         defaults.RESULT_CACHE_SIZE))
 
     # execute test
-    test_suite.evaluate(display_progress=True)
+    test_suite.evaluate(display_progress=True, processes=defaults.PROCESSES)
 
     # get plots
     results = test_suite.results
@@ -32,11 +32,13 @@ for k in K_VALUES:
 
 ad_label_list = sum(ad_label_matrix, [])
 
-test = [utils.load_sequence(TEST_FILE)]
-test_suite = utils.TestSuite(anomaly_detectors, ad_label_list, [test], 'test')
+test = [utils.load_shared_sequence(TEST_FILE)]
+test_suite = utils.TestSuite(anomaly_detectors, ad_label_list, [test], 'test',
+                             cache=utils.ResultCache(defaults.RESULT_CACHE_DIRECTORY,
+                                                     defaults.RESULT_CACHE_SIZE))
 
 #execute
-test_suite.evaluate(display_progress=True)
+test_suite.evaluate(display_progress=True, processes=defaults.PROCESSES)
 
 results = test_suite.results
 
@@ -1,5 +1,9 @@
 from sequence_io import load_sequence, save_sequence
+from labels import IntervalLabels
+from sequence_store import SequenceStore, load_shared_sequence
+from result_cache import ResultCache
 from test_suite import TestSuite
+from sweep_suite import SweepTestSuite
 from plots import *
 import distances
 import anomaly_generation
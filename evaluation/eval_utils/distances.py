@@ -1,11 +1,36 @@
 from __future__ import division
-from scipy import spatial
+
+import numpy
+
+from labels import IntervalLabels
 
 _LENGTH_ERROR = 'Label and anomaly vectors have different lengths.'
 _LABEL_ERROR = 'Found an element in label vector that is not 1'
 _ANOMALY_ERROR = 'Found an element in anomaly vector smaller than 0.'
 
 
+def get_metrics(label_vector, anomaly_vector):
+    '''
+    Returns a dict with all distances between the label vector and the
+    anomaly vector (equal_support, full_support, best_support and
+    normalized_euclidean), as well as the roc_auc and pr_auc scores of the
+    anomaly vector.
+
+    The anomaly vector is only sorted once, and every distance is computed
+    from the sorted vector in O(n).
+    '''
+    ranking = _Ranking(label_vector, anomaly_vector)
+
+    return {
+        'equal_support': _get_threshold_distance(ranking, ranking.get_equal_support_threshold()),
+        'full_support': _get_threshold_distance(ranking, ranking.get_full_support_threshold()),
+        'best_support': _get_best_support(ranking),
+        'normalized_euclidean': normalized_euclidean(label_vector, anomaly_vector),
+        'roc_auc': _get_roc_auc(ranking),
+        'pr_auc': _get_pr_auc(ranking)
+    }
+
+
 def equal_support(label_vector, anomaly_vector):
     '''
     Finds the largest threshold such that the number of elements
@@ -19,33 +44,8 @@ def equal_support(label_vector, anomaly_vector):
     that all elements in anomaly_vector are larger than 1,
     and that label_vector and anomaly_vector have the same length.
     '''
-    support_size = sum(l for l in label_vector)
-
-    threshold = _get_equal_support_threshold(anomaly_vector, support_size)
-
-    vec1 = [i == 1 for i in label_vector]
-    vec2 = [a >= threshold for a in anomaly_vector]
-    distance = spatial.distance.hamming(vec1, vec2)
-
-    assert distance >= 0
-
-    return distance
-
-
-def _get_equal_support_threshold(anomaly_vector, support_size):
-    '''
-    Finds the smallest number t such that the number of elements
-    in anomaly_vector that are larger than t is at least support_size.
-    
-    Note that the complexity can be reduced by performing a search
-    instead of trying every single element.
-    '''
-
-    unique_elements_sorted = reversed(sorted(set(anomaly_vector)))
-
-    for t in unique_elements_sorted:
-        if sum(a >= t for a in anomaly_vector) >= support_size:
-            return t
+    ranking = _Ranking(label_vector, anomaly_vector)
+    return _get_threshold_distance(ranking, ranking.get_equal_support_threshold())
 
 
 def normalized_euclidean(label_vector, anomaly_vector):
@@ -57,15 +57,21 @@ def normalized_euclidean(label_vector, anomaly_vector):
     regular Euclidean distance is taken between the label vector and the
     anomaly vector.
     '''
-    min_val = min(anomaly_vector)
-    width = max(anomaly_vector) - min_val
-    normalized_anomaly_vector = [(x - min_val) / width for x in anomaly_vector]
+    anomaly_vector = numpy.asarray(anomaly_vector, dtype=float)
+    min_val = anomaly_vector.min()
+    width = anomaly_vector.max() - min_val
+    normalized_anomaly_vector = (anomaly_vector - min_val) / width
 
-    distance = spatial.distance.euclidean(normalized_anomaly_vector,
-                                          label_vector)
+    if isinstance(label_vector, IntervalLabels):
+        # (a - l)^2 = a^2 - 2a + 1 for elements labeled 1, and a^2 otherwise
+        labeled = label_vector.get_labeled_values(normalized_anomaly_vector)
+        squared_distance = (numpy.dot(normalized_anomaly_vector, normalized_anomaly_vector) -
+                            2 * labeled.sum() + len(labeled))
+        return numpy.sqrt(max(squared_distance, 0))
+
+    differences = normalized_anomaly_vector - numpy.asarray(label_vector, dtype=float)
+    return numpy.sqrt(numpy.dot(differences, differences))
 
-    return distance
-    
 
 def full_support(label_vector, anomaly_vector):
     '''
@@ -78,17 +84,8 @@ def full_support(label_vector, anomaly_vector):
     that all elements in anomaly_vector are larger than 1,
     and that label_vector and anomaly_vector have the same length.
     '''
-    nonzero_indices = filter(lambda (i, val): val > 0, enumerate(label_vector))
-
-    threshold = _get_full_support_threshold(anomaly_vector, nonzero_indices)
-
-    vec1 = [i == 1 for i in label_vector]
-    vec2 = [a >= threshold for a in anomaly_vector]
-    distance = spatial.distance.hamming(vec1, vec2)
-
-    assert distance >= 0
-
-    return distance
+    ranking = _Ranking(label_vector, anomaly_vector)
+    return _get_threshold_distance(ranking, ranking.get_full_support_threshold())
 
 
 def best_support(label_vector, anomaly_vector):
@@ -96,35 +93,169 @@ def best_support(label_vector, anomaly_vector):
     Finds the threshold that minimizes the error, and returns
     the corresponding error.
     """
-    unique_elements = reversed(sorted(set(anomaly_vector)))
+    return _get_best_support(_Ranking(label_vector, anomaly_vector))
 
-    min_distance = float('inf')
 
-    for threshold in unique_elements:
-        vec1 = [i == 1 for i in label_vector]
-        vec2 = [a >= threshold for a in anomaly_vector]
-        distance = spatial.distance.hamming(vec1, vec2)
-        if distance < min_distance:
-            min_distance = distance
+def roc_auc(label_vector, anomaly_vector):
+    '''
+    Returns the area under the ROC curve of the anomaly vector, i.e. the
+    probability that a random element labeled 1 gets a higher anomaly score
+    than a random other element (ties counting half).
+    Returns NaN if all or none of the elements are labeled 1.
+    '''
+    return _get_roc_auc(_Ranking(label_vector, anomaly_vector))
 
-    assert min_distance >= 0
 
-    return min_distance
+def pr_auc(label_vector, anomaly_vector):
+    '''
+    Returns the area under the precision-recall curve of the anomaly vector,
+    computed as the average precision over all thresholds.
+    Returns NaN if no elements are labeled 1.
+    '''
+    return _get_pr_auc(_Ranking(label_vector, anomaly_vector))
+
 
+class _Ranking(object):
+    '''
+    The scores of an anomaly vector, and the scores of its elements labeled 1,
+    sorted by decreasing score, along with the number of elements, and of
+    elements labeled 1, scoring at least each unique score. NaN scores are
+    sorted last, and never reach any threshold.
+
+    The label vector is either a dense vector or interval labels (see
+    IntervalLabels), which are used without being expanded.
+    '''
 
-def _get_full_support_threshold(anomaly_vector, nonzero_indices):
+    def __init__(self, label_vector, anomaly_vector):
+        anomaly_vector = numpy.asarray(anomaly_vector, dtype=float)
+        assert len(label_vector) == len(anomaly_vector), _LENGTH_ERROR
+
+        self.anomaly_vector = anomaly_vector
+        self.length = len(anomaly_vector)
+
+        if isinstance(label_vector, IntervalLabels):
+            self.support_size = label_vector.sum()
+            labeled_scores = label_vector.get_labeled_values(anomaly_vector)
+            # all labels are 1, so the non-zero labels are the labels equal to 1
+            self.nonzero_scores = labeled_scores
+        else:
+            label_vector = numpy.asarray(label_vector)
+            self.support_size = label_vector.sum()
+            labeled_scores = anomaly_vector[label_vector == 1]
+            self.nonzero_scores = anomaly_vector[label_vector > 0]
+
+        self.total_positives = len(labeled_scores)
+
+        # the scores (without NaN) sorted in decreasing order
+        is_nan = numpy.isnan(anomaly_vector)
+        self.has_nan = is_nan.any()
+        scores = numpy.sort(anomaly_vector[~is_nan])[::-1]
+        labeled_scores = numpy.sort(labeled_scores[~numpy.isnan(labeled_scores)])
+
+        # the last position of each unique score, and the counts at its threshold
+        last = numpy.flatnonzero(numpy.diff(scores) != 0)
+        last = numpy.append(last, len(scores) - 1) if len(scores) else last
+        self._scores = scores
+        self._labeled_scores = labeled_scores
+
+        self.thresholds = scores[last]
+        self.counts = last + 1
+        self.positive_counts = self.count_positives(self.thresholds)
+
+    def count(self, thresholds):
+        '''
+        Returns the number of elements that are at least each threshold.
+        '''
+        return numpy.searchsorted(-self._scores, -numpy.asarray(thresholds), side='right')
+
+    def count_positives(self, thresholds):
+        '''
+        Returns the number of elements labeled 1 that are at least each threshold.
+        '''
+        return len(self._labeled_scores) - numpy.searchsorted(self._labeled_scores, thresholds)
+
+    def get_equal_support_threshold(self):
+        '''
+        Returns the largest threshold t such that the number of elements that
+        are at least t is at least the sum of the label vector, or None.
+        '''
+        index = numpy.searchsorted(self.counts, self.support_size)
+        return self.thresholds[index] if index < len(self.thresholds) else None
+
+    def get_full_support_threshold(self):
+        '''
+        Returns the largest threshold t such that all elements with a
+        non-zero label are at least t, or None.
+        '''
+        if len(self.nonzero_scores) == 0:
+            return self.thresholds[0] if len(self.thresholds) else None
+        if numpy.isnan(self.nonzero_scores).any():
+            return None
+        return self.nonzero_scores.min()
+
+
+def _get_threshold_distance(ranking, threshold):
     '''
-    Finds the smallest number t such that the number of elements
-    in anomaly_vector that are larger than t is at least support_size.
-    
-    Note that the speed can be improved by using a better algorithm.
+    Returns the hamming distance between the elements labeled 1 and the
+    elements that are at least the threshold (all elements, if it is None).
     '''
+    if threshold is None:
+        predicted, true_positives = ranking.length, ranking.total_positives
+    else:
+        predicted = ranking.count(threshold)
+        true_positives = ranking.count_positives(threshold)
+
+    errors = (predicted - true_positives) + (ranking.total_positives - true_positives)
+    distance = errors / ranking.length
+
+    assert distance >= 0
+
+    return distance
+
+
+def _get_best_support(ranking):
+    # errors at each threshold: the positives below it and the negatives above it
+    errors = ((ranking.total_positives - ranking.positive_counts) +
+              (ranking.counts - ranking.positive_counts))
+    if ranking.has_nan:
+        # a NaN threshold is reached by no elements
+        errors = numpy.append(errors, ranking.total_positives)
+
+    min_distance = errors.min() / ranking.length if len(errors) else float('inf')
+
+    assert min_distance >= 0
+
+    return min_distance
+
+
+def _get_roc_auc(ranking):
+    positives = ranking.positive_counts
+    negatives = ranking.counts - positives
+    total_negatives = ranking.length - ranking.total_positives
+    if ranking.total_positives == 0 or total_negatives == 0:
+        return float('nan')
+
+    # the negatives of each unique score, and the positives scoring (strictly) higher
+    new_negatives = numpy.diff(numpy.append(0, negatives))
+    new_positives = numpy.diff(numpy.append(0, positives))
+    higher_positives = positives - new_positives
+
+    # NaN scores are ranked below all other scores
+    higher_positives = numpy.append(higher_positives, positives[-1] if len(positives) else 0)
+    new_negatives = numpy.append(new_negatives, total_negatives - new_negatives.sum())
+    new_positives = numpy.append(new_positives, ranking.total_positives - new_positives.sum())
+
+    pairs = numpy.dot(new_negatives, higher_positives + new_positives / 2)
+    return pairs / (ranking.total_positives * total_negatives)
+
 
-    unique_elements_sorted = reversed(sorted(set(anomaly_vector)))
+def _get_pr_auc(ranking):
+    if ranking.total_positives == 0:
+        return float('nan')
 
-    for t in unique_elements_sorted:
-        if all(anomaly_vector[i] >= t for (i, _) in nonzero_indices):
-            return t
+    precisions = ranking.positive_counts / ranking.counts
+    recall_steps = numpy.diff(numpy.append(0, ranking.positive_counts)) / ranking.total_positives
+    return numpy.dot(recall_steps, precisions)
 
 
 def _verify_inputs(label_vector, anomaly_vector):
@@ -0,0 +1,94 @@
+import numpy
+
+_INTERVAL_ERROR = 'Invalid label interval: %s'
+
+
+class IntervalLabels(object):
+    '''
+    Binary label vector of a sequence, represented by a sorted list of disjoint
+    (start, end) intervals (inclusive) of the elements labeled 1.
+
+    Interval labels take O(#anomalies) memory regardless of the sequence length,
+    and the metrics in the distances module use them without expanding them.
+    For compatibility with dense label vectors, they have a length, can be
+    iterated over and can be converted to arrays (see to_dense).
+    '''
+
+    def __init__(self, intervals, length):
+        self.length = int(length)
+        self.intervals = _normalize_intervals(intervals, self.length)
+
+    @classmethod
+    def from_dense(cls, label_vector):
+        '''
+        Returns the interval labels of the elements of label_vector that are 1.
+        '''
+        labeled = numpy.concatenate([[False], numpy.asarray(label_vector) == 1, [False]])
+        changes = numpy.flatnonzero(numpy.diff(labeled.astype(int)))
+        return cls(numpy.column_stack([changes[::2], changes[1::2] - 1]), len(labeled) - 2)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self.to_dense().tolist())
+
+    def __array__(self, dtype=None):
+        dense = self.to_dense()
+        return dense if dtype is None else dense.astype(dtype)
+
+    def __repr__(self):
+        return 'IntervalLabels(%s, %d)' % (self.intervals.tolist(), self.length)
+
+    def sum(self):
+        '''
+        Returns the number of elements labeled 1.
+        '''
+        return int((self.intervals[:, 1] - self.intervals[:, 0] + 1).sum())
+
+    def to_dense(self):
+        '''
+        Returns the label vector as an array of 0s and 1s.
+        '''
+        dense = numpy.zeros(self.length, dtype=int)
+        for start, end in self.intervals:
+            dense[start:end + 1] = 1
+        return dense
+
+    def get_labeled_values(self, vector):
+        '''
+        Returns the elements of vector that are labeled 1, in order.
+        '''
+        vector = numpy.asarray(vector)
+        if len(self.intervals) == 0:
+            return vector[:0]
+        return numpy.concatenate([vector[start:end + 1] for start, end in self.intervals])
+
+    def union(self, other):
+        '''
+        Returns the labels of the elements labeled 1 in either labels.
+        '''
+        assert self.length == len(other)
+        if not isinstance(other, IntervalLabels):
+            other = IntervalLabels.from_dense(other)
+        return IntervalLabels(numpy.concatenate([self.intervals, other.intervals]), self.length)
+
+
+def _normalize_intervals(intervals, length):
+    '''
+    Returns the given intervals as a sorted (m, 2) array, in which overlapping
+    and adjacent intervals are merged.
+    '''
+    intervals = numpy.asarray(intervals, dtype=int).reshape(-1, 2)
+    assert ((intervals[:, 0] <= intervals[:, 1]).all() and (intervals[:, 0] >= 0).all() and
+            (intervals[:, 1] < length).all()), _INTERVAL_ERROR % intervals.tolist()
+
+    intervals = intervals[numpy.argsort(intervals[:, 0], kind='mergesort')]
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    return numpy.array(merged, dtype=int).reshape(-1, 2)
@@ -53,10 +53,7 @@ def plot_average_value_heat_map(results, label_matrix, x_values, y_values, key,
     Produces a heat map of the average value of the given key.
     """
     label_matrix = numpy.array(label_matrix)
-    z_values = []
-    for label in label_matrix.flat:
-        z = results.get_filtered_avg_over_key(key, lambda x: x['anomaly_detector'] == label)
-        z_values.append(z)
+    z_values = results.get_grouped_averages(key, label_matrix.ravel().tolist())
 
     Z = numpy.reshape(z_values, (label_matrix.shape[0], label_matrix.shape[1])).T
 
@@ -88,9 +85,7 @@ def plot_anomaly_vectors(results, ad_labels, ad_legend, xlabel=None, ylabel=None
     max_val = 0
 
     for ad_label, legend in zip(ad_labels, ad_legend):
-        filter_predicate = lambda x: x['anomaly_detector'] == ad_label
-
-        anomaly_vector = results.get_filtered_key_values('anomaly_vector', filter_predicate)[0]
+        anomaly_vector = results.get_key_values('anomaly_vector', anomaly_detector=ad_label)[0]
 
         if normalize:
             anomaly_vector = _normalize_array(anomaly_vector)
@@ -109,29 +104,11 @@ def plot_anomaly_vectors(results, ad_labels, ad_legend, xlabel=None, ylabel=None
 
 def plot_mean_error_values(results, ad_labels, xvalues, plot=None, title=None, xlabel=None, ylabel=None):
 
-    full_support_errors = []
-    for label in ad_labels:
-        z = results.get_filtered_avg_over_key('full_support_distance',
-                                              lambda x: x['anomaly_detector'] == label)
-        full_support_errors.append(z)
-
-    equal_support_errors = []
-    for label in ad_labels:
-        z = results.get_filtered_avg_over_key('equal_support_distance',
-                                              lambda x: x['anomaly_detector'] == label)
-        equal_support_errors.append(z)
-
-    best_support_errors = []
-    for label in ad_labels:
-        z = results.get_filtered_avg_over_key('best_support_distance',
-                                              lambda x: x['anomaly_detector'] == label)
-        best_support_errors.append(z)
-
-    normalized_euclidean_errors = []
-    for label in ad_labels:
-        z = results.get_filtered_avg_over_key('normalized_euclidean_distance',
-                                              lambda x: x['anomaly_detector'] == label)
-        normalized_euclidean_errors.append(z)
+    full_support_errors = results.get_grouped_averages('full_support_distance', ad_labels)
+    equal_support_errors = results.get_grouped_averages('equal_support_distance', ad_labels)
+    best_support_errors = results.get_grouped_averages('best_support_distance', ad_labels)
+    normalized_euclidean_errors = results.get_grouped_averages('normalized_euclidean_distance',
+                                                               ad_labels)
 
     full_support_errors = _normalize_array(full_support_errors)
     equal_support_errors = _normalize_array(equal_support_errors)
@@ -160,12 +137,7 @@ def plot_execution_times(results, ad_labels, xvalues, plot=None, title=None,
 
     fig, plot = _init_plot(plot)
 
-    times = []
-    for label in ad_labels:
-        filter_function = lambda x: x['anomaly_detector'] == label
-        z = results.get_filtered_sum_over_key('execution_time', filter_function)
-                                              
-        times.append(z)
+    times = results.get_grouped_sums('execution_time', ad_labels)
 
     plot.plot(xvalues, times, 'k')
 
@@ -184,9 +156,7 @@ def _get_anomaly_vectors(results, label_list):
     anomaly_vectors = []
 
     for label in label_list:
-        filter_predicate = lambda x: x['anomaly_detector'] == label
-
-        temp_vectors = results.get_filtered_key_values('anomaly_vector', filter_predicate)
+        temp_vectors = results.get_key_values('anomaly_vector', anomaly_detector=label)
         assert len(temp_vectors) == 1, 'Several anomaly vectors found for label %s' % label
         anomaly_vector = temp_vectors[0]
 
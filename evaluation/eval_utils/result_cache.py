@@ -0,0 +1,195 @@
+import errno
+import fcntl
+import hashlib
+import os
+import tempfile
+import zipfile
+
+import numpy
+
+from anomaly_detection import get_canonical_config
+
+# part of every key, to be incremented whenever cached results become invalid
+_CACHE_VERSION = 1
+_LOCK_FILE_NAME = '.lock'
+_SIZE_FILE_NAME = '.size'
+_DEFAULT_MAX_SIZE = 1 << 30
+# fraction of max_size the results are reduced to when they take up more than max_size
+_EVICTION_FRACTION = 0.9
+
+
+class ResultCache(object):
+    '''
+    Persistent cache of anomaly detector results, which can be shared by
+    concurrent processes.
+
+    Results are stored in .npz files named after a SHA-1 key of the anomaly
+    detector configuration (see anomaly_detection.get_canonical_config) and of
+    the contents of the evaluated sequence, so that unchanged results are found
+    again by later runs regardless of how the detectors are set up.
+
+    Results are written to temporary files which are then renamed, so that
+    readers never see partial results. The total size of the files is tracked
+    in an index file, and when it grows above max_size bytes, the least
+    recently used files are removed until they take up a fraction of max_size,
+    so that the directory is only scanned once in many puts.
+    '''
+
+    def __init__(self, directory, max_size=_DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # another process may have created it in the meantime
+                if not os.path.isdir(directory):
+                    raise
+
+    def get(self, config, sequence):
+        '''
+        Returns the cached (anomaly vector, execution time) of the anomaly detector
+        with the given configuration on the given sequence, or None.
+        '''
+        path = self._get_path(config, sequence)
+
+        try:
+            with numpy.load(path) as result:
+                anomaly_vector = result['anomaly_vector']
+                execution_time = float(result['execution_time'])
+            # the modification time records the last use, for eviction
+            os.utime(path, None)
+        except (IOError, OSError, KeyError, ValueError, zipfile.BadZipfile):
+            # missing, or removed by another process in the meantime
+            return None
+
+        return anomaly_vector, execution_time
+
+    def put(self, config, sequence, anomaly_vector, execution_time):
+        '''
+        Stores the anomaly vector and execution time of the anomaly detector with
+        the given configuration on the given sequence.
+        '''
+        path = self._get_path(config, sequence)
+
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as result_file:
+                numpy.savez(result_file, anomaly_vector=numpy.asarray(anomaly_vector, dtype=float),
+                            execution_time=execution_time)
+            added_size = os.path.getsize(temporary_path) - _get_size(path)
+            os.rename(temporary_path, path)
+        except:
+            os.remove(temporary_path)
+            raise
+
+        with self._lock():
+            size = self._read_size()
+            if size is not None and size + added_size <= self.max_size:
+                self._write_size(size + added_size)
+            else:
+                self._evict()
+
+    def clear(self):
+        '''
+        Removes all results from the cache.
+        '''
+        with self._lock():
+            for name in os.listdir(self.directory):
+                if name.endswith('.npz'):
+                    _remove(os.path.join(self.directory, name))
+            self._write_size(0)
+
+    def _get_path(self, config, sequence):
+        '''
+        Returns the path of the result file of the given configuration and sequence.
+        '''
+        sequence = numpy.ascontiguousarray(sequence)
+        key = hashlib.sha1(repr((_CACHE_VERSION, get_canonical_config(config),
+                                 sequence.dtype.str, sequence.shape)))
+        key.update(sequence)
+        return os.path.join(self.directory, key.hexdigest() + '.npz')
+
+    def _evict(self):
+        '''
+        Scans the results, removes the least recently used ones if they take up
+        more than max_size bytes, and records the size of the remaining ones.
+        Must be called with the lock held.
+        '''
+        results = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                results.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(result_size for _, result_size, _ in results)
+        if size > self.max_size:
+            for _, result_size, path in sorted(results):
+                if size <= _EVICTION_FRACTION * self.max_size:
+                    break
+                _remove(path)
+                size -= result_size
+
+        self._write_size(size)
+
+    def _read_size(self):
+        '''
+        Returns the total size of the results recorded in the index file, or
+        None if it is missing or invalid. Must be called with the lock held.
+        '''
+        try:
+            with open(os.path.join(self.directory, _SIZE_FILE_NAME)) as size_file:
+                return int(size_file.read())
+        except (IOError, ValueError):
+            return None
+
+    def _write_size(self, size):
+        with open(os.path.join(self.directory, _SIZE_FILE_NAME), 'w') as size_file:
+            size_file.write(str(size))
+
+    def _lock(self):
+        return _FileLock(os.path.join(self.directory, _LOCK_FILE_NAME))
+
+
+class _FileLock(object):
+    '''
+    Exclusive lock on a file, shared by all processes on the machine.
+    '''
+
+    def __init__(self, path):
+        self._path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._path, 'a')
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *args):
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+def _get_size(path):
+    '''
+    Returns the size of the file, or 0 if it does not exist.
+    '''
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError as error:
+        # another process may have removed it in the meantime
+        if error.errno != errno.ENOENT:
+            raise
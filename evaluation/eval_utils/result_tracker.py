@@ -2,41 +2,122 @@ from __future__ import division
 
 import numpy
 
+# fields that are stored in columns of floats
+_NUMERIC_KEYS = ('execution_time', 'equal_support_distance', 'full_support_distance',
+                 'best_support_distance', 'normalized_euclidean_distance', 'roc_auc', 'pr_auc')
+# fields that are stored as label codes
+_LABEL_KEYS = ('anomaly_detector', 'test')
+
+_INITIAL_CAPACITY = 64
+
 
 class ResultTracker(object):
     """
     Keeps track of and displays test results.
 
-    Supports limited aggregation and filtering of results.
+    Records are stored in columns: numeric fields in arrays of floats (along
+    with masks of the fields that were given), and labels as integer codes,
+    with a hashed index from each label to its records. This allows results
+    to be selected by label (see get_key_values) and averaged or summed per
+    label (see get_grouped_averages and get_grouped_sums) without scanning
+    every record in Python.
+
+    Arbitrary filtering of results is still supported through the
+    get_filtered_* methods, which do scan every record. The records are
+    only converted to dicts for these methods once, and then kept up to date
+    as records are added.
 
-    Note that while the aggregation is inefficient, this is not likely
-    to be a problem except for huge tests.
+    Results can be saved to and loaded from .npz files (see save and load).
     """
 
     def __init__(self, suite_label):
         self._suite_label = suite_label
-        self._results = []
-        self._anomaly_detector_labels = set()
-        self._test_labels = set()
+        self._size = 0
+
+        self._columns = dict((key, numpy.zeros(_INITIAL_CAPACITY)) for key in _NUMERIC_KEYS)
+        self._present = dict((key, numpy.zeros(_INITIAL_CAPACITY, dtype=bool))
+                             for key in _NUMERIC_KEYS)
+        self._anomaly_vectors = []
+        # the records as dicts, built on first use by the get_filtered_* methods
+        self._records = None
+
+        # label codes of each record, the labels of each code, and the records of each label
+        self._codes = dict((key, numpy.zeros(_INITIAL_CAPACITY, dtype=int)) for key in _LABEL_KEYS)
+        self._labels = dict((key, []) for key in _LABEL_KEYS)
+        self._label_indexes = dict((key, {}) for key in _LABEL_KEYS)
 
     def add_record(self, anomaly_detector_label, test_label, execution_time=None,
                    equal_support_distance=None, full_support_distance=None,
                    best_support_distance=None, normalized_euclidean_distance=None,
-                   anomaly_vector=None):
+                   roc_auc=None, pr_auc=None, anomaly_vector=None):
 
-        self._anomaly_detector_labels.add(anomaly_detector_label)
-        self._test_labels.add(test_label)
+        if self._size == len(self._codes['test']):
+            self._grow()
+        i = self._size
 
-        self._results.append({
-            'anomaly_detector': anomaly_detector_label,
-            'test': test_label,
+        values = {
             'execution_time': execution_time,
             'equal_support_distance': equal_support_distance,
             'full_support_distance': full_support_distance,
             'best_support_distance': best_support_distance,
             'normalized_euclidean_distance': normalized_euclidean_distance,
-            'anomaly_vector': anomaly_vector
-        })
+            'roc_auc': roc_auc,
+            'pr_auc': pr_auc
+        }
+        for key, value in values.items():
+            if value is not None:
+                self._columns[key][i] = value
+                self._present[key][i] = True
+
+        labels = {'anomaly_detector': anomaly_detector_label, 'test': test_label}
+        for key, label in labels.items():
+            index = self._label_indexes[key]
+            if label not in index:
+                index[label] = _LabelIndex(len(self._labels[key]))
+                self._labels[key].append(label)
+            index[label].rows.append(i)
+            self._codes[key][i] = index[label].code
+
+        self._anomaly_vectors.append(anomaly_vector)
+        self._size += 1
+
+        if self._records is not None:
+            self._records.append(self._get_record(i))
+
+    def get_key_values(self, key, anomaly_detector=None, test=None):
+        """
+        Returns the values of the field specified by key, in all entries with
+        the given anomaly detector and test labels (if given).
+
+        Entries that do not contain the key are ignored.
+        """
+        rows = self._get_rows(anomaly_detector, test)
+
+        if key == 'anomaly_vector':
+            return [self._anomaly_vectors[i] for i in rows
+                    if self._anomaly_vectors[i] is not None]
+        if key in _LABEL_KEYS:
+            return [self._labels[key][code] for code in self._codes[key][rows]]
+
+        present = self._present[key][rows]
+        return self._columns[key][rows[present]].tolist()
+
+    def get_grouped_sums(self, key, labels, group_by='anomaly_detector'):
+        """
+        Returns a list of the sums of the field specified by key, over the
+        entries of each of the given labels of the field group_by.
+        """
+        sums, _ = self._get_grouped_totals(key, labels, group_by)
+        return sums.tolist()
+
+    def get_grouped_averages(self, key, labels, group_by='anomaly_detector'):
+        """
+        Returns a list of the averages of the field specified by key, over the
+        entries of each of the given labels of the field group_by (or None,
+        for labels without entries).
+        """
+        sums, counts = self._get_grouped_totals(key, labels, group_by)
+        return [total / count if count > 0 else None for total, count in zip(sums, counts)]
 
     def get_filtered_key_values(self, key, filter_predicate):
         """
@@ -46,7 +127,7 @@ class ResultTracker(object):
         Entries that do not contain the key are ignored.
         """
         wrapped_filter = lambda x: x[key] is not None and filter_predicate(x)
-        return [x[key] for x in filter(wrapped_filter, self._results)]
+        return [x[key] for x in filter(wrapped_filter, self._get_records())]
 
     def get_filtered_sum_over_key(self, key, filter_predicate):
         """
@@ -72,47 +153,189 @@ class ResultTracker(object):
         Returns a list of the average value of 'key' over the anomaly
         detector labels in ad_labels.
         """
-        filter_function = lambda x: x['anomaly_detector'] == l
-        return [self.get_filtered_avg_over_key(key, filter_function) for l in ad_labels]
+        return self.get_grouped_averages(key, ad_labels)
+
+    def get_anomaly_detector_sums(self, ad_labels, key):
+        """
+        Returns a list of the sum of 'key' over the anomaly detector
+        labels in ad_labels.
+        """
+        return self.get_grouped_sums(key, ad_labels)
+
+    def save(self, path):
+        """
+        Saves the results to an .npz file at the given path.
+        """
+        size = self._size
+        vectors = self._anomaly_vectors
+        lengths = numpy.array([-1 if v is None else len(v) for v in vectors], dtype=int)
+
+        arrays = {
+            'suite_label': _to_object_array([self._suite_label]),
+            'anomaly_vector_lengths': lengths,
+            'anomaly_vectors': numpy.concatenate(
+                [numpy.asarray(v, dtype=float) for v in vectors if v is not None] or [[]])
+        }
+        for key in _NUMERIC_KEYS:
+            arrays[key] = self._columns[key][:size]
+            arrays[key + '_present'] = self._present[key][:size]
+        for key in _LABEL_KEYS:
+            arrays[key + '_codes'] = self._codes[key][:size]
+            arrays[key + '_labels'] = _to_object_array(self._labels[key])
+
+        numpy.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads results saved by save from the .npz file at the given path.
+        """
+        with numpy.load(path, allow_pickle=True) as arrays:
+            tracker = cls(arrays['suite_label'][0])
+
+            lengths = arrays['anomaly_vector_lengths']
+            offsets = numpy.cumsum(numpy.maximum(lengths, 0)) - numpy.maximum(lengths, 0)
+            vectors = arrays['anomaly_vectors']
+            tracker._anomaly_vectors = [None if length < 0 else vectors[offset:offset + length]
+                                        for offset, length in zip(offsets, lengths)]
+            tracker._size = len(lengths)
+
+            for key in _NUMERIC_KEYS:
+                if key in arrays:
+                    tracker._columns[key] = numpy.array(arrays[key], dtype=float)
+                    tracker._present[key] = numpy.array(arrays[key + '_present'], dtype=bool)
+                else:
+                    # the field was added after the results were saved
+                    tracker._columns[key] = numpy.zeros(len(lengths))
+                    tracker._present[key] = numpy.zeros(len(lengths), dtype=bool)
+            for key in _LABEL_KEYS:
+                codes = numpy.array(arrays[key + '_codes'], dtype=int)
+                tracker._codes[key] = codes
+                tracker._labels[key] = arrays[key + '_labels'].tolist()
+                tracker._label_indexes[key] = _get_label_indexes(tracker._labels[key], codes)
+
+        return tracker
 
     def print_results(self):
         self._print_header()
 
-        for ad_label in self._anomaly_detector_labels:
+        ad_labels = self._labels['anomaly_detector']
+        test_labels = self._labels['test']
+        pairs = [(ad_label, test_label) for ad_label in ad_labels for test_label in test_labels]
+
+        test_details = self._get_details(pairs, ('anomaly_detector', 'test'))
+        total_details = self._get_details(ad_labels, 'anomaly_detector')
+
+        for i, ad_label in enumerate(ad_labels):
             self._print_anomaly_detection_header(ad_label)
 
-            for test_label in self._test_labels:
-                self._print_test_results(ad_label, test_label)
+            for j, test_label in enumerate(test_labels):
+                print("\n\t\tTest '%s':" % (test_label,))
+                self._print_test_details(*test_details[i * len(test_labels) + j])
 
-            self._print_anomaly_detection_totals(ad_label)
+            print("\n\t\tTotal:")
+            self._print_test_details(*total_details[i])
 
-    def _print_header(self):
-        print("\n\nResults for test suite '%s':" % self._suite_label)
+    def _grow(self):
+        """
+        Doubles the capacity of the columns (or gives empty columns the
+        initial capacity).
+        """
+        capacity = max(2 * len(self._codes['test']), _INITIAL_CAPACITY)
+        for columns in [self._columns, self._present, self._codes]:
+            for key, column in columns.items():
+                grown = numpy.zeros(capacity, dtype=column.dtype)
+                grown[:len(column)] = column
+                columns[key] = grown
 
-    def _print_anomaly_detection_header(self, label):
-        print("\n\tAnomaly detector '%s':" % label)
+    def _get_rows(self, anomaly_detector=None, test=None):
+        """
+        Returns the indices of the records with the given labels, in insertion order.
+        """
+        rows = None
+        for key, label in [('anomaly_detector', anomaly_detector), ('test', test)]:
+            if label is not None:
+                index = self._label_indexes[key].get(label)
+                selected = numpy.array(index.rows if index is not None else [], dtype=int)
+                rows = selected if rows is None else numpy.intersect1d(rows, selected)
+        return numpy.arange(self._size) if rows is None else rows
 
-    def _print_test_results(self, ad_label, test_label):
-        print("\n\t\tTest '%s':" % test_label)
+    def _get_grouped_totals(self, key, labels, group_by):
+        """
+        Returns arrays of the sums and counts of the values of the field specified
+        by key, for each of the given labels of the field (or tuple of fields)
+        group_by.
+        """
+        if isinstance(group_by, tuple):
+            # groups of several fields are indexed by mixed radix codes
+            codes = numpy.zeros(self._size, dtype=int)
+            label_codes = numpy.zeros(len(labels), dtype=int)
+            for i, field in enumerate(group_by):
+                radix = len(self._labels[field]) + 1
+                codes = codes * radix + self._codes[field][:self._size]
+                label_codes = label_codes * radix + self._get_label_codes(
+                    field, [label[i] for label in labels])
+        else:
+            codes = self._codes[group_by][:self._size]
+            label_codes = self._get_label_codes(group_by, labels)
 
-        relevance_filter = lambda x: x['anomaly_detector'] == ad_label and x['test'] == test_label
+        present = self._present[key][:self._size]
+        codes = codes[present]
+        values = self._columns[key][:self._size][present]
 
-        self._print_test_details(relevance_filter)
+        length = max(codes.max() if len(codes) else 0, label_codes.max() if len(labels) else 0) + 1
+        sums = numpy.bincount(codes, weights=values, minlength=length)
+        counts = numpy.bincount(codes, minlength=length)
+        return sums[label_codes], counts[label_codes]
 
-    def _print_anomaly_detection_totals(self, ad_label):
-        print("\n\t\tTotal:")
+    def _get_label_codes(self, field, labels):
+        """
+        Returns the codes of the given labels of a field. Unknown labels get a
+        code that no record has.
+        """
+        index = self._label_indexes[field]
+        unknown = len(self._labels[field])
+        return numpy.array([index[label].code if label in index else unknown for label in labels],
+                           dtype=int)
 
-        relevance_filter = (lambda x: x['anomaly_detector'] == ad_label)
+    def _get_details(self, labels, group_by):
+        """
+        Returns the total execution time and average distances for the given labels.
+        """
+        columns = [self.get_grouped_sums('execution_time', labels, group_by)]
+        columns.extend(self.get_grouped_averages(key, labels, group_by) for key in
+                       ['equal_support_distance', 'full_support_distance',
+                        'best_support_distance', 'normalized_euclidean_distance',
+                        'roc_auc', 'pr_auc'])
+        return zip(*columns)
 
-        self._print_test_details(relevance_filter)
+    def _get_records(self):
+        """
+        Returns the records as dicts.
+        """
+        if self._records is None:
+            self._records = [self._get_record(i) for i in range(self._size)]
+        return self._records
 
-    def _print_test_details(self, relevance_filter):
-        total_execution_time = self.get_filtered_sum_over_key('execution_time', relevance_filter)
-        avg_equal_support = self.get_filtered_avg_over_key('equal_support_distance', relevance_filter)
-        avg_full_support = self.get_filtered_avg_over_key('full_support_distance', relevance_filter)
-        avg_best_support = self.get_filtered_avg_over_key('best_support_distance', relevance_filter)
-        avg_euclidean = self.get_filtered_avg_over_key('normalized_euclidean_distance', relevance_filter)
+    def _get_record(self, i):
+        """
+        Returns record i as a dict.
+        """
+        record = {'anomaly_vector': self._anomaly_vectors[i]}
+        for key in _NUMERIC_KEYS:
+            record[key] = self._columns[key][i] if self._present[key][i] else None
+        for key in _LABEL_KEYS:
+            record[key] = self._labels[key][self._codes[key][i]]
+        return record
+
+    def _print_header(self):
+        print("\n\nResults for test suite '%s':" % self._suite_label)
 
+    def _print_anomaly_detection_header(self, label):
+        print("\n\tAnomaly detector '%s':" % label)
+
+    def _print_test_details(self, total_execution_time, avg_equal_support, avg_full_support,
+                            avg_best_support, avg_euclidean, avg_roc_auc, avg_pr_auc):
         if total_execution_time is not None:
             print("\t\t\tTotal execution time (s):              %.2f" % total_execution_time)
         if avg_equal_support is not None:
@@ -123,3 +346,30 @@ class ResultTracker(object):
             print("\t\t\tAverage best support distance:         %.3f" % avg_best_support)
         if avg_euclidean is not None:
             print("\t\t\tAverage normalized Euclidean distance: %.3f" % avg_euclidean)
+        if avg_roc_auc is not None:
+            print("\t\t\tAverage ROC AUC:                       %.3f" % avg_roc_auc)
+        if avg_pr_auc is not None:
+            print("\t\t\tAverage PR AUC:                        %.3f" % avg_pr_auc)
+
+
+class _LabelIndex(object):
+    """
+    The code of a label, and the indices of its records.
+    """
+
+    def __init__(self, code, rows=None):
+        self.code = code
+        self.rows = rows if rows is not None else []
+
+
+def _get_label_indexes(labels, codes):
+    indexes = dict((label, _LabelIndex(code)) for code, label in enumerate(labels))
+    for i, code in enumerate(codes):
+        indexes[labels[code]].rows.append(i)
+    return indexes
+
+
+def _to_object_array(values):
+    array = numpy.empty(len(values), dtype=object)
+    array[:] = values
+    return array
@@ -1,5 +1,7 @@
 import numpy
 
+from labels import IntervalLabels
+
 
 def load_sequence(path):
     '''
@@ -12,6 +14,8 @@ def load_sequence(path):
     If the file consists of a 2D array containing two arrays, the first of
     these is assumed to be an evaluation sequence and the second an anomaly
     vector. Both of these must be of equal length.
+    If the file contains a sequence with interval labels (see save_sequence),
+    the anomaly vector is returned as IntervalLabels.
 
     Arguments:
         path: Path to a valid file.
@@ -25,6 +29,10 @@ def load_sequence(path):
         IOError: Invalid file.
     '''
     arr = numpy.load(path)
+    if isinstance(arr, numpy.lib.npyio.NpzFile):
+        with arr:
+            sequence = arr['sequence']
+            return sequence, IntervalLabels(arr['anomaly_intervals'], len(sequence))
     try:
         dims = len(arr.shape)
         if dims == 1:
@@ -42,7 +50,8 @@ def save_sequence(path, sequence, anomaly_vector=None):
     Arguments:
         path: Path to a valid file.
         sequence: The sequence (assumed iterable).
-        anomaly_vector: An optional anomaly vector.
+        anomaly_vector: An optional anomaly vector. Interval labels (see
+            IntervalLabels) are saved as intervals, along with the sequence.
     '''
 
     # open file in advance to prevent numpy from
@@ -51,6 +60,8 @@ def save_sequence(path, sequence, anomaly_vector=None):
 
     if anomaly_vector is None:
         numpy.save(sequence_file, sequence)
+    elif isinstance(anomaly_vector, IntervalLabels):
+        numpy.savez(sequence_file, sequence=sequence, anomaly_intervals=anomaly_vector.intervals)
     else:
         numpy.save(sequence_file, [sequence, anomaly_vector])
 
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import tempfile
+
+import numpy
+
+from labels import IntervalLabels
+from sequence_io import load_sequence
+
+_SHARED_MEMORY_DIRECTORY = '/dev/shm'
+_STORE_DIRECTORY_NAME = 'ad-eval-sequences'
+
+# store used by load_shared_sequence, created on first use
+_default_store = None
+
+
+class SequenceStore(object):
+    '''
+    Machine-wide store of sequences, which are kept in memory-mapped files in
+    a shared-memory file system (/dev/shm, if available).
+
+    The first process to load a sequence copies it into the store, after which
+    every process on the machine gets read-only, zero-copy views of the same
+    memory. Sequence files that are modified are copied again, and the copies
+    of their earlier versions are removed.
+    Interval labels (see IntervalLabels) are kept in small separate files,
+    which each process loads into its own memory.
+    '''
+
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = get_default_store_directory()
+        self.directory = directory
+
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # another process may have created it in the meantime
+                if not os.path.isdir(directory):
+                    raise
+
+    def load(self, path):
+        '''
+        Loads the sequence at the given path (see load_sequence) as read-only
+        views of the memory-mapped copy in the store.
+        '''
+        segment_path = self._get_segment_path(path)
+
+        if not os.path.exists(segment_path):
+            self._add_segment(path, segment_path)
+
+        arr = numpy.load(segment_path, mmap_mode='r')
+        labels_path = _get_labels_path(segment_path)
+        if os.path.exists(labels_path):
+            return arr, IntervalLabels(numpy.load(labels_path), len(arr))
+        if arr.ndim == 2:
+            return arr[0], arr[1]
+        return arr
+
+    def remove(self, path):
+        '''
+        Removes the copies of the sequence at the given path from the store.
+        Processes that have already loaded them keep their views.
+        '''
+        self._remove_segments(path)
+
+    def clear(self):
+        '''
+        Removes all sequences from the store.
+        '''
+        for name in os.listdir(self.directory):
+            if name.endswith('.npy'):
+                os.remove(os.path.join(self.directory, name))
+
+    def _get_segment_path(self, path):
+        '''
+        Returns the path of the copy of the sequence in the store, which is named
+        after the path of the sequence file (see _get_segment_prefix), followed by
+        its size and modification time.
+        '''
+        stat = os.stat(path)
+        version = hashlib.sha1('%d:%r' % (stat.st_size, stat.st_mtime)).hexdigest()
+        return os.path.join(self.directory, _get_segment_prefix(path) + version + '.npy')
+
+    def _remove_segments(self, path, kept_segment_path=None):
+        '''
+        Removes the copies of all versions of the sequence at the given path
+        (along with their labels), except the given one.
+        '''
+        prefix = _get_segment_prefix(path)
+        kept_paths = []
+        if kept_segment_path is not None:
+            kept_paths = [kept_segment_path, _get_labels_path(kept_segment_path)]
+
+        for name in os.listdir(self.directory):
+            removed_path = os.path.join(self.directory, name)
+            if name.startswith(prefix) and removed_path not in kept_paths:
+                try:
+                    os.remove(removed_path)
+                except OSError:
+                    # another process may have removed it in the meantime
+                    if os.path.exists(removed_path):
+                        raise
+
+    def _add_segment(self, path, segment_path):
+        '''
+        Copies the sequence into the store. The copy is written to a temporary file
+        which is then renamed, so that other processes never see partial copies.
+        Interval labels are written first, since the sequence marks complete copies.
+        '''
+        sequence = load_sequence(path)
+        if isinstance(sequence, tuple) and isinstance(sequence[1], IntervalLabels):
+            sequence, labels = sequence
+            self._write_array(_get_labels_path(segment_path), labels.intervals)
+        elif isinstance(sequence, tuple):
+            sequence = numpy.array(sequence)
+
+        self._write_array(segment_path, sequence)
+        self._remove_segments(path, segment_path)
+
+    def _write_array(self, path, array):
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as array_file:
+                numpy.save(array_file, array)
+            os.rename(temporary_path, path)
+        except:
+            os.remove(temporary_path)
+            raise
+
+
+def _get_segment_prefix(path):
+    '''
+    Returns the prefix of the names of the copies of the sequence at the given path.
+    '''
+    return hashlib.sha1(os.path.abspath(path)).hexdigest() + '-'
+
+
+def _get_labels_path(segment_path):
+    return segment_path[:-len('.npy')] + '.labels.npy'
+
+
+def get_default_store_directory():
+    '''
+    Returns the directory of the default sequence store, which is in shared
+    memory if possible.
+    '''
+    if os.path.isdir(_SHARED_MEMORY_DIRECTORY):
+        return os.path.join(_SHARED_MEMORY_DIRECTORY, _STORE_DIRECTORY_NAME)
+    return os.path.join(tempfile.gettempdir(), _STORE_DIRECTORY_NAME)
+
+
+def load_shared_sequence(path):
+    '''
+    Loads the sequence at the given path through the default sequence store.
+    See SequenceStore.load.
+    '''
+    global _default_store
+
+    if _default_store is None:
+        _default_store = SequenceStore()
+    return _default_store.load(path)
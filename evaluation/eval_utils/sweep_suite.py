@@ -0,0 +1,112 @@
+from __future__ import division
+from time import time
+import multiprocessing
+
+import anomaly_detection
+
+from progress_counter import ProgressCounter
+from test_suite import TestSuite, _get_stats
+
+# the test suite evaluated by the worker processes of SweepTestSuite.evaluate
+_suite = None
+
+
+class SweepTestSuite(TestSuite):
+    """
+    Test suite over anomaly detector configurations (dicts of keyword arguments
+    to anomaly_detection.create_anomaly_detector) rather than anomaly detectors.
+
+    Each sequence is evaluated for all configurations at once, through
+    anomaly_detection.evaluate_sweep, so that configurations that only differ
+    in their k or aggregator share all other stages. Only the configurations
+    without a result in the cache (if any) are evaluated.
+
+    The execution time of each record is the time of the sweep divided by the
+    number of evaluated configurations. These averages say nothing about the
+    cost of the individual configurations, so they should not be used to
+    compare configurations (use TestSuite for timing studies).
+    """
+
+    def __init__(self, anomaly_detector_configs, anomaly_detector_labels, tests,
+                 test_labels, suite_label=None, cache=None, batch_size=None):
+        super(SweepTestSuite, self).__init__(None, anomaly_detector_labels, tests,
+                                             test_labels, suite_label, cache)
+        self._anomaly_detector_configs = anomaly_detector_configs
+        self._batch_size = batch_size
+
+    def evaluate(self, display_progress=True, processes=None):
+        """
+        Evaluates all tests on all anomaly detector configurations.
+
+        If processes is larger than 1, the sequences are evaluated in a pool of
+        that many processes. The results are recorded in the same order as in
+        TestSuite.evaluate.
+        """
+        global _suite
+
+        cells = [(j, k) for j in range(len(self._tests)) for k in range(len(self._tests[j]))]
+
+        progress_counter = None
+        if display_progress:
+            progress_counter = ProgressCounter(total_detectors=len(self._anomaly_detector_configs),
+                                               total_tests=len(self._tests),
+                                               total_sequences=len(cells))
+            progress_counter.print_progress()
+
+        _suite = self
+        pool = None
+        if processes is not None and processes > 1:
+            pool = multiprocessing.Pool(processes)
+        try:
+            evaluated = (pool.imap if pool is not None else map)(_evaluate_sweep_cell, cells)
+
+            cell_stats = []
+            for stats in evaluated:
+                cell_stats.append(stats)
+                if progress_counter is not None:
+                    progress_counter.completed_sequences += 1
+                    progress_counter.print_progress()
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            _suite = None
+
+        for i, label in enumerate(self._anomaly_detector_labels):
+            for (j, _), stats in zip(cells, cell_stats):
+                self.results.add_record(label, self._test_labels[j], **stats[i])
+
+        if progress_counter is not None:
+            progress_counter.completed_detectors = progress_counter.total_detectors
+            progress_counter.completed_tests = progress_counter.total_tests
+            progress_counter.print_progress()
+
+
+def _evaluate_sweep_cell(cell):
+    """
+    Evaluates a single sequence on all anomaly detector configurations, and
+    returns the records of all configurations.
+    """
+    test_index, sequence_index = cell
+    sequence, reference_vector = _suite._tests[test_index][sequence_index]
+    configs = _suite._anomaly_detector_configs
+    cache = _suite._cache
+
+    results = [None] * len(configs)
+    if cache is not None:
+        results = [cache.get(config, sequence) for config in configs]
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        start_time = time()
+        anomaly_vectors = anomaly_detection.evaluate_sweep([configs[i] for i in missing],
+                                                           sequence, _suite._batch_size)
+        execution_time = (time() - start_time) / len(missing)
+
+        for i, anomaly_vector in zip(missing, anomaly_vectors):
+            results[i] = anomaly_vector, execution_time
+            if cache is not None:
+                cache.put(configs[i], sequence, anomaly_vector, execution_time)
+
+    return [_get_stats(reference_vector, anomaly_vector, execution_time)
+            for anomaly_vector, execution_time in results]
@@ -2,6 +2,7 @@ import numpy
 import random
 
 import anomaly_generation
+from labels import IntervalLabels
 
 _LENGTH_ERROR = "Invalid subsequence length: %s"
 
@@ -36,7 +37,8 @@ def generate_specified_test(base_sequences, anomaly_types, amplitudes, intervals
         intervals: A list of start and end positions (inclusive) for the anomalies.
 
     Returns:
-        A list of tuples containing the test.
+        A list of tuples containing the test. The anomalies are labeled by
+        interval labels (see IntervalLabels).
     """
     specifications = zip(base_sequences, anomaly_types, amplitudes, intervals)
     sequences = []
@@ -48,7 +50,7 @@ def generate_specified_test(base_sequences, anomaly_types, amplitudes, intervals
         anomaly_function = _get_anomaly_function_from_type(anomaly_type,
                                                            random_number_generator=random_number_generator)
 
-        anomaly_vector = [1 if interval[0] <= x <= interval[1] else 0 for x in range(length)]
+        anomaly_vector = IntervalLabels([(interval[0], min(interval[1], length - 1))], length)
         sequence = anomaly_function(base_sequence, amplitude, interval)
 
         sequences.append((sequence, anomaly_vector))
@@ -122,9 +124,7 @@ class RandomAnomalyGenerator(object):
         
         modified_sequence = self._anomaly_function(sequence=sequence, amplitude=amplitude, interval=interval)
 
-        anomaly_vector_generator = self._get_anomaly_vector_generator(sequence_length, *interval)
-        
-        return modified_sequence, list(anomaly_vector_generator)
+        return modified_sequence, IntervalLabels([interval], sequence_length)
 
     def _generate_subsequence_interval(self, sequence_length):
         subsequence_length = self._rng.randint(*self._width_interval)
@@ -136,15 +136,12 @@ class RandomAnomalyGenerator(object):
 
         return (start_pos, end_pos)
 
-    def _get_anomaly_vector_generator(self, sequence_length, start, end):
-        return (1 if (start <= i and i <= end) else 0 for i in range(sequence_length))
-
     def add_multiple_anomalies(self, sequence, number_of_anomalies):
         modified_sequence = sequence
-        anomaly_vector = (0 for _ in range(len(sequence)))
+        anomaly_vector = IntervalLabels([], len(sequence))
 
         for _ in range(number_of_anomalies):
             modified_sequence, temp_anomaly_vector = self.add_single_anomaly(modified_sequence)
-            anomaly_vector = (i or j for (i, j) in zip(anomaly_vector, temp_anomaly_vector))
+            anomaly_vector = anomaly_vector.union(temp_anomaly_vector)
 
-        return modfied_sequence, anomaly_vector
+        return modified_sequence, anomaly_vector
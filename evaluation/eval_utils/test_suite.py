@@ -1,10 +1,14 @@
 from __future__ import division
 from time import time
+import multiprocessing
 
 import distances
 import result_tracker
 from progress_counter import ProgressCounter
 
+# the test suite evaluated by the worker processes of TestSuite._evaluate_parallel
+_suite = None
+
 
 class TestSuite(object):
     """
@@ -14,20 +18,34 @@ class TestSuite(object):
     through the evaluate method.
 
     Progress and result reports are generated automatically.
+
+    If a result cache (see ResultCache) is given, the anomaly vectors and
+    execution times of anomaly detectors with a known configuration are looked
+    up in it before evaluating, and stored in it afterwards.
     """
 
     def __init__(self, anomaly_detectors, anomaly_detector_labels, tests,
-                 test_labels, suite_label=None):
+                 test_labels, suite_label=None, cache=None):
         self._anomaly_detectors = anomaly_detectors
         self._anomaly_detector_labels = anomaly_detector_labels
         self._tests = tests
         self._test_labels = test_labels
+        self._cache = cache
         self.results = result_tracker.ResultTracker(suite_label)
 
-    def evaluate(self, display_progress=True):
+    def evaluate(self, display_progress=True, processes=None):
         """
         Evaluates all tests on all anomaly detectors.
+
+        If processes is larger than 1, the (anomaly detector, sequence) pairs are
+        evaluated in a pool of that many processes. The results are recorded in the
+        same order as in a serial evaluation, but the execution times are measured
+        while the processes compete for the processors.
         """
+        if processes is not None and processes > 1:
+            self._evaluate_parallel(processes, display_progress)
+            return
+
         ad_count = len(self._anomaly_detectors)
 
         if display_progress:
@@ -86,37 +104,133 @@ class TestSuite(object):
         
         for sequence, anomaly_vector in test:
             stats = _evaluate_sequence(anomaly_detector, progress_callback,
-                                       sequence, anomaly_vector)
+                                       sequence, anomaly_vector, self._cache)
 
             self.results.add_record(anomaly_detector_label, test_label, **stats)
 
             if progress_counter is not None:
                 progress_counter.completed_sequences += 1
 
+    def _evaluate_parallel(self, processes, display_progress=True):
+        """
+        Evaluates all (anomaly detector, sequence) pairs in a pool of processes.
+
+        Worker processes are forked, and inherit the test suite through a module
+        global, so that the anomaly detectors and tests do not have to be pickled.
+        Records are added as soon as all preceding pairs (in serial order) are done.
+        """
+        global _suite
+
+        cells = [(i, j, k)
+                 for i in range(len(self._anomaly_detectors))
+                 for j in range(len(self._tests))
+                 for k in range(len(self._tests[j]))]
+
+        progress_counter = None
+        if display_progress:
+            progress_counter = ProgressCounter(
+                total_detectors=len(self._anomaly_detectors),
+                total_tests=len(self._anomaly_detectors) * len(self._tests),
+                total_sequences=len(cells)
+            )
+
+        # the number of remaining sequences of each detector and (detector, test) pair
+        remaining_detector_sequences = {}
+        remaining_test_sequences = {}
+        for i, j, _ in cells:
+            remaining_detector_sequences[i] = remaining_detector_sequences.get(i, 0) + 1
+            remaining_test_sequences[i, j] = remaining_test_sequences.get((i, j), 0) + 1
+
+        # results that can not be recorded until the preceding pairs are done
+        pending_results = {}
+        recorded = 0
+
+        _suite = self
+        pool = multiprocessing.Pool(processes)
+        try:
+            for index, stats in pool.imap_unordered(_evaluate_cell, enumerate(cells)):
+                pending_results[index] = stats
+
+                while recorded in pending_results:
+                    i, j, _ = cells[recorded]
+                    self.results.add_record(self._anomaly_detector_labels[i],
+                                            self._test_labels[j], **pending_results.pop(recorded))
+                    recorded += 1
+
+                if progress_counter is not None:
+                    i, j, _ = cells[index]
+                    remaining_detector_sequences[i] -= 1
+                    remaining_test_sequences[i, j] -= 1
+
+                    progress_counter.completed_sequences += 1
+                    if remaining_test_sequences[i, j] == 0:
+                        progress_counter.completed_tests += 1
+                    if remaining_detector_sequences[i] == 0:
+                        progress_counter.completed_detectors += 1
+                    progress_counter.print_progress()
+        finally:
+            pool.terminate()
+            pool.join()
+            _suite = None
+
     def print_report(self):
         self.results.print_results()
 
 
-def _evaluate_sequence(anomaly_detector, progress_callback, sequence, reference_vector):
+def _evaluate_sequence(anomaly_detector, progress_callback, sequence, reference_vector,
+                       cache=None):
     """
-    Evaluates a single sequence
+    Evaluates a single sequence, unless its result is in the cache.
     """
+    config = getattr(anomaly_detector, 'config', None)
+    if cache is not None and config is not None:
+        result = cache.get(config, sequence)
+        if result is not None:
+            anomaly_vector, execution_time = result
+            return _get_stats(reference_vector, anomaly_vector, execution_time)
+
     start_time = time()
 
     anomaly_vector = anomaly_detector.evaluate(sequence, progress_callback)
 
     execution_time = time() - start_time
 
+    if cache is not None and config is not None:
+        cache.put(config, sequence, anomaly_vector, execution_time)
+
+    return _get_stats(reference_vector, anomaly_vector, execution_time)
+
+
+def _get_stats(reference_vector, anomaly_vector, execution_time):
+    """
+    Returns the record of an evaluated sequence.
+    """
+    metrics = distances.get_metrics(reference_vector, anomaly_vector)
+
     return {
         'execution_time': execution_time,
-        'equal_support_distance': distances.equal_support(reference_vector, anomaly_vector),
-        'full_support_distance': distances.full_support(reference_vector, anomaly_vector),
-        'best_support_distance': distances.best_support(reference_vector, anomaly_vector),
-        'normalized_euclidean_distance': distances.normalized_euclidean(reference_vector, anomaly_vector),
+        'equal_support_distance': metrics['equal_support'],
+        'full_support_distance': metrics['full_support'],
+        'best_support_distance': metrics['best_support'],
+        'normalized_euclidean_distance': metrics['normalized_euclidean'],
+        'roc_auc': metrics['roc_auc'],
+        'pr_auc': metrics['pr_auc'],
         'anomaly_vector': anomaly_vector
     }
 
 
+def _evaluate_cell(indexed_cell):
+    """
+    Evaluates a single (anomaly detector, sequence) pair of the test suite in
+    a worker process (see TestSuite._evaluate_parallel).
+    """
+    index, (detector_index, test_index, sequence_index) = indexed_cell
+    sequence, anomaly_vector = _suite._tests[test_index][sequence_index]
+    stats = _evaluate_sequence(_suite._anomaly_detectors[detector_index], None,
+                               sequence, anomaly_vector, _suite._cache)
+    return index, stats
+
+
 def _get_progress_callback(progress_counter):
     def callback(progress_fraction):
         if progress_counter is not None:
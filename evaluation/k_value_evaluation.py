@@ -1,4 +1,5 @@
-import anomaly_detection
+import copy
+
 import eval_utils as utils
 
 import defaults
@@ -12,22 +13,24 @@ single sequence.
 K_VALUES = range(1, 101, 1)
 TEST_FILE = 'sequences/random_walk_added_noise'
 
-# set up anomaly detectors
-anomaly_detectors = []
+# set up anomaly detector configurations
+ad_configs = []
 ad_config = defaults.DEFAULT_KNN_CONFIG
 for k_value in K_VALUES:
     ad_config['evaluator_config']['k'] = k_value
-    anomaly_detectors.append(anomaly_detection.create_anomaly_detector(**ad_config))
+    ad_configs.append(copy.deepcopy(ad_config))
 
 # init test
-test = [utils.load_sequence(TEST_FILE)]
-test_suite = utils.TestSuite(anomaly_detectors, K_VALUES, [test], ['test'])
+test = [utils.load_shared_sequence(TEST_FILE)]
+test_suite = utils.SweepTestSuite(ad_configs, K_VALUES, [test], ['test'],
+                                  cache=utils.ResultCache(defaults.RESULT_CACHE_DIRECTORY,
+                                                          defaults.RESULT_CACHE_SIZE))
 
 # execute test
-test_suite.evaluate(display_progress=True)
+test_suite.evaluate(display_progress=True, processes=defaults.PROCESSES)
 
 # get plots
 results = test_suite.results
 fig1, plot1 = utils.plot_normalized_anomaly_vector_heat_map(results, K_VALUES, ylabel='k')
 fig2, plot2 = utils.plot_mean_error_values(results, K_VALUES, K_VALUES, xlabel='k')
-fig3, plot3 = utils.plot_execution_times(results, K_VALUES, K_VALUES, xlabel='k')
+# no execution time plot, since the sweep only measures the time of all k values together
@@ -22,11 +22,13 @@ for width in WINDOW_WIDTHS:
     anomaly_detectors.append(anomaly_detection.create_anomaly_detector(**ad_config))
 
 # init test
-test = [utils.load_sequence(TEST_FILE)]
-test_suite = utils.TestSuite(anomaly_detectors, WINDOW_WIDTHS, [test], ['test'])
+test = [utils.load_shared_sequence(TEST_FILE)]
+test_suite = utils.TestSuite(anomaly_detectors, WINDOW_WIDTHS, [test], ['test'],
+                             cache=utils.ResultCache(defaults.RESULT_CACHE_DIRECTORY,
+                                                     defaults.RESULT_CACHE_SIZE))
 
 # execute test
-test_suite.evaluate(display_progress=True)
+test_suite.evaluate(display_progress=True, processes=defaults.TIMING_PROCESSES)
 
 # get plot
 results = test_suite.results
@@ -1,4 +1,5 @@
-import anomaly_detection
+import copy
+
 import eval_utils as utils
 from matplotlib import pyplot
 
@@ -18,8 +19,8 @@ euclidean_dists = []
 
 for transformation, name, heat_map_plot in zip(TRANSFORMATIONS, TRANSFORMATION_NAMES, heat_map_plots):
 
-    # set up anomaly detectors
-    anomaly_detectors = []
+    # set up anomaly detector configurations
+    ad_configs = []
     ad_config = defaults.DEFAULT_KNN_CONFIG
     for k_value in K_VALUES:
         ad_config['evaluator_config']['k'] = k_value
@@ -29,14 +30,16 @@ for transformation, name, heat_map_plot in zip(TRANSFORMATIONS, TRANSFORMATION_N
         else:
             ad_config['representation_config'] = {'method': transformation}
         
-        anomaly_detectors.append(anomaly_detection.create_anomaly_detector(**ad_config))
+        ad_configs.append(copy.deepcopy(ad_config))
 
     # init test
-    test = [utils.load_sequence(TEST_FILE)]
-    test_suite = utils.TestSuite(anomaly_detectors, K_VALUES, [test], ['test'])
+    test = [utils.load_shared_sequence(TEST_FILE)]
+    test_suite = utils.SweepTestSuite(ad_configs, K_VALUES, [test], ['test'],
+                                      cache=utils.ResultCache(defaults.RESULT_CACHE_DIRECTORY,
+                                                              defaults.RESULT_CACHE_SIZE))
 
     # execute test
-    test_suite.evaluate(display_progress=True)
+    test_suite.evaluate(display_progress=True, processes=defaults.PROCESSES)
 
     # get plots
     results = test_suite.results
@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy
+
+from anomaly_detection import contexts, filters
+from anomaly_detection.aggregators import get_aggregator
+from anomaly_detection.anomaly_detector import AnomalyDetector
+from anomaly_detection.evaluators.knn import KNNEvaluator
+
+_EVALUATION_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     'evaluation')
+
+
+def plain_euclidean(a, b):
+    '''
+    Euclidean distance without any fast paths, used as the reference.
+    '''
+    return numpy.sqrt(((numpy.asarray(a, dtype=float) - b) ** 2).sum())
+
+plain_euclidean.IS_DISCRETE = False
+plain_euclidean.IS_METRIC = True
+
+
+def get_eval_utils():
+    '''
+    Returns the eval_utils package of the evaluation scripts, which expect the
+    evaluation directory to be on the path.
+    '''
+    if _EVALUATION_DIRECTORY not in sys.path:
+        sys.path.insert(0, _EVALUATION_DIRECTORY)
+    import eval_utils
+    return eval_utils
+
+
+def get_offset_sequence(length=400, offset=1e6, seed=0):
+    '''
+    Returns a sine wave with a large offset and a small anomaly, on which
+    distances computed from squared norms lose most of their precision.
+    '''
+    random = numpy.random.RandomState(seed)
+    sequence = (offset + numpy.sin(numpy.linspace(0, 30, length)) +
+                0.01 * random.randn(length))
+    sequence[length // 2:length // 2 + 10] += 0.3
+    return sequence
+
+
+def create_detector(distance, context_config, width=16, step=1, reference_step=1, k=3,
+                    aggregator='max'):
+    '''
+    Returns an anomaly detector evaluating every window on its own with the
+    given distance, without any of the fast paths of create_anomaly_detector.
+    '''
+    return AnomalyDetector(
+        filters.get_evaluation_filter(width=width, step=step),
+        contexts.get_context(**context_config),
+        filters.get_reference_filter(width=width, step=reference_step),
+        KNNEvaluator(distance, k=k),
+        get_aggregator(aggregator)
+    )
+
+
+def get_configs(context_config, width=16, step=1, reference_step=1, evaluator_config=None,
+                aggregator='max'):
+    '''
+    Returns the create_anomaly_detector keyword arguments of a kNN detector.
+    '''
+    return {
+        'evaluation_filter_config': {'method': 'sliding_window', 'width': width, 'step': step},
+        'context_config': context_config,
+        'reference_filter_config': {'method': 'sliding_window', 'width': width,
+                                    'step': reference_step},
+        'evaluator_config': evaluator_config or {'method': 'knn', 'k': 3,
+                                                 'distance_measure': 'euclidean'},
+        'aggregator_config': {'method': aggregator}
+    }
@@ -0,0 +1,105 @@
+import unittest
+
+import numpy
+
+from anomaly_detection.aggregators import get_aggregator, median_aggregator
+
+
+def get_windows(length=300, count=400, seed=0, offset=1e6):
+    '''
+    Returns the scores, starts and ends of randomly placed windows of a few
+    different widths, with scores close to a large offset.
+    '''
+    random = numpy.random.RandomState(seed)
+    widths = random.choice([1, 5, 16, 40], count)
+    starts = random.randint(0, length - 40, count)
+    scores = offset + random.rand(count)
+    return scores, starts, starts + widths - 1
+
+
+def get_naive_scores(method, scores, starts, ends, length):
+    '''
+    Aggregates the scores item by item, as a list of covering scores per item.
+    '''
+    covering = [[] for _ in range(length)]
+    for score, start, end in zip(scores, starts, ends):
+        for i in range(start, end + 1):
+            covering[i].append(score)
+
+    if method == 'median':
+        return numpy.array([numpy.median(c) if c else numpy.nan for c in covering])
+    if method == 'mean':
+        return numpy.array([numpy.mean(c) if c else 0 for c in covering])
+
+    covering = [[s for s in c if not numpy.isnan(s)] for c in covering]
+    if method == 'max':
+        return numpy.array([max(c + [0]) for c in covering])
+    return numpy.array([min(c) if c else numpy.inf for c in covering])
+
+
+class AggregatorTest(unittest.TestCase):
+
+    methods = ('max', 'min', 'mean')
+
+    def check(self, method, scores, starts, ends, length=300):
+        expected = get_naive_scores(method, scores, starts, ends, length)
+
+        # scores added one at a time, in blocks, and through merged states
+        aggregators = [get_aggregator(method) for _ in range(3)]
+        for aggregator in aggregators:
+            aggregator.init(length)
+        for score, start, end in zip(scores, starts, ends):
+            aggregators[0].add_score(score, start, end)
+        half = len(scores) // 2
+        aggregators[1].add_scores(scores[:half], starts[:half], ends[:half])
+        for score, start, end in zip(scores[half:], starts[half:], ends[half:]):
+            aggregators[1].add_score(score, start, end)
+        other = get_aggregator(method)
+        other.init(length)
+        other.add_scores(scores[half:], starts[half:], ends[half:])
+        aggregators[2].add_scores(scores[:half], starts[:half], ends[:half])
+        aggregators[2].merge_state(other.get_state())
+
+        for aggregator in aggregators:
+            numpy.testing.assert_allclose(aggregator.get_aggregated_scores(), expected,
+                                          rtol=1e-12)
+
+    def test_matches_naive(self):
+        for method in self.methods:
+            for offset in (0, 1e6):
+                self.check(method, *get_windows(offset=offset))
+
+    def test_matches_naive_with_negative_and_special_scores(self):
+        scores, starts, ends = get_windows(offset=0)
+        scores -= 0.5
+        scores[[3, 50]] = numpy.nan
+        scores[[10, 200]] = (numpy.inf, -numpy.inf)
+        for method in self.methods:
+            self.check(method, scores, starts, ends)
+
+    def test_empty(self):
+        for method in self.methods:
+            self.check(method, numpy.empty(0), numpy.empty(0, dtype=int),
+                       numpy.empty(0, dtype=int), length=10)
+
+
+class MedianAggregatorTest(AggregatorTest):
+
+    methods = ('median',)
+
+    def test_matches_naive_with_ties(self):
+        scores, starts, ends = get_windows()
+        scores = numpy.round(scores - 1e6, 1)
+        self.check('median', scores, starts, ends)
+
+    def test_matches_naive_in_small_blocks(self):
+        block_entries = median_aggregator._BLOCK_ENTRIES
+        median_aggregator._BLOCK_ENTRIES = 50
+        try:
+            self.check('median', *get_windows())
+        finally:
+            median_aggregator._BLOCK_ENTRIES = block_entries
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import create_anomaly_detector, filters
+from anomaly_detection.representations import get_representation_converter
+
+from tests.helpers import get_configs, get_offset_sequence
+
+_REPRESENTATION_CONFIGS = (None, {'method': 'z-normalize'}, {'method': 'dft'},
+                           {'method': 'dwt'})
+
+
+class BatchExecutionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sequence = get_offset_sequence(length=200, offset=0)
+
+    def test_batch_filter_matches_filter(self):
+        for step in (1, 3):
+            expected = list(filters.sliding_window_filter(self.sequence, 16, step))
+            for batch_size in (1, 7, 1000):
+                blocks = list(filters.sliding_window_batch_filter(self.sequence, 16, step,
+                                                                  batch_size))
+                self.assertTrue(all(len(starts) <= batch_size for _, starts, _ in blocks))
+
+                windows = numpy.concatenate([block for block, _, _ in blocks])
+                numpy.testing.assert_array_equal(windows, [w for w, _, _ in expected])
+                numpy.testing.assert_array_equal(numpy.concatenate([s for _, s, _ in blocks]),
+                                                 [s for _, s, _ in expected])
+                numpy.testing.assert_array_equal(numpy.concatenate([e for _, _, e in blocks]),
+                                                 [e for _, _, e in expected])
+
+    def test_batch_conversion_matches_conversion(self):
+        # the windows are read-only views into the sequence
+        windows = filters.sliding_window_matrix(self.sequence, 16)[0]
+        for config in _REPRESENTATION_CONFIGS[1:]:
+            converter = get_representation_converter(**config)
+            numpy.testing.assert_allclose(converter.batch(windows),
+                                          [converter(window) for window in windows],
+                                          rtol=1e-12, atol=1e-12)
+
+    def test_matches_windowed_evaluation(self):
+        for context_config in ({'method': 'trivial'},
+                               {'method': 'local_symmetric', 'width': 40},
+                               {'method': 'semi-supervised',
+                                'reference_sequence': get_offset_sequence(length=100, offset=0,
+                                                                          seed=1)}):
+            for representation_config in _REPRESENTATION_CONFIGS:
+                for aggregator in ('max', 'mean', 'median'):
+                    configs = get_configs(context_config, width=16, step=2,
+                                          aggregator=aggregator)
+                    configs['representation_config'] = representation_config
+                    self.check_detector(configs)
+
+            # distances without a pairwise form are evaluated one window at a time
+            self.check_detector(get_configs(context_config, width=16, step=2, evaluator_config={
+                'method': 'knn', 'k': 3, 'distance_measure': 'dtw'}))
+
+    def check_detector(self, configs):
+        detector = create_anomaly_detector(**configs)
+        # the windowed and batched paths are compared, rather than distance profiles
+        detector.profile_function = None
+        expected = detector.evaluate(self.sequence)
+        for batch_size in (1, 10, 1000):
+            numpy.testing.assert_allclose(detector.evaluate(self.sequence, batch_size=batch_size),
+                                          expected, rtol=1e-7, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
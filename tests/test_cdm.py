@@ -0,0 +1,55 @@
+import bz2
+import unittest
+import zlib
+
+import numpy
+
+from anomaly_detection import filters
+from anomaly_detection.evaluators.knn import KNNEvaluator
+from anomaly_detection.evaluators.distances import cdm, get_cdm
+from anomaly_detection.representations.sax import convert_rows_to_sax
+
+from tests.helpers import get_offset_sequence
+
+
+class CDMTest(unittest.TestCase):
+
+    def setUp(self):
+        windows = filters.sliding_window_matrix(get_offset_sequence(length=200), 32)[0]
+        self.words = convert_rows_to_sax(windows, 16, 5)
+
+    def test_matches_cdm(self):
+        for cache_size in (1, 3, 1 << 16):
+            distance = get_cdm(cache_size=cache_size)
+            for a in self.words[::20]:
+                expected = [cdm(a, b) for b in self.words]
+                self.assertEqual([distance(a, b) for b in self.words], expected)
+                numpy.testing.assert_array_equal(distance.batch(a, self.words), expected)
+
+    def test_single_compressors(self):
+        for compressor, compress in (('zlib', lambda s: zlib.compress(s, 9)),
+                                     ('bz2', bz2.compress)):
+            distance = get_cdm(compressor, cache_size=2)
+            for a in self.words[::50]:
+                for b in self.words[::30]:
+                    expected = len(compress(a + b)) / float(len(compress(a)) +
+                                                            len(compress(b)))
+                    self.assertEqual(distance(a, b), expected)
+
+    def test_knn_matches_cdm(self):
+        for k in (1, 3):
+            expected = KNNEvaluator(cdm, k=k)
+            evaluator = KNNEvaluator(get_cdm(cache_size=5), k=k, numerosity_reduction='runs')
+            for word in self.words[::15]:
+                self.assertEqual(evaluator.evaluate(word, self.words),
+                                 expected.evaluate(word, self.words))
+
+    def test_invalid_inputs(self):
+        self.assertRaises(NotImplementedError, get_cdm, 'lzma')
+        distance = get_cdm()
+        self.assertRaises(AssertionError, distance, self.words[0], [1, 2])
+        self.assertRaises(AssertionError, distance.batch, self.words[0], [self.words[1], None])
+
+
+if __name__ == '__main__':
+    unittest.main()
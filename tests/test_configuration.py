@@ -0,0 +1,29 @@
+import unittest
+
+from anomaly_detection import create_anomaly_detector, get_canonical_config
+
+from tests.helpers import get_offset_sequence, get_configs
+
+
+class ConfigurationTest(unittest.TestCase):
+
+    def test_detector_config_shares_arrays(self):
+        reference_sequence = get_offset_sequence()
+        configs = get_configs({'method': 'semi-supervised',
+                               'reference_sequence': reference_sequence})
+        expected = get_canonical_config(configs)
+        detector = create_anomaly_detector(**configs)
+
+        self.assertIs(detector.config['context_config']['reference_sequence'],
+                      reference_sequence)
+        self.assertEqual(get_canonical_config(detector.config), expected)
+
+        # the dicts are copied, so modifying them does not affect the detector
+        configs['evaluator_config']['k'] = 5
+        configs['context_config']['method'] = 'trivial'
+        self.assertEqual(detector.config['evaluator_config']['k'], 3)
+        self.assertEqual(detector.config['context_config']['method'], 'semi-supervised')
+
+
+if __name__ == '__main__':
+    unittest.main()
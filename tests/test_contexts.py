@@ -0,0 +1,111 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import contexts, filters
+from anomaly_detection.aggregators import get_aggregator
+from anomaly_detection.contexts.ranges import slice_ranges
+from anomaly_detection.anomaly_detector import AnomalyDetector
+from anomaly_detection.evaluators.knn import KNNEvaluator
+from anomaly_detection.evaluators.distances import euclidean
+from anomaly_detection.representations import (get_representation_converter,
+                                               wrap_reference_filter)
+
+from tests.helpers import get_offset_sequence
+
+
+def get_context_configs():
+    return ({'method': 'local_symmetric', 'width': 30},
+            {'method': 'local_asymmetric', 'left_width': 50, 'right_width': 5},
+            {'method': 'trivial'},
+            {'method': 'novelty'},
+            {'method': 'semi-supervised',
+             'reference_sequence': get_offset_sequence(length=100, offset=0, seed=1)})
+
+
+def get_sliced_context(context_config, sequence, start, end):
+    '''
+    Returns the context as the list of slices returned by the context functions
+    before they had ranges.
+    '''
+    method = context_config['method']
+    if method == 'semi-supervised':
+        return [context_config['reference_sequence']]
+
+    left_width = context_config.get('left_width', context_config.get('width'))
+    right_width = context_config.get('right_width', context_config.get('width'))
+    if method in ('trivial', 'novelty'):
+        left_width = right_width = len(sequence)
+
+    left_context = sequence[max(0, start - left_width):max(0, start - 1)]
+    if method == 'novelty':
+        return [left_context]
+    last = len(sequence) - 1
+    return [left_context, sequence[min(last, end + 1):min(last, end + right_width)]]
+
+
+class ContextRangesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sequence = get_offset_sequence(length=200, offset=0)
+        self.subsequences = [(0, 15), (3, 18), (100, 115), (184, 199)]
+
+    def test_ranges_match_sliced_contexts(self):
+        for context_config in get_context_configs():
+            context_function = contexts.get_context(**context_config)
+            for start, end in self.subsequences:
+                expected = get_sliced_context(context_config, self.sequence, start, end)
+                context = context_function(self.sequence, start, end)
+                ranges = context_function.ranges(self.sequence, start, end)
+                for items in (context, slice_ranges(ranges)):
+                    self.assertEqual(len(items), len(expected))
+                    for part, expected_part in zip(items, expected):
+                        numpy.testing.assert_array_equal(part, expected_part)
+
+    def test_reference_sets_match_sliced_contexts(self):
+        converter = get_representation_converter('z-normalize')
+        for step in (1, 3):
+            reference_filter = filters.get_reference_filter(width=16, step=step)
+            wrapped_filter = wrap_reference_filter(reference_filter, converter)
+            for context_config in get_context_configs():
+                context_function = contexts.get_context(**context_config)
+                for start, end in self.subsequences:
+                    context = context_function(self.sequence, start, end)
+                    ranges = context_function.ranges(self.sequence, start, end)
+
+                    reference_set = reference_filter.from_ranges(ranges)
+                    self.assertTrue(all(not block.flags.writeable
+                                        for block in reference_set.blocks))
+                    self.assertEqual(len(reference_set), len(reference_filter(context)))
+                    numpy.testing.assert_array_equal(
+                        numpy.reshape(list(reference_set), (-1, 16)),
+                        numpy.reshape(reference_filter(context), (-1, 16)))
+
+                    numpy.testing.assert_allclose(
+                        numpy.reshape(list(wrapped_filter.from_ranges(ranges)), (-1, 16)),
+                        numpy.reshape(list(wrapped_filter(context)), (-1, 16)),
+                        rtol=1e-12, atol=1e-12)
+
+    def test_detector_matches_sliced_contexts(self):
+        for context_config in get_context_configs():
+            context_function = contexts.get_context(**context_config)
+            # the same context, without ranges
+            sliced_function = lambda sequence, start, end, f=context_function: f(sequence,
+                                                                                  start, end)
+            sliced_function.IS_STATIC = getattr(context_function, 'IS_STATIC', False)
+
+            for batch_size in (None, 32):
+                anomaly_vectors = []
+                for function in (context_function, sliced_function):
+                    detector = AnomalyDetector(
+                        filters.get_evaluation_filter(width=16, step=2), function,
+                        filters.get_reference_filter(width=16, step=1),
+                        KNNEvaluator(euclidean, k=3), get_aggregator('max'))
+                    anomaly_vectors.append(detector.evaluate(self.sequence,
+                                                             batch_size=batch_size))
+                numpy.testing.assert_allclose(anomaly_vectors[0], anomaly_vectors[1],
+                                              rtol=1e-7, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
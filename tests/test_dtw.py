@@ -0,0 +1,97 @@
+import unittest
+
+import numpy
+
+from anomaly_detection.evaluators.distances import dynamic_time_warp, get_dynamic_time_warp
+from anomaly_detection.evaluators.distances.continuous_distances import (
+    bounded_dynamic_time_warp, get_envelopes, lower_bound_dynamic_time_warp)
+
+from tests.helpers import get_offset_sequence, create_detector
+
+
+def naive_dynamic_time_warp(a, b, warping_window=None):
+    '''
+    Dynamic time warping through the textbook dynamic program, one cell at a time.
+    '''
+    n, m = len(a), len(b)
+    if warping_window is None:
+        warping_window = max(n, m)
+    warping_window = max(warping_window, abs(n - m))
+
+    costs = numpy.empty((n + 1, m + 1))
+    costs.fill(float('inf'))
+    costs[0, 0] = 0
+    for i in range(1, n + 1):
+        for j in range(max(1, i - warping_window), min(m, i + warping_window) + 1):
+            costs[i, j] = abs(a[i - 1] - b[j - 1]) + min(costs[i - 1, j], costs[i, j - 1],
+                                                         costs[i - 1, j - 1])
+    return costs[n, m]
+
+
+def plain_dynamic_time_warp(warping_window):
+    '''
+    Returns the DTW distance with the given band, without any of its fast paths.
+    '''
+    def distance(a, b):
+        return naive_dynamic_time_warp(a, b, warping_window)
+
+    distance.IS_DISCRETE = False
+    distance.IS_METRIC = False
+    return distance
+
+
+class DynamicTimeWarpTest(unittest.TestCase):
+
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        self.a = 1e6 + numpy.cumsum(random.randn(20))
+        self.b = 1e6 + numpy.cumsum(random.randn(50, 20), axis=1)
+
+    def test_matches_naive(self):
+        for warping_window in (None, 0, 1, 3):
+            expected = [naive_dynamic_time_warp(self.a, row, warping_window) for row in self.b]
+            numpy.testing.assert_allclose(bounded_dynamic_time_warp(
+                self.a, self.b, float('inf'), warping_window), expected, rtol=1e-12)
+            distance = get_dynamic_time_warp(warping_window)
+            numpy.testing.assert_allclose([distance(self.a, row) for row in self.b], expected,
+                                          rtol=1e-12)
+
+    def test_matches_naive_for_different_lengths(self):
+        for length in (1, 13, 27):
+            for warping_window in (None, 2):
+                self.assertAlmostEqual(dynamic_time_warp(self.a, self.b[0, :length],
+                                                         warping_window),
+                                       naive_dynamic_time_warp(self.a, self.b[0, :length],
+                                                               warping_window), delta=1e-6)
+
+    def test_lower_bounds(self):
+        for warping_window in (None, 0, 2):
+            distances = bounded_dynamic_time_warp(self.a, self.b, float('inf'), warping_window)
+            for envelopes in (None, get_envelopes(self.b, warping_window)):
+                lower_bounds = lower_bound_dynamic_time_warp(self.a, self.b, envelopes)
+                self.assertTrue((lower_bounds <= distances + 1e-6).all())
+
+    def test_early_abandoning(self):
+        for warping_window in (None, 2):
+            distances = bounded_dynamic_time_warp(self.a, self.b, float('inf'), warping_window)
+            threshold = numpy.median(distances)
+            bounded = bounded_dynamic_time_warp(self.a, self.b, threshold, warping_window)
+
+            below = distances <= threshold
+            numpy.testing.assert_array_equal(bounded[below], distances[below])
+            self.assertTrue((bounded[~below] > threshold).all())
+
+    def test_knn_matches_brute_force(self):
+        sequence = get_offset_sequence(length=200)
+        for context_config in ({'method': 'local_symmetric', 'width': 80},
+                               {'method': 'semi-supervised',
+                                'reference_sequence': get_offset_sequence(length=150, seed=1)}):
+            expected = create_detector(plain_dynamic_time_warp(2), context_config,
+                                       width=8, step=2).evaluate(sequence)
+            detector = create_detector(get_dynamic_time_warp(2), context_config, width=8, step=2)
+            numpy.testing.assert_allclose(detector.evaluate(sequence), expected, rtol=1e-12)
+            self.assertGreater(detector.evaluator.pruned_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
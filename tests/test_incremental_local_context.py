@@ -0,0 +1,57 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import contexts
+from anomaly_detection.anomaly_detector import create_anomaly_detector
+from anomaly_detection.representations import get_sax_converter
+
+from tests.helpers import plain_euclidean, get_offset_sequence, create_detector, get_configs
+
+
+class IncrementalLocalContextTest(unittest.TestCase):
+
+    def check_reference_sets(self, sequence, width, step, converter=None):
+        left_width, right_width = 40, 25
+        context = contexts.IncrementalLocalContext(left_width, right_width, width, step,
+                                                   converter)
+        context.init(sequence)
+        context_function = contexts.get_context('local_asymmetric', left_width=left_width,
+                                                right_width=right_width)
+
+        for start in range(0, len(sequence) - width + 1, 3):
+            expected = [
+                window if converter is None else converter(window)
+                for part in context_function(sequence, start, start + width - 1)
+                for window in (part[i:i + width]
+                               for i in range(0, len(part) - width + 1, step))
+            ]
+            reference_set = list(context.get_reference_set(start, start + width - 1))
+            self.assertEqual(len(reference_set), len(expected))
+            for window, expected_window in zip(reference_set, expected):
+                numpy.testing.assert_array_equal(window, expected_window)
+
+    def test_reference_sets(self):
+        sequence = get_offset_sequence(150)
+        for step in (1, 2):
+            self.check_reference_sets(sequence, 10, step)
+
+    def test_integer_sax_reference_sets(self):
+        converter = get_sax_converter(5, 6, output='integer')
+        self.check_reference_sets(get_offset_sequence(150), 10, 1, converter)
+
+    def test_detector_scores(self):
+        context_config = {'method': 'local_asymmetric', 'left_width': 50, 'right_width': 30}
+        sequence = get_offset_sequence(250)
+        configs = get_configs(context_config, reference_step=2)
+        detector = create_anomaly_detector(**configs)
+        self.assertIsNotNone(detector.incremental_context)
+
+        expected = create_detector(plain_euclidean, context_config,
+                                   reference_step=2).evaluate(sequence)
+        numpy.testing.assert_allclose(detector.evaluate(sequence), expected,
+                                      rtol=1e-7, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import filters
+from anomaly_detection.evaluators.knn import KNNEvaluator
+from anomaly_detection.evaluators.distances import euclidean
+
+from tests.helpers import plain_euclidean, get_offset_sequence, create_detector
+
+
+class BatchedEvaluationTest(unittest.TestCase):
+
+    def check_contexts(self, sequence, reference_step):
+        for context_config in ({'method': 'trivial'},
+                               {'method': 'local_asymmetric', 'left_width': 60,
+                                'right_width': 20}):
+            expected = create_detector(plain_euclidean, context_config,
+                                       reference_step=reference_step).evaluate(sequence)
+            for batch_size in (None, 64):
+                scores = create_detector(euclidean, context_config,
+                                         reference_step=reference_step).evaluate(
+                    sequence, batch_size=batch_size)
+                numpy.testing.assert_allclose(scores, expected, rtol=1e-7, atol=1e-9)
+
+    def test_matches_per_window_path(self):
+        self.check_contexts(get_offset_sequence(offset=0), reference_step=1)
+
+    def test_matches_per_window_path_with_offset(self):
+        for reference_step in (1, 2):
+            self.check_contexts(get_offset_sequence(), reference_step)
+
+    def test_evaluate_nearest_with_offset(self):
+        windows = filters.sliding_window_matrix(get_offset_sequence(), 16)[0]
+        evaluator = KNNEvaluator(euclidean, k=3)
+        nearest = evaluator.evaluate_nearest(windows[:50], windows[100:], 5)
+
+        for row, window in zip(nearest, windows[:50]):
+            expected = sorted(plain_euclidean(window, w) for w in windows[100:])[:5]
+            numpy.testing.assert_allclose(row, expected, rtol=1e-7, atol=1e-9)
+
+
+class EarlyAbandoningTest(unittest.TestCase):
+
+    def test_matches_brute_force_with_offset(self):
+        windows = filters.sliding_window_matrix(get_offset_sequence(), 16)[0]
+        reference_set = list(windows[100:])
+        for k in (1, 3, 400):
+            evaluator = KNNEvaluator(euclidean, k=k, search='early_abandoning')
+            brute_force = KNNEvaluator(plain_euclidean, k=k)
+            for window in windows[:50]:
+                expected = brute_force.evaluate(window, reference_set)
+                if numpy.isnan(expected):
+                    self.assertTrue(numpy.isnan(evaluator.evaluate(window, reference_set)))
+                else:
+                    self.assertAlmostEqual(evaluator.evaluate(window, reference_set), expected,
+                                           delta=1e-9)
+
+            if k == 1:
+                self.assertGreater(evaluator.pruned_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
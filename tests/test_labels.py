@@ -0,0 +1,77 @@
+import unittest
+
+import numpy
+
+from tests.helpers import get_eval_utils
+from tests.test_metrics import get_test_vectors
+
+eval_utils = get_eval_utils()
+
+
+def get_random_dense(seed, length=100):
+    random = numpy.random.RandomState(seed)
+    return (random.rand(length) < random.choice([0, 0.05, 0.5, 1])).astype(int)
+
+
+class IntervalLabelsTest(unittest.TestCase):
+
+    def test_matches_dense(self):
+        for seed in range(20):
+            dense = get_random_dense(seed)
+            labels = eval_utils.IntervalLabels.from_dense(dense)
+
+            self.assertEqual(len(labels), len(dense))
+            self.assertEqual(labels.sum(), dense.sum())
+            numpy.testing.assert_array_equal(labels.to_dense(), dense)
+            numpy.testing.assert_array_equal(numpy.asarray(labels), dense)
+            self.assertEqual(list(labels), dense.tolist())
+
+            vector = numpy.arange(len(dense)) + 1e6
+            numpy.testing.assert_array_equal(labels.get_labeled_values(vector),
+                                             vector[dense == 1])
+
+            # intervals are merged with overlapping and adjacent ones
+            for start, end in labels.intervals:
+                self.assertTrue(dense[start:end + 1].all())
+                self.assertTrue(start == 0 or dense[start - 1] == 0)
+                self.assertTrue(end == len(dense) - 1 or dense[end + 1] == 0)
+
+    def test_union_matches_dense(self):
+        for seed in range(20):
+            dense = get_random_dense(seed)
+            other = get_random_dense(seed + 100)
+            labels = eval_utils.IntervalLabels.from_dense(dense)
+
+            expected = numpy.maximum(dense, other)
+            numpy.testing.assert_array_equal(labels.union(other).to_dense(), expected)
+            numpy.testing.assert_array_equal(
+                labels.union(eval_utils.IntervalLabels.from_dense(other)).to_dense(), expected)
+
+    def test_overlapping_intervals(self):
+        labels = eval_utils.IntervalLabels([(5, 8), (0, 2), (3, 3), (7, 12), (15, 15)], 20)
+        self.assertEqual(labels.intervals.tolist(), [[0, 3], [5, 12], [15, 15]])
+        self.assertRaises(AssertionError, eval_utils.IntervalLabels, [(5, 20)], 20)
+        self.assertRaises(AssertionError, eval_utils.IntervalLabels, [(5, 4)], 20)
+
+    def test_metrics_match_dense(self):
+        for seed in range(10):
+            dense, scores = get_test_vectors(seed)
+            scores[::17] = numpy.nan
+            labels = eval_utils.IntervalLabels.from_dense(dense)
+
+            metrics = eval_utils.distances.get_metrics(labels, scores)
+            expected = eval_utils.distances.get_metrics(dense, scores)
+            for key in expected:
+                if numpy.isnan(expected[key]):
+                    self.assertTrue(numpy.isnan(metrics[key]), key)
+                else:
+                    self.assertAlmostEqual(metrics[key], expected[key], delta=1e-12, msg=key)
+
+            scores = numpy.nan_to_num(scores) + 1e6
+            self.assertAlmostEqual(eval_utils.distances.normalized_euclidean(labels, scores),
+                                   eval_utils.distances.normalized_euclidean(dense, scores),
+                                   delta=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
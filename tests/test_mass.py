@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import numpy
+
+from anomaly_detection.anomaly_detector import create_anomaly_detector
+from anomaly_detection.representations.z_normalize import convert_to_z_normalized
+
+from tests.helpers import plain_euclidean, get_offset_sequence, create_detector, get_configs
+
+# measures the peak memory growth (in kilobytes) of the precomputation of a long
+# reference sequence, for which an array of all windows would take 400 MB
+_MEMORY_SCRIPT = '''
+import resource
+import numpy
+from anomaly_detection.profiles.mass import _ReferenceSequence
+reference = _ReferenceSequence(1e6 + numpy.random.RandomState(0).randn(100000), 500,
+                               normalize=%r)
+start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+reference._initialize()
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start)
+'''
+
+
+def normalized_euclidean(a, b):
+    return plain_euclidean(convert_to_z_normalized(a), convert_to_z_normalized(b))
+
+normalized_euclidean.IS_DISCRETE = False
+normalized_euclidean.IS_METRIC = True
+
+
+class MassProfileTest(unittest.TestCase):
+
+    def check_profile(self, sequence, reference_sequence, width, normalize=False,
+                      reference_step=1, k=3):
+        context_config = {'method': 'semi-supervised', 'reference_sequence': reference_sequence}
+        configs = get_configs(
+            context_config, width=width, reference_step=reference_step,
+            evaluator_config={'method': 'knn', 'k': k, 'distance_measure': 'euclidean'})
+        if normalize:
+            configs['representation_config'] = {'method': 'z-normalize'}
+        detector = create_anomaly_detector(**configs)
+        self.assertIsNotNone(detector.profile_function)
+
+        distance = normalized_euclidean if normalize else plain_euclidean
+        expected = create_detector(distance, context_config, width=width,
+                                   reference_step=reference_step, k=k).evaluate(sequence)
+        numpy.testing.assert_allclose(detector.evaluate(sequence), expected,
+                                      rtol=1e-7, atol=1e-9)
+
+    def test_semisupervised_context(self):
+        sequence = get_offset_sequence(200, offset=0)
+        reference_sequence = get_offset_sequence(150, offset=0, seed=1)
+        # short windows use direct correlation, and long windows the FFT
+        for width in (16, 80):
+            for normalize in (False, True):
+                self.check_profile(sequence, reference_sequence, width, normalize)
+        self.check_profile(sequence, reference_sequence, 16, reference_step=2, k=1)
+
+    def test_offset_sequence(self):
+        sequence = get_offset_sequence(200)
+        reference_sequence = get_offset_sequence(150, seed=1)
+        for width in (16, 80):
+            for normalize in (False, True):
+                for reference_step in (1, 2):
+                    self.check_profile(sequence, reference_sequence, width, normalize,
+                                       reference_step)
+
+    def test_precomputation_memory(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        for normalize in (False, True):
+            output = subprocess.check_output([sys.executable, '-c', _MEMORY_SCRIPT % normalize],
+                                             cwd=root)
+            self.assertLess(int(output), 50 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import numpy
+
+from anomaly_detection.anomaly_detector import create_anomaly_detector
+from anomaly_detection.profiles.matrix_profile import knn_matrix_profile
+
+from tests.helpers import plain_euclidean, get_offset_sequence, create_detector, get_configs
+
+
+class MatrixProfileTest(unittest.TestCase):
+
+    def check_profile(self, sequence, context_config, k, step=1):
+        detector = create_anomaly_detector(**get_configs(
+            context_config, step=step,
+            evaluator_config={'method': 'knn', 'k': k, 'distance_measure': 'euclidean'}))
+        self.assertIsNotNone(detector.profile_function)
+
+        expected = create_detector(plain_euclidean, context_config, step=step,
+                                   k=k).evaluate(sequence)
+        numpy.testing.assert_allclose(detector.evaluate(sequence), expected,
+                                      rtol=1e-7, atol=1e-9)
+
+    def test_trivial_context(self):
+        for k in (1, 3):
+            for step in (1, 3):
+                self.check_profile(get_offset_sequence(300, offset=0), {'method': 'trivial'},
+                                   k, step)
+
+    def test_local_context(self):
+        context_config = {'method': 'local_asymmetric', 'left_width': 50, 'right_width': 30}
+        for k in (1, 4):
+            self.check_profile(get_offset_sequence(300, offset=0), context_config, k)
+
+    def test_offset_sequence(self):
+        sequence = get_offset_sequence(300)
+        self.check_profile(sequence, {'method': 'trivial'}, 3)
+        self.check_profile(sequence, {'method': 'local_symmetric', 'left_width': 40,
+                                      'right_width': 40}, 2)
+
+    def test_small_context(self):
+        # windows whose contexts contain fewer than k windows get NaN
+        profile = knn_matrix_profile(numpy.arange(30, dtype=float), 10, k=3)
+        self.assertTrue(numpy.isnan(profile).any())
+        self.assertTrue(numpy.isfinite(profile).any())
+
+
+if __name__ == '__main__':
+    unittest.main()
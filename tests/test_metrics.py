@@ -0,0 +1,113 @@
+from __future__ import division
+
+import unittest
+
+import numpy
+from sklearn.metrics import average_precision_score, roc_auc_score
+
+from tests.helpers import get_eval_utils
+
+eval_utils = get_eval_utils()
+
+
+def get_naive_metrics(label_vector, anomaly_vector):
+    '''
+    Computes the metrics threshold by threshold, as the hamming distances
+    between the labels and the elements that are at least each threshold.
+    NaN scores never reach a threshold, and are ranked below all other scores.
+    '''
+    labels = numpy.asarray(label_vector) == 1
+    scores = numpy.asarray(anomaly_vector, dtype=float)
+    is_nan = numpy.isnan(scores)
+    thresholds = sorted(set(scores[~is_nan]), reverse=True)
+    ranks = numpy.where(is_nan, -numpy.inf, scores)
+
+    def get_distance(threshold):
+        predicted = numpy.ones(len(scores), dtype=bool) if threshold is None else ranks >= threshold
+        return (predicted != labels).mean()
+
+    equal_support = next((t for t in thresholds if (ranks >= t).sum() >= labels.sum()), None)
+    # labeled NaN scores never reach a threshold, so that all elements are predicted
+    full_support = next((t for t in thresholds if (ranks[labels] >= t).all()), None)
+    best_support = min([get_distance(t) for t in thresholds] +
+                       ([labels.mean()] if is_nan.any() else []))
+
+    pairs = [(p > n) + (p == n) / 2 for p in ranks[labels] for n in ranks[~labels]]
+    roc_auc = numpy.mean(pairs) if pairs else numpy.nan
+
+    pr_auc = 0 if labels.any() else numpy.nan
+    recalled = 0
+    for threshold in thresholds if labels.any() else []:
+        predicted = ranks >= threshold
+        true_positives = (predicted & labels).sum()
+        pr_auc += (true_positives - recalled) / labels.sum() * true_positives / predicted.sum()
+        recalled = true_positives
+
+    normalized_scores = (scores - scores.min()) / (scores.max() - scores.min())
+    return {
+        'equal_support': get_distance(equal_support),
+        'full_support': get_distance(full_support),
+        'best_support': best_support,
+        'normalized_euclidean': numpy.sqrt(((normalized_scores - labels) ** 2).sum()),
+        'roc_auc': roc_auc,
+        'pr_auc': pr_auc
+    }
+
+
+def get_test_vectors(seed=0, length=200):
+    '''
+    Returns label vectors with a few anomalies and anomaly vectors with many ties.
+    '''
+    random = numpy.random.RandomState(seed)
+    labels = numpy.zeros(length, dtype=int)
+    for start in random.randint(0, length - 10, 3):
+        labels[start:start + random.randint(1, 10)] = 1
+    scores = numpy.round(random.rand(length) + labels * random.rand(), 1)
+    return labels, scores
+
+
+class MetricsTest(unittest.TestCase):
+
+    def check(self, label_vector, anomaly_vector):
+        metrics = eval_utils.distances.get_metrics(label_vector, anomaly_vector)
+        expected = get_naive_metrics(label_vector, anomaly_vector)
+        self.assertEqual(sorted(metrics), sorted(expected))
+        for key in expected:
+            if numpy.isnan(expected[key]):
+                self.assertTrue(numpy.isnan(metrics[key]), key)
+            else:
+                self.assertAlmostEqual(metrics[key], expected[key], delta=1e-9, msg=key)
+
+    def test_matches_naive(self):
+        for seed in range(10):
+            self.check(*get_test_vectors(seed))
+
+    def test_matches_naive_with_nan(self):
+        for seed in range(10):
+            labels, scores = get_test_vectors(seed)
+            scores[numpy.random.RandomState(seed).randint(0, len(scores), 20)] = numpy.nan
+            self.check(labels, scores)
+
+    def test_matches_naive_without_anomalies(self):
+        labels, scores = get_test_vectors()
+        self.check(numpy.zeros(len(labels), dtype=int), scores)
+        self.check(numpy.ones(len(labels), dtype=int), scores)
+
+    def test_areas_match_sklearn(self):
+        for seed in range(10):
+            labels, scores = get_test_vectors(seed)
+            scores = 1e6 + scores
+            self.assertAlmostEqual(eval_utils.distances.roc_auc(labels, scores),
+                                   roc_auc_score(labels, scores), delta=1e-12)
+            self.assertAlmostEqual(eval_utils.distances.pr_auc(labels, scores),
+                                   average_precision_score(labels, scores), delta=1e-12)
+
+    def test_functions_match_get_metrics(self):
+        labels, scores = get_test_vectors()
+        metrics = eval_utils.distances.get_metrics(labels, scores)
+        for key, value in metrics.items():
+            self.assertEqual(getattr(eval_utils.distances, key)(labels, scores), value)
+
+
+if __name__ == '__main__':
+    unittest.main()
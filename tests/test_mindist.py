@@ -0,0 +1,81 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import create_anomaly_detector, filters
+from anomaly_detection.evaluators.distances import get_mindist
+from anomaly_detection.representations.sax import (convert_rows_to_sax, pack_sax_words,
+                                                   unpack_sax_words)
+from anomaly_detection.representations.z_normalize import convert_rows_to_z_normalized
+
+from tests.helpers import get_offset_sequence, get_configs
+
+
+class MindistTest(unittest.TestCase):
+
+    def setUp(self):
+        self.windows = filters.sliding_window_matrix(get_offset_sequence(length=200), 16)[0]
+
+    def test_lower_bounds_euclidean(self):
+        normalized = convert_rows_to_z_normalized(self.windows)
+        for word_length in (4, 8, 16):
+            for alphabet_size in (3, 6, 10):
+                distance = get_mindist(alphabet_size, 16 / word_length)
+                words = convert_rows_to_sax(self.windows, word_length, alphabet_size, 'integer')
+                for i in range(0, len(words), 20):
+                    euclidean = numpy.sqrt(((normalized - normalized[i]) ** 2).sum(axis=1))
+                    mindist = distance.pairwise(words[i:i + 1], words)[0]
+                    self.assertTrue((mindist <= euclidean + 1e-9).all())
+
+    def test_representations_match(self):
+        distance = get_mindist(6, 2)
+        strings = convert_rows_to_sax(self.windows, 8, 6)
+        words = convert_rows_to_sax(self.windows, 8, 6, 'integer')
+        expected = numpy.array([[distance(a, b) for b in strings] for a in strings[::10]])
+
+        numpy.testing.assert_allclose([[distance(a, b) for b in words] for a in words[::10]],
+                                      expected, rtol=1e-12)
+        numpy.testing.assert_allclose(distance.pairwise(words[::10], words), expected,
+                                      rtol=1e-12)
+        numpy.testing.assert_allclose(distance.pairwise(strings[::10], strings), expected,
+                                      rtol=1e-12)
+        numpy.testing.assert_allclose(distance.rowwise(words[::10, None, :], words[None, :, :]),
+                                      expected, rtol=1e-12)
+
+    def test_packing_round_trip(self):
+        for word_length, alphabet_size in ((8, 6), (16, 10), (27, 5)):
+            words = convert_rows_to_sax(self.windows, min(word_length, 16), alphabet_size,
+                                        'integer')
+            words = numpy.tile(words, (1, 2))[:, :word_length]
+            keys = pack_sax_words(words, alphabet_size)
+            numpy.testing.assert_array_equal(unpack_sax_words(keys, word_length, alphabet_size),
+                                             words)
+
+            # keys sort as the words do
+            order = numpy.lexsort(words.T[::-1])
+            self.assertTrue((numpy.diff(keys[order]) >= 0).all())
+
+    def test_detectors_reject_packed_words(self):
+        discretization_config = {'method': 'sax', 'dimensions': 8, 'alphabet_size': 6,
+                                 'output': 'packed'}
+        evaluator_config = {'method': 'knn', 'k': 3, 'distance_measure': 'mindist',
+                            'alphabet_size': 6, 'compression_ratio': 2}
+        configs = get_configs({'method': 'local_symmetric', 'width': 60},
+                              evaluator_config=evaluator_config)
+        self.assertRaises(ValueError, create_anomaly_detector,
+                          discretization_config=discretization_config, **configs)
+
+        configs = get_configs({'method': 'trivial'})
+        self.assertRaises(ValueError, create_anomaly_detector,
+                          representation_config=discretization_config, **configs)
+
+        discretization_config['output'] = 'integer'
+        detector = create_anomaly_detector(**dict(
+            get_configs({'method': 'local_symmetric', 'width': 60},
+                        evaluator_config=evaluator_config),
+            discretization_config=discretization_config))
+        detector.evaluate(get_offset_sequence(length=200))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import itertools
+import unittest
+
+import numpy
+
+from anomaly_detection import create_anomaly_detector, filters
+from anomaly_detection.evaluators.knn import KNNEvaluator
+from anomaly_detection.evaluators.distances import euclidean, get_mindist
+from anomaly_detection.filters import WindowSet
+from anomaly_detection.filters.window_set import reduce_numerosity
+from anomaly_detection.representations.sax import convert_rows_to_sax
+
+from tests.helpers import get_offset_sequence, get_configs
+
+
+def naive_reduce_numerosity(windows, method):
+    '''
+    Collapses repeated windows by comparing them one by one.
+    '''
+    keys = [w if isinstance(w, str) else tuple(w) for w in windows]
+    if method == 'runs':
+        groups = [(key, len(list(run))) for key, run in itertools.groupby(keys)]
+    else:
+        unique = sorted(set(keys), key=keys.index)
+        groups = [(key, keys.count(key)) for key in unique]
+    return [key for key, _ in groups], [count for _, count in groups]
+
+
+class NumerosityReductionTest(unittest.TestCase):
+
+    def setUp(self):
+        windows = filters.sliding_window_matrix(get_offset_sequence(length=300), 16)[0]
+        self.words = convert_rows_to_sax(windows, 4, 4, 'integer')
+        self.strings = convert_rows_to_sax(windows, 4, 4)
+        # coarsely rounded windows, with many repeated rows and an offset
+        self.windows = numpy.round(windows * 2) / 2
+
+    def test_matches_naive(self):
+        for method in ('runs', 'duplicates'):
+            for windows in (self.words, self.strings, self.windows, list(self.windows),
+                            WindowSet([self.words[:100], self.words[100:]])):
+                reduced, counts = reduce_numerosity(windows, method)
+                expected, expected_counts = naive_reduce_numerosity(list(windows), method)
+
+                self.assertEqual([w if isinstance(w, str) else tuple(w) for w in reduced],
+                                 expected)
+                self.assertEqual(counts.tolist(), expected_counts)
+                self.assertEqual(counts.sum(), len(windows))
+
+    def test_knn_matches_unreduced(self):
+        mindist = get_mindist(4, 4)
+        for distance, windows, kwargs in (
+                (mindist, self.words, {}),
+                (mindist, self.strings, {}),
+                (euclidean, self.windows, {}),
+                (euclidean, self.windows, {'search': 'early_abandoning'}),
+                (euclidean, self.windows, {'index': 'vp_tree'})):
+            reference_set = WindowSet([windows[:150], windows[150:]])
+            for k in (1, 3, 20):
+                expected = KNNEvaluator(distance, k=k, **kwargs)
+                for method in ('runs', 'duplicates'):
+                    evaluator = KNNEvaluator(distance, k=k, numerosity_reduction=method,
+                                             **kwargs)
+                    for window in windows[::25]:
+                        self.assertAlmostEqual(evaluator.evaluate(window, reference_set),
+                                               expected.evaluate(window, reference_set),
+                                               delta=1e-9)
+                    if hasattr(distance, 'pairwise') and not kwargs:
+                        numpy.testing.assert_allclose(
+                            evaluator.evaluate_nearest(windows[::25], reference_set, 30),
+                            expected.evaluate_nearest(windows[::25], reference_set, 30),
+                            rtol=1e-12)
+
+    def test_detector_matches_unreduced(self):
+        sequence = get_offset_sequence(length=300)
+        evaluator_config = {'method': 'knn', 'k': 3, 'distance_measure': 'mindist',
+                            'alphabet_size': 4, 'compression_ratio': 4}
+        discretization_config = {'method': 'sax', 'dimensions': 4, 'alphabet_size': 4,
+                                 'output': 'integer'}
+        for context_config in ({'method': 'local_symmetric', 'width': 80},
+                               {'method': 'semi-supervised',
+                                'reference_sequence': get_offset_sequence(length=150, seed=1)}):
+            expected = create_anomaly_detector(discretization_config=discretization_config,
+                                               **get_configs(context_config,
+                                                             evaluator_config=evaluator_config))
+            evaluator_config['numerosity_reduction'] = 'runs'
+            detector = create_anomaly_detector(discretization_config=discretization_config,
+                                               **get_configs(context_config,
+                                                             evaluator_config=evaluator_config))
+            del evaluator_config['numerosity_reduction']
+            numpy.testing.assert_allclose(detector.evaluate(sequence, batch_size=64),
+                                          expected.evaluate(sequence), rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import create_anomaly_detector
+
+from tests.helpers import get_configs, get_offset_sequence
+
+_TABLE_CONFIGS = ({}, {'lazy': True}, {'budget': 1, 'chunk_size': 1})
+
+
+def get_representation_configs():
+    '''
+    Returns (evaluator, representation, discretization) configurations of
+    detectors that convert their windows.
+    '''
+    sax = {'method': 'sax', 'dimensions': 8, 'alphabet_size': 5}
+    return [
+        ({'method': 'knn', 'k': 3, 'distance_measure': 'euclidean'},
+         {'method': 'z-normalize'}, None),
+        ({'method': 'knn', 'k': 3, 'distance_measure': 'cdm'}, None, sax),
+        ({'method': 'knn', 'k': 3, 'distance_measure': 'mindist', 'alphabet_size': 5,
+          'compression_ratio': 2}, None, dict(sax, output='integer')),
+    ]
+
+
+class RepresentationTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sequence = get_offset_sequence(length=120, offset=0)
+
+    def check_detectors(self, context_config, streamed=True):
+        # filters without step 1 only use a table if it is configured
+        for step, reference_step in ((2, 1), (1, 2)):
+            for evaluator_config, representation_config, discretization_config in \
+                    get_representation_configs():
+                configs = get_configs(context_config, width=16, step=step,
+                                      reference_step=reference_step,
+                                      evaluator_config=evaluator_config, aggregator='mean')
+                configs['representation_config'] = representation_config
+                configs['discretization_config'] = discretization_config
+
+                untabled = create_anomaly_detector(**configs)
+                self.assertIsNone(untabled.representation_table)
+                expected = untabled.evaluate(self.sequence)
+
+                for table_config in _TABLE_CONFIGS:
+                    detector = create_anomaly_detector(table_config=table_config, **configs)
+                    self.assertIsNotNone(detector.representation_table)
+
+                    for batch_size in (None, 32):
+                        numpy.testing.assert_allclose(
+                            detector.evaluate(self.sequence, batch_size=batch_size), expected,
+                            rtol=1e-7, atol=1e-9)
+
+                    if streamed:
+                        chunks = [self.sequence[i:i + 30]
+                                  for i in range(0, len(self.sequence), 30)]
+                        numpy.testing.assert_allclose(
+                            numpy.concatenate(list(detector.evaluate_stream(chunks))),
+                            expected, rtol=1e-7, atol=1e-9)
+
+    def test_trivial_context(self):
+        self.check_detectors({'method': 'trivial'}, streamed=False)
+
+    def test_local_context(self):
+        self.check_detectors({'method': 'local_asymmetric', 'left_width': 40,
+                              'right_width': 10})
+
+    def test_semisupervised_context(self):
+        self.check_detectors({'method': 'semi-supervised',
+                              'reference_sequence': get_offset_sequence(length=80, offset=0,
+                                                                        seed=1)})
+
+
+if __name__ == '__main__':
+    unittest.main()
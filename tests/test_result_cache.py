@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from tests.helpers import get_eval_utils, get_offset_sequence, get_configs
+
+eval_utils = get_eval_utils()
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = eval_utils.ResultCache(self.directory)
+        self.sequence = get_offset_sequence(length=100)
+        self.config = get_configs({'method': 'semi-supervised',
+                                   'reference_sequence': get_offset_sequence(length=50)})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_put_and_get(self):
+        self.assertIsNone(self.cache.get(self.config, self.sequence))
+        self.cache.put(self.config, self.sequence, self.sequence - 1e6, 1.5)
+
+        anomaly_vector, execution_time = self.cache.get(self.config, self.sequence)
+        numpy.testing.assert_array_equal(anomaly_vector, self.sequence - 1e6)
+        self.assertEqual(execution_time, 1.5)
+
+        # results are found again by other caches, regardless of how the config is built
+        result = eval_utils.ResultCache(self.directory).get(dict(
+            self.config, representation_config=None), self.sequence.copy())
+        self.assertIsNotNone(result)
+
+    def test_key_depends_on_config_and_sequence(self):
+        self.cache.put(self.config, self.sequence, self.sequence, 1.0)
+
+        sequence = self.sequence.copy()
+        sequence[10] += 1e-9
+        self.assertIsNone(self.cache.get(self.config, sequence))
+        self.assertIsNone(self.cache.get(self.config, self.sequence.astype(numpy.float32)))
+
+        config = get_configs({'method': 'semi-supervised',
+                              'reference_sequence': get_offset_sequence(length=50, seed=1)})
+        self.assertIsNone(self.cache.get(config, self.sequence))
+        config = dict(self.config, aggregator_config={'method': 'mean'})
+        self.assertIsNone(self.cache.get(config, self.sequence))
+
+    def test_evicts_least_recently_used(self):
+        configs = [dict(self.config, evaluator_config={'method': 'knn', 'k': k})
+                   for k in range(4)]
+        self.cache.put(configs[0], self.sequence, self.sequence, 1.0)
+        size = self.get_size()
+        # results are removed until they take up 90% of max_size
+        self.cache.max_size = 3.5 * size
+
+        for config in configs[1:3]:
+            self.cache.put(config, self.sequence, self.sequence, 1.0)
+
+        # the modification times record the last use
+        self.set_times(configs[:3], (2, 1, 3))
+        self.cache.put(configs[3], self.sequence, self.sequence, 1.0)
+
+        self.assertIsNotNone(self.cache.get(configs[0], self.sequence))
+        self.assertIsNone(self.cache.get(configs[1], self.sequence))
+        self.assertIsNotNone(self.cache.get(configs[2], self.sequence))
+        self.assertIsNotNone(self.cache.get(configs[3], self.sequence))
+
+    def test_tracks_size_without_scanning(self):
+        scans = []
+        evict = self.cache._evict
+        self.cache._evict = lambda: scans.append(evict())
+
+        for k in range(10):
+            config = dict(self.config, evaluator_config={'method': 'knn', 'k': k})
+            self.cache.put(config, self.sequence, self.sequence, 1.0)
+            # overwritten results are only counted once
+            self.cache.put(config, self.sequence, self.sequence, 2.0)
+
+        # only the first put, without a recorded size, scans the results
+        self.assertEqual(len(scans), 1)
+        self.assertEqual(self.cache._read_size(), self.get_size())
+
+        self.cache.clear()
+        self.assertEqual(self.cache._read_size(), 0)
+
+    def get_size(self):
+        return sum(os.path.getsize(os.path.join(self.directory, name))
+                   for name in os.listdir(self.directory) if name.endswith('.npz'))
+
+    def set_times(self, configs, times):
+        for config, time in zip(configs, times):
+            path = self.cache._get_path(config, self.sequence)
+            os.utime(path, (time, time))
+
+    def test_clear(self):
+        self.cache.put(self.config, self.sequence, self.sequence, 1.0)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(self.config, self.sequence))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from tests.helpers import get_eval_utils
+
+eval_utils = get_eval_utils()
+
+_KEYS = ('execution_time', 'equal_support_distance', 'roc_auc')
+
+
+class ResultTrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        self.detectors = ['knn %d' % i for i in range(5)]
+        self.tests = ['test %d' % i for i in range(7)]
+        self.tracker = eval_utils.ResultTracker('suite')
+        self.records = []
+
+        # enough records for the columns to grow, with some fields missing
+        for i in range(300):
+            record = {'anomaly_detector': self.detectors[random.randint(4)],
+                      'test': self.tests[random.randint(6)]}
+            for key in _KEYS:
+                if random.rand() < 0.8:
+                    record[key] = 1e6 + random.rand()
+            if random.rand() < 0.5:
+                record['anomaly_vector'] = random.rand(random.randint(5))
+            self.records.append(record)
+            self.tracker.add_record(record['anomaly_detector'], record['test'],
+                                    **dict((key, value) for key, value in record.items()
+                                           if key not in ('anomaly_detector', 'test')))
+
+    def get_values(self, key, anomaly_detector=None, test=None):
+        return [record[key] for record in self.records
+                if key in record and anomaly_detector in (None, record['anomaly_detector'])
+                and test in (None, record['test'])]
+
+    def check(self, tracker):
+        for anomaly_detector in (None, self.detectors[0], self.detectors[4]):
+            for test in (None, self.tests[1], self.tests[6]):
+                for key in _KEYS + ('pr_auc', 'anomaly_detector', 'test'):
+                    self.assertEqual(tracker.get_key_values(key, anomaly_detector, test),
+                                     self.get_values(key, anomaly_detector, test))
+                vectors = tracker.get_key_values('anomaly_vector', anomaly_detector, test)
+                expected = self.get_values('anomaly_vector', anomaly_detector, test)
+                self.assertEqual(len(vectors), len(expected))
+                for vector, expected_vector in zip(vectors, expected):
+                    numpy.testing.assert_array_equal(vector, expected_vector)
+
+        pairs = [(d, t) for d in self.detectors for t in self.tests]
+        for key in _KEYS + ('pr_auc',):
+            for labels, group_by, get_values in (
+                    (self.detectors, 'anomaly_detector',
+                     lambda label: self.get_values(key, anomaly_detector=label)),
+                    (self.tests, 'test', lambda label: self.get_values(key, test=label)),
+                    (pairs, ('anomaly_detector', 'test'),
+                     lambda label: self.get_values(key, *label))):
+                numpy.testing.assert_allclose(tracker.get_grouped_sums(key, labels, group_by),
+                                              [sum(get_values(label)) for label in labels],
+                                              rtol=1e-12)
+                averages = tracker.get_grouped_averages(key, labels, group_by)
+                for label, average in zip(labels, averages):
+                    values = get_values(label)
+                    if values:
+                        self.assertAlmostEqual(average, sum(values) / len(values), delta=1e-6)
+                    else:
+                        self.assertIsNone(average)
+
+            predicate = lambda record: record['test'] == self.tests[2]
+            self.assertEqual(tracker.get_filtered_key_values(key, predicate),
+                             self.get_values(key, test=self.tests[2]))
+
+    def test_matches_records(self):
+        self.check(self.tracker)
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'results.npz')
+            self.tracker.save(path)
+            self.check(eval_utils.ResultTracker.load(path))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_add_records_after_loading(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'results.npz')
+            for records in ([], self.records):
+                tracker = eval_utils.ResultTracker('suite')
+                for record in records:
+                    tracker.add_record(record['anomaly_detector'], record['test'],
+                                       execution_time=record.get('execution_time'))
+                tracker.save(path)
+
+                tracker = eval_utils.ResultTracker.load(path)
+                for i in range(100):
+                    tracker.add_record('loaded', 'test %d' % (i % 3), execution_time=float(i))
+                self.assertEqual(tracker.get_key_values('execution_time', 'loaded'),
+                                 [float(i) for i in range(100)])
+                self.assertEqual(len(tracker.get_key_values('test')), len(records) + 100)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_filtered_values_follow_added_records(self):
+        predicate = lambda record: record['anomaly_detector'] == 'new'
+        self.assertEqual(self.tracker.get_filtered_key_values('roc_auc', predicate), [])
+
+        self.tracker.add_record('new', self.tests[0], roc_auc=0.5)
+        self.tracker.add_record('new', self.tests[1], roc_auc=0.7)
+        self.assertEqual(self.tracker.get_filtered_key_values('roc_auc', predicate), [0.5, 0.7])
+        self.assertAlmostEqual(self.tracker.get_filtered_avg_over_key('roc_auc', predicate), 0.6)
+        self.assertAlmostEqual(self.tracker.get_filtered_sum_over_key('roc_auc', predicate), 1.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+from __future__ import division
+
+import unittest
+
+import numpy
+
+from anomaly_detection import filters
+from anomaly_detection.representations.paa import convert_to_paa, convert_rows_to_paa
+from anomaly_detection.representations.sax import (
+    convert_to_sax, convert_rows_to_sax, get_normal_cdf_equipartition, get_sax_converter)
+from anomaly_detection.representations.z_normalize import convert_to_z_normalized
+
+from tests.helpers import get_offset_sequence
+
+
+def naive_paa(window, target_dimension):
+    '''
+    PAA through a loop over the points of the window, where points on frame
+    boundaries count partially towards both frames.
+    '''
+    sample_width = len(window) / target_dimension
+    frames = numpy.zeros(target_dimension)
+    for j in range(target_dimension):
+        lo, hi = j * sample_width, (j + 1) * sample_width
+        for i in range(int(lo), min(len(window), int(numpy.ceil(hi)))):
+            frames[j] += window[i] * (min(i + 1, hi) - max(i, lo))
+    return frames / sample_width
+
+
+def naive_sax(window, word_length, alphabet_size):
+    '''
+    SAX through naive_paa, with each frame compared to every breakpoint.
+    '''
+    frames = convert_to_z_normalized(naive_paa(window, word_length))
+    breakpoints = get_normal_cdf_equipartition(alphabet_size)[1:-1]
+    return ''.join(chr(ord('a') + sum(frame > b for b in breakpoints)) for frame in frames)
+
+
+class SAXTest(unittest.TestCase):
+
+    def setUp(self):
+        sequence = get_offset_sequence(length=300)
+        sequence[200:240] = sequence[200]
+        self.windows = filters.sliding_window_matrix(sequence, 16)[0]
+
+    def test_paa_matches_naive(self):
+        for target_dimension in (1, 3, 5, 8, 16):
+            expected = numpy.array([naive_paa(w, target_dimension) for w in self.windows])
+            numpy.testing.assert_allclose(convert_rows_to_paa(self.windows, target_dimension),
+                                          expected, rtol=1e-14)
+            numpy.testing.assert_allclose(convert_to_paa(self.windows[0], target_dimension),
+                                          expected[0], rtol=1e-14)
+
+    def test_paa_of_constant_windows(self):
+        for target_dimension in (3, 5, 8):
+            paa = convert_rows_to_paa(self.windows[200:225], target_dimension)
+            self.assertTrue((paa == self.windows[200, 0]).all())
+
+    def test_sax_matches_naive(self):
+        for word_length, alphabet_size in ((3, 3), (5, 6), (8, 4), (16, 10)):
+            expected = [naive_sax(w, word_length, alphabet_size) for w in self.windows]
+
+            # the naive PAA of constant windows is subject to rounding errors, which
+            # the z-normalization amplifies, while they should be normalized to zero
+            expected[200:225] = [naive_sax(numpy.zeros(16), word_length, alphabet_size)] * 25
+
+            self.assertEqual(convert_rows_to_sax(self.windows, word_length, alphabet_size),
+                             expected)
+            self.assertEqual(convert_to_sax(self.windows[0], word_length, alphabet_size),
+                             expected[0])
+
+    def test_outputs_match(self):
+        strings = convert_rows_to_sax(self.windows, 5, 6)
+        integers = convert_rows_to_sax(self.windows, 5, 6, output='integer')
+        self.assertEqual([''.join(chr(ord('a') + s) for s in w) for w in integers], strings)
+
+        converter = get_sax_converter(5, 6, output='integer')
+        numpy.testing.assert_array_equal(converter.batch(self.windows), integers)
+        numpy.testing.assert_array_equal(converter(self.windows[7]), integers[7])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy
+
+from tests.helpers import get_eval_utils, get_offset_sequence
+
+eval_utils = get_eval_utils()
+
+
+class SequenceStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = eval_utils.SequenceStore(os.path.join(self.directory, 'store'))
+        self.sequence = get_offset_sequence(length=100)
+        self.labels = numpy.zeros(100, dtype=int)
+        self.labels[50:60] = 1
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def save(self, name, anomaly_vector=None):
+        path = os.path.join(self.directory, name)
+        eval_utils.save_sequence(path, self.sequence, anomaly_vector)
+        return path
+
+    def test_matches_load_sequence(self):
+        for name, anomaly_vector in (('plain', None), ('dense', self.labels),
+                                     ('intervals', eval_utils.IntervalLabels.from_dense(
+                                         self.labels))):
+            path = self.save(name, anomaly_vector)
+            expected = eval_utils.load_sequence(path)
+            loaded = self.store.load(path)
+            if anomaly_vector is None:
+                numpy.testing.assert_array_equal(loaded, expected)
+                self.assertFalse(loaded.flags.writeable)
+            else:
+                numpy.testing.assert_array_equal(loaded[0], expected[0])
+                numpy.testing.assert_array_equal(numpy.asarray(loaded[1]),
+                                                 numpy.asarray(expected[1]))
+                self.assertEqual(isinstance(loaded[1], eval_utils.IntervalLabels),
+                                 isinstance(expected[1], eval_utils.IntervalLabels))
+                self.assertFalse(loaded[0].flags.writeable)
+
+    def test_shared_between_stores(self):
+        path = self.save('plain')
+        self.store.load(path)
+        names = os.listdir(self.store.directory)
+
+        # other stores in the same directory use the existing copy
+        other = eval_utils.SequenceStore(self.store.directory)
+        numpy.testing.assert_array_equal(other.load(path), self.sequence)
+        self.assertEqual(os.listdir(self.store.directory), names)
+
+    def test_modified_sequences_are_copied_again(self):
+        path = self.save('plain')
+        self.store.load(path)
+        self.sequence = self.sequence[:50] + 1
+        self.save('plain')
+        numpy.testing.assert_array_equal(self.store.load(path), self.sequence)
+
+        # only the copy of the current version is kept
+        self.assertEqual(len(os.listdir(self.store.directory)), 1)
+
+    def test_modified_labels_are_copied_again(self):
+        labels = eval_utils.IntervalLabels.from_dense(self.labels)
+        path = self.save('intervals', labels)
+        self.store.load(path)
+        self.labels[:] = 0
+        self.labels[10:20] = 1
+        self.labels[30:35] = 1
+        self.save('intervals', eval_utils.IntervalLabels.from_dense(self.labels))
+
+        loaded = self.store.load(path)
+        numpy.testing.assert_array_equal(numpy.asarray(loaded[1]), self.labels)
+        self.assertEqual(len(os.listdir(self.store.directory)), 2)
+
+    def test_remove_and_clear(self):
+        path = self.save('intervals', eval_utils.IntervalLabels.from_dense(self.labels))
+        loaded = self.store.load(path)
+        self.store.remove(path)
+        self.assertEqual(os.listdir(self.store.directory), [])
+        numpy.testing.assert_array_equal(loaded[0], self.sequence)
+
+        self.store.load(path)
+        self.store.load(self.save('plain'))
+        self.store.clear()
+        self.assertEqual(os.listdir(self.store.directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
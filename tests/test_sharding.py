@@ -0,0 +1,36 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import create_anomaly_detector
+
+from tests.helpers import get_offset_sequence, get_configs
+
+
+class ShardedEvaluationTest(unittest.TestCase):
+
+    def test_matches_evaluate(self):
+        sequence = get_offset_sequence(length=300)
+        for context_config in ({'method': 'trivial'},
+                               {'method': 'local_symmetric', 'width': 60},
+                               {'method': 'semi-supervised',
+                                'reference_sequence': get_offset_sequence(length=150, seed=1)}):
+            for aggregator in ('max', 'mean', 'median'):
+                detector = create_anomaly_detector(**get_configs(context_config, step=3,
+                                                                 aggregator=aggregator))
+                detector.profile_function = None
+                expected = detector.evaluate(sequence)
+                for batch_size in (None, 16):
+                    scores = detector.evaluate(sequence, batch_size=batch_size, processes=2)
+                    numpy.testing.assert_allclose(scores, expected, rtol=1e-12)
+
+    def test_short_sequence(self):
+        detector = create_anomaly_detector(**get_configs({'method': 'trivial'}))
+        detector.profile_function = None
+        sequence = get_offset_sequence(length=10)
+        numpy.testing.assert_array_equal(detector.evaluate(sequence, processes=2),
+                                         detector.evaluate(sequence))
+
+
+if __name__ == '__main__':
+    unittest.main()
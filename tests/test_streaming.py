@@ -0,0 +1,44 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import create_anomaly_detector
+
+from tests.helpers import get_offset_sequence, get_configs
+
+_CONTEXT_CONFIGS = (
+    {'method': 'local_symmetric', 'width': 60},
+    {'method': 'local_asymmetric', 'left_width': 50, 'right_width': 20},
+    {'method': 'semi-supervised', 'reference_sequence': get_offset_sequence(length=150, seed=1)},
+)
+
+
+class StreamingEvaluationTest(unittest.TestCase):
+
+    def check(self, sequence, chunk_size, **kwargs):
+        for context_config in _CONTEXT_CONFIGS:
+            for aggregator in ('max', 'mean', 'median'):
+                detector = create_anomaly_detector(**get_configs(context_config, step=3,
+                                                                 aggregator=aggregator))
+                expected = detector.evaluate(sequence)
+                chunks = [sequence[i:i + chunk_size]
+                          for i in range(0, len(sequence), chunk_size)]
+                scores = numpy.concatenate(list(detector.evaluate_stream(chunks, **kwargs)))
+                numpy.testing.assert_allclose(scores, expected, rtol=1e-12)
+
+    def test_matches_evaluate(self):
+        sequence = get_offset_sequence(length=300, offset=0)
+        for chunk_size in (1, 37, 300):
+            self.check(sequence, chunk_size)
+
+    def test_matches_evaluate_with_offset(self):
+        self.check(get_offset_sequence(length=300), 23, batch_size=16)
+
+    def test_requires_local_or_static_context(self):
+        detector = create_anomaly_detector(**get_configs({'method': 'trivial'}))
+        self.assertRaises(NotImplementedError, list,
+                          detector.evaluate_stream([get_offset_sequence()]))
+
+
+if __name__ == '__main__':
+    unittest.main()
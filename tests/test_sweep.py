@@ -0,0 +1,87 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import create_anomaly_detector, evaluate_sweep
+
+from tests.helpers import get_configs, get_eval_utils, get_offset_sequence
+
+eval_utils = get_eval_utils()
+
+
+def get_sweep_configs():
+    '''
+    Returns kNN configurations that differ in their k and aggregator, for a
+    context with a distance profile and one evaluated window by window.
+    '''
+    configs = []
+    for context_config in ({'method': 'semi-supervised',
+                            'reference_sequence': get_offset_sequence(length=150, seed=1)},
+                           {'method': 'local_asymmetric', 'left_width': 60, 'right_width': 20}):
+        for k in (1, 3, 7):
+            for aggregator in ('max', 'mean', 'median'):
+                configs.append(get_configs(
+                    context_config, width=16, step=2, aggregator=aggregator,
+                    evaluator_config={'method': 'knn', 'k': k, 'distance_measure': 'euclidean'}))
+    return configs
+
+
+def get_test(count=2):
+    '''
+    Returns a test of offset sequences, with the anomaly in their middle.
+    '''
+    test = []
+    for seed in range(count):
+        sequence = get_offset_sequence(length=300, seed=seed)
+        anomaly_vector = numpy.zeros(len(sequence))
+        anomaly_vector[150:160] = 1
+        test.append((sequence, anomaly_vector))
+    return test
+
+
+class EvaluateSweepTest(unittest.TestCase):
+
+    def test_matches_per_detector_evaluate(self):
+        configs = get_sweep_configs()
+        sequence = get_offset_sequence(length=300)
+        for batch_size in (None, 32):
+            anomaly_vectors = evaluate_sweep(configs, sequence, batch_size)
+            self.assertEqual(len(anomaly_vectors), len(configs))
+            for config, anomaly_vector in zip(configs, anomaly_vectors):
+                expected = create_anomaly_detector(**config).evaluate(sequence)
+                numpy.testing.assert_allclose(anomaly_vector, expected, rtol=1e-7, atol=1e-9)
+
+
+class SweepTestSuiteTest(unittest.TestCase):
+
+    def test_matches_serial_test_suite(self):
+        configs = get_sweep_configs()
+        labels = ['config %d' % i for i in range(len(configs))]
+        tests = [get_test(), get_test(1)]
+        test_labels = ['test a', 'test b']
+
+        expected = eval_utils.TestSuite([create_anomaly_detector(**config) for config in configs],
+                                        labels, tests, test_labels)
+        expected.evaluate(display_progress=False)
+        expected_records = expected.results._get_records()
+
+        for processes in (None, 2):
+            suite = eval_utils.SweepTestSuite(configs, labels, tests, test_labels)
+            suite.evaluate(display_progress=False, processes=processes)
+            records = suite.results._get_records()
+
+            self.assertEqual(len(records), len(expected_records))
+            for record, expected_record in zip(records, expected_records):
+                self.assertEqual(sorted(record), sorted(expected_record))
+                for key in record:
+                    if key == 'execution_time':
+                        continue
+                    if key in ('anomaly_detector', 'test'):
+                        self.assertEqual(record[key], expected_record[key])
+                    else:
+                        numpy.testing.assert_allclose(record[key], expected_record[key],
+                                                      rtol=1e-7, atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
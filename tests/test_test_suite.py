@@ -0,0 +1,61 @@
+import unittest
+
+import numpy
+
+from anomaly_detection import create_anomaly_detector
+
+from tests.helpers import get_configs, get_eval_utils, get_offset_sequence
+
+eval_utils = get_eval_utils()
+
+
+def get_test(count, length):
+    '''
+    Returns a test of offset sequences, with the anomaly in their middle.
+    '''
+    test = []
+    for seed in range(count):
+        sequence = get_offset_sequence(length=length, seed=seed)
+        anomaly_vector = numpy.zeros(length)
+        anomaly_vector[length // 2:length // 2 + 10] = 1
+        test.append((sequence, anomaly_vector))
+    return test
+
+
+class ParallelEvaluationTest(unittest.TestCase):
+
+    def test_matches_serial_records(self):
+        detectors = []
+        for width in (8, 16):
+            for context_config in ({'method': 'local_symmetric', 'width': 60},
+                                   {'method': 'trivial'}):
+                detectors.append(create_anomaly_detector(**get_configs(context_config,
+                                                                       width=width, step=2)))
+        labels = ['detector %d' % i for i in range(len(detectors))]
+        # tests of different sizes, so that the pairs finish out of order
+        tests = [get_test(3, 300), get_test(1, 150), get_test(2, 200)]
+        test_labels = ['test %d' % i for i in range(len(tests))]
+
+        serial = eval_utils.TestSuite(detectors, labels, tests, test_labels)
+        serial.evaluate(display_progress=False)
+        expected_records = serial.results._get_records()
+
+        for processes in (2, 3):
+            suite = eval_utils.TestSuite(detectors, labels, tests, test_labels)
+            suite.evaluate(display_progress=False, processes=processes)
+            records = suite.results._get_records()
+
+            self.assertEqual(len(records), len(expected_records))
+            for record, expected_record in zip(records, expected_records):
+                self.assertEqual(sorted(record), sorted(expected_record))
+                for key in record:
+                    if key == 'execution_time':
+                        continue
+                    if key in ('anomaly_detector', 'test'):
+                        self.assertEqual(record[key], expected_record[key])
+                    else:
+                        numpy.testing.assert_array_equal(record[key], expected_record[key])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy
+
+from anomaly_detection.evaluators import get_evaluator
+from anomaly_detection.evaluators.knn import KNNEvaluator, VPTree
+from anomaly_detection.evaluators.distances import euclidean, get_distance
+
+from tests.helpers import plain_euclidean
+
+
+class VPTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        self.sequences = 1e6 + numpy.cumsum(random.randn(500, 16), axis=1)
+        self.queries = 1e6 + numpy.cumsum(random.randn(20, 16), axis=1)
+
+    def get_brute_force(self, query, k, counts=None):
+        distances = [plain_euclidean(query, sequence) for sequence in self.sequences]
+        if counts is not None:
+            distances = numpy.repeat(distances, counts)
+        return sorted(distances)[:k]
+
+    def test_matches_brute_force(self):
+        for distance in (euclidean, plain_euclidean):
+            tree = VPTree(self.sequences, distance, leaf_size=4)
+            for query in self.queries:
+                for k in (1, 5, 600):
+                    numpy.testing.assert_allclose(tree.query(query, k),
+                                                  self.get_brute_force(query, k), rtol=1e-12)
+
+    def test_matches_brute_force_with_counts(self):
+        counts = numpy.random.RandomState(1).randint(1, 4, len(self.sequences))
+        tree = VPTree(self.sequences, euclidean, leaf_size=4, counts=counts)
+        self.assertEqual(len(tree), counts.sum())
+        for query in self.queries:
+            for k in (1, 7):
+                numpy.testing.assert_allclose(tree.query(query, k),
+                                              self.get_brute_force(query, k, counts), rtol=1e-12)
+
+    def test_evaluator_matches_brute_force(self):
+        reference_set = list(self.sequences)
+        indexed = KNNEvaluator(euclidean, k=3, index='vp_tree')
+        brute_force = KNNEvaluator(plain_euclidean, k=3)
+        for query in self.queries:
+            self.assertAlmostEqual(indexed.evaluate(query, reference_set),
+                                   brute_force.evaluate(query, reference_set), delta=1e-6)
+
+    def test_rejects_non_metric_distances(self):
+        for distance in (get_distance('dtw'), get_distance('dtw', warping_window=2),
+                         get_distance('cdm'), get_distance('mindist', alphabet_size=5)):
+            self.assertRaises(ValueError, KNNEvaluator, distance, index='vp_tree')
+            KNNEvaluator(distance)
+
+        self.assertRaises(ValueError, get_evaluator, distance_measure='dtw', index='vp_tree')
+
+
+if __name__ == '__main__':
+    unittest.main()